@@ -0,0 +1,76 @@
+"""Checks EpisodeParser against parser_corpus.tsv and measures its throughput.
+
+Usage: python benchmarks/bench_parser.py [--repeat N] [--min-rate NAMES_PER_SEC]
+Exits non-zero if any name parses differently or throughput is below --min-rate.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).parent.absolute()
+SRC_DIR = BENCH_DIR.parent / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+from core.parser import EpisodeParser
+
+FIELDS = ('season', 'episode', 'version', 'title', 'episode_title', 'resolution', 'crc')
+
+
+def load_corpus(path):
+    cases = []
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            line = line.rstrip('\n')
+            if not line or line.startswith('#'):
+                continue
+            name, *values = line.split('\t')
+            expected = dict(zip(FIELDS, values))
+            for field in ('season', 'episode', 'version'):
+                expected[field] = int(expected[field])
+            for field in ('title', 'episode_title', 'resolution', 'crc'):
+                expected[field] = expected[field] or None
+            cases.append((name, expected))
+    return cases
+
+
+def check(parser, cases):
+    failures = 0
+    for name, expected in cases:
+        parsed = parser.parse(name)._asdict()
+        wrong = {field: (parsed[field], value) for field, value in expected.items() if parsed[field] != value}
+        if wrong:
+            failures += 1
+            print(f"❌ {name}")
+            for field, (got, want) in wrong.items():
+                print(f"     {field}: got {got!r}, expected {want!r}")
+    return failures
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--corpus', default=BENCH_DIR / 'parser_corpus.tsv')
+    arg_parser.add_argument('--repeat', type=int, default=2000)
+    # A scan hashes and thumbnails every new file, so 50k names/s keeps parsing out of the profile
+    arg_parser.add_argument('--min-rate', type=float, default=50000)
+    args = arg_parser.parse_args()
+
+    cases = load_corpus(args.corpus)
+    failures = check(EpisodeParser(), cases)
+    print(f"Corpus: {len(cases) - failures}/{len(cases)} names parsed as expected")
+
+    names = [name for name, _ in cases] * args.repeat
+    parser = EpisodeParser()
+    start = time.perf_counter()
+    parser.parse_many(names)
+    elapsed = time.perf_counter() - start
+    rate = len(names) / elapsed
+    print(f"Throughput: {rate:,.0f} names/s ({len(names):,} names in {elapsed:.2f}s)")
+
+    if failures or rate < args.min_rate:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
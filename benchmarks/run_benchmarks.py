@@ -0,0 +1,280 @@
+"""Headless benchmarks for the scanner, database, parser, player and UI at several library sizes.
+
+Usage: python benchmarks/run_benchmarks.py [--sizes 100,10000,100000] [--output results.json]
+                                           [--baseline old.json] [--skip-ui] [--repeat N]
+
+Each size gets a fresh synthetic library, database and thumbnail cache in a
+temp dir. ffmpeg, Jikan and mpv are replaced with local stubs and Qt runs with the
+offscreen platform, so no display, network or video files are needed. Results
+are written as JSON (one record per benchmark and size). Pass an earlier
+results file as --baseline to print the change per benchmark.
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import statistics
+import subprocess
+import tempfile
+import time
+from pathlib import Path
+
+os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+from synthetic import BENCH_DIR, JikanStub, StubPlayer, install_ffmpeg_stub, make_library
+
+from core.database import DatabaseManager
+from core.metadata import MetadataService
+from core.parser import EpisodeParser
+from core.playback import PlaybackStateService
+from core.player import PlayerController
+from core.scanner import LibraryScanner
+
+
+class Recorder:
+    def __init__(self, repeat):
+        self.repeat = repeat
+        self.results = []
+
+    def measure(self, size, name, func, items=None, repeat=None):
+        """Runs func `repeat` times and records the median wall time."""
+        times = []
+        for _ in range(repeat or self.repeat):
+            start = time.perf_counter()
+            func()
+            times.append(time.perf_counter() - start)
+        seconds = statistics.median(times)
+        record = {'size': size, 'benchmark': name, 'seconds': round(seconds, 6), 'runs': len(times)}
+        if items:
+            record['items'] = items
+            record['per_item_us'] = round(seconds / items * 1e6, 3)
+        self.results.append(record)
+        per_item = f" ({record['per_item_us']:.1f} µs/item)" if items else ""
+        print(f"  {name:<32} {seconds * 1000:>10.2f} ms{per_item}")
+        return seconds
+
+
+def bench_parser(recorder, size, paths):
+    parser = EpisodeParser()
+    recorder.measure(size, "parser.parse_path", lambda: [parser.parse_path(path) for path in paths], items=len(paths))
+
+
+def bench_scan(recorder, size, library, db, stub):
+    metadata = MetadataService(db, api=stub.api())
+    recorder.measure(size, "scan.full", lambda: LibraryScanner(library, db, metadata_service=metadata).run(),
+                     items=size, repeat=1)
+    recorder.measure(size, "scan.incremental", lambda: LibraryScanner(library, db, metadata_service=metadata).run(),
+                     items=size)
+    # Lookups keep running after a scan; let them finish so they don't skew what comes next
+    recorder.measure(size, "metadata.drain", metadata.wait, repeat=1)
+
+
+def bench_inserts(recorder, size, work_dir):
+    db = DatabaseManager(db_path=work_dir / "inserts.db")
+    rows = [(f"/bench/Series {i // 24}/Episode {i}.mkv", f"{i:016x}", i % 24 + 1) for i in range(size)]
+
+    def bulk_insert():
+        with db.bulk_writer() as writer:
+            anime_ids = {}
+            for path, file_hash, episode in rows:
+                folder = os.path.dirname(path)
+                if folder not in anime_ids:
+                    anime_ids[folder] = writer.get_or_create_anime(os.path.basename(folder), folder)
+                writer.add_episode(anime_ids[folder], path, 1, episode, f"Title {episode}", file_hash, None)
+                writer.update_file_index(path, 1, 1, 1)
+
+    recorder.measure(size, "db.bulk_insert", bulk_insert, items=size, repeat=1)
+    # A full rescan of an unchanged library: every row is an upsert that changes nothing
+    recorder.measure(size, "db.bulk_reinsert", bulk_insert, items=size, repeat=1)
+
+    # Row-at-a-time inserts commit every row, so keep the count bounded
+    single = rows[:min(size, 1000)]
+    anime_id = db.get_or_create_anime("Single Inserts", "/bench/single")
+
+    def add_episodes():
+        for path, file_hash, episode in single:
+            db.add_episode(anime_id, path + ".single", 1, episode, None, file_hash + "s", None)
+
+    recorder.measure(size, "db.add_episode", add_episodes, items=len(single), repeat=1)
+    db.close()
+
+
+def bench_queries(recorder, size, db):
+    library = db.get_library()
+    anime_id = library[len(library) // 2][0]
+    episodes = db.get_episodes(anime_id)
+    middle = episodes[len(episodes) // 2] if episodes else None
+    deep_key = (middle[4], middle[0]) if middle else None
+    series_folder = db.get_anime_details(anime_id)[2]
+
+    recorder.measure(size, "db.get_library", db.get_library, items=len(library))
+    recorder.measure(size, "db.get_anime_details", lambda: db.get_anime_details(anime_id))
+    recorder.measure(size, "db.get_seasons", lambda: db.get_seasons(anime_id))
+    recorder.measure(size, "db.get_episodes", lambda: db.get_episodes(anime_id), items=len(episodes) or None)
+    recorder.measure(size, "db.get_episodes_page.first", lambda: db.get_episodes_page(anime_id))
+    recorder.measure(size, "db.get_episodes_page.deep", lambda: db.get_episodes_page(anime_id, after=deep_key))
+    recorder.measure(size, "db.get_file_index", lambda: db.get_file_index(series_folder))
+    recorder.measure(size, "db.search_library", lambda: db.search_library('"synthetic"* "series"*'))
+    recorder.measure(size, "db.filter_library.genres", lambda: db.filter_library(genres=["Action", "Comedy"]))
+    recorder.measure(size, "db.filter_library.rating", lambda: db.filter_library(min_rating=8, watched="unwatched"))
+
+
+def bench_player(recorder, size, db):
+    library = db.get_library()
+    anime_id = library[len(library) // 2][0]
+    first = db.get_episodes(anime_id)[0]
+    playback = PlaybackStateService(db)
+    player = StubPlayer()
+    controller = PlayerController(player, db, playback=playback)
+
+    # Both include prefetching the episode after: on a real episode it finishes long before the end
+    def play_file():
+        controller.stop()
+        controller.play_file(first[1])
+        controller.prefetcher.wait()
+
+    def next_episode():
+        # End of file: marks it watched, opens the next (prefetched) episode and prefetches the one after
+        player.tick(1420.0, 1440.0)
+        player.finish()
+        controller.prefetcher.wait()
+
+    recorder.measure(size, "player.play_file", play_file)
+    recorder.measure(size, "player.next_episode", next_episode)
+    controller.stop()
+    playback.close()
+
+    opened = controller.latencies
+    warm = sum(1 for latency in opened if latency['warm_cache'])
+    print(f"  (open to first frame: median {statistics.median(l['seconds'] for l in opened) * 1000:.2f} ms, "
+          f"{warm}/{len(opened)} from a finished prefetch)")
+
+
+def bench_ui(recorder, size, db, stub):
+    from PySide6.QtWidgets import QApplication
+    from core.manager import AniplayCore
+    from ui.main_window import MainWindow
+
+    app = QApplication.instance() or QApplication([])
+    launcher = AniplayCore(db=db, metadata=MetadataService(db, api=stub.api()))
+
+    window = None
+    loaded = []
+
+    def wait_for_library():
+        # The library is read on a worker thread; spin the event loop until the grid is filled
+        while not loaded:
+            app.processEvents()
+        loaded.clear()
+
+    def create_window():
+        nonlocal window
+        window = MainWindow(launcher)
+        window.library_loaded.connect(lambda: loaded.append(True))
+        window.show()
+        app.processEvents()
+
+    recorder.measure(size, "ui.main_window_init", create_window, repeat=1)
+    recorder.measure(size, "ui.first_library_fill", wait_for_library, repeat=1)
+    library = db.get_library()
+    anime_id = library[len(library) // 2][0]
+
+    def display_library():
+        # Start from an empty grid so every run does the full insert
+        window.library_model.set_library([])
+        window.display_library()
+        wait_for_library()
+
+    def open_anime_details():
+        window.open_anime_details(anime_id)
+        app.processEvents()
+
+    recorder.measure(size, "ui.display_library", display_library, items=len(library))
+    recorder.measure(size, "ui.open_anime_details", open_anime_details)
+    window.close()
+    window.deleteLater()
+    app.processEvents()
+
+
+def git_revision():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=BENCH_DIR, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def environment():
+    info = {
+        'revision': git_revision(),
+        'timestamp': time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+    }
+    try:
+        import PySide6
+        info['pyside6'] = PySide6.__version__
+    except ImportError:
+        pass
+    return info
+
+
+def compare(results, baseline_path):
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = {(r['size'], r['benchmark']): r['seconds'] for r in json.load(f)['results']}
+    print(f"\nCompared to {baseline_path}:")
+    for record in results:
+        before = baseline.get((record['size'], record['benchmark']))
+        if before:
+            change = (record['seconds'] - before) / before * 100
+            print(f"  {record['size']:>7} {record['benchmark']:<32} {change:+7.1f}%")
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('--sizes', default="100,10000,100000", help="Comma-separated episode counts")
+    arg_parser.add_argument('--output', default="benchmark-results.json")
+    arg_parser.add_argument('--baseline', help="Earlier results file to compare against")
+    arg_parser.add_argument('--repeat', type=int, default=5, help="Runs per benchmark (median is kept)")
+    arg_parser.add_argument('--skip-ui', action='store_true')
+    arg_parser.add_argument('--keep', action='store_true', help="Keep the generated libraries and databases")
+    args = arg_parser.parse_args()
+
+    work_root = Path(tempfile.mkdtemp(prefix="aniplay-bench-"))
+    os.environ["ANIPLAY_CACHE_DIR"] = str(work_root / "cache")
+    install_ffmpeg_stub(work_root / "bin")
+    recorder = Recorder(args.repeat)
+
+    try:
+        with JikanStub() as stub:
+            for size in [int(size) for size in args.sizes.split(",")]:
+                print(f"\n=== {size:,} episodes ===")
+                work_dir = work_root / str(size)
+                start = time.perf_counter()
+                paths = make_library(work_dir / "library", size)
+                print(f"  (library generated in {time.perf_counter() - start:.1f}s)")
+
+                db = DatabaseManager(db_path=work_dir / "aniplay.db")
+                bench_parser(recorder, size, paths)
+                bench_scan(recorder, size, work_dir / "library", db, stub)
+                bench_inserts(recorder, size, work_dir)
+                bench_queries(recorder, size, db)
+                bench_player(recorder, size, db)
+                if not args.skip_ui:
+                    bench_ui(recorder, size, db, stub)
+                db.close()
+    finally:
+        if not args.keep:
+            shutil.rmtree(work_root, ignore_errors=True)
+
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump({'environment': environment(), 'results': recorder.results}, f, indent=2)
+    print(f"\nResults written to {args.output}")
+    if args.baseline:
+        compare(recorder.results, args.baseline)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,171 @@
+"""Synthetic library and local stand-ins for ffmpeg and Jikan, for the benchmarks.
+
+Nothing here touches the network or needs a real ffmpeg install.
+"""
+import json
+import os
+import stat
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+BENCH_DIR = Path(__file__).parent.absolute()
+SRC_DIR = BENCH_DIR.parent / "src"
+if str(SRC_DIR) not in sys.path:
+    sys.path.insert(0, str(SRC_DIR))
+
+EPISODES_PER_SEASON = 12
+SEASONS_PER_SERIES = 2
+# A few real release name styles, so the parser sees a realistic mix
+NAME_STYLES = [
+    "[SubsPlease] {title} - {episode:02d} (1080p) [{crc}].mkv",
+    "{title} S{season:02d}E{episode:02d} 1080p WEB-DL.mkv",
+    "[Erai-raws] {title} - {episode:02d} [720p][Multiple Subtitle].mkv",
+    "{title} - {episode:02d} - Episode Title {episode}.mp4",
+]
+
+
+def series_title(index):
+    return f"Synthetic Series {index:05d}"
+
+
+def make_library(root, episodes):
+    """Creates `episodes` tiny video stubs as <root>/<series>/Season NN/<release name>.
+
+    Each stub holds a few random bytes, so every file (in every run) gets its own fingerprint.
+    Returns the list of file paths.
+    """
+    root = Path(root)
+    per_series = EPISODES_PER_SEASON * SEASONS_PER_SERIES
+    paths = []
+    for i in range(episodes):
+        series, position = divmod(i, per_series)
+        season, episode = divmod(position, EPISODES_PER_SEASON)
+        title = series_title(series)
+        folder = root / title / f"Season {season + 1:02d}"
+        if episode == 0:
+            folder.mkdir(parents=True, exist_ok=True)
+        name = NAME_STYLES[series % len(NAME_STYLES)].format(
+            title=title, season=season + 1, episode=episode + 1, crc=f"{i:08X}")
+        path = folder / name
+        path.write_bytes(b"\x1a\x45\xdf\xa3" + os.urandom(16))
+        paths.append(str(path))
+    return paths
+
+
+def install_ffmpeg_stub(bin_dir):
+    """Puts an `ffmpeg` on PATH that writes a tiny JPEG to its output path instead of decoding anything."""
+    bin_dir = Path(bin_dir)
+    bin_dir.mkdir(parents=True, exist_ok=True)
+    if sys.platform == "win32":
+        script = bin_dir / "ffmpeg.bat"
+        script.write_text(f'@"{sys.executable}" "{Path(__file__).absolute()}" --ffmpeg-stub %*\n')
+    else:
+        # A shell script starts far faster than Python, which matters at 100k thumbnails
+        script = bin_dir / "ffmpeg"
+        script.write_text("#!/bin/sh\n"
+                          "for arg in \"$@\"; do case \"$arg\" in *.jpg) out=\"$arg\";; esac; done\n"
+                          "printf '\\377\\330\\377\\331' > \"$out\"\n")
+        script.chmod(script.stat().st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    os.environ["PATH"] = str(bin_dir) + os.pathsep + os.environ["PATH"]
+    return script
+
+
+def _ffmpeg_stub(args):
+    outputs = [arg for arg in args if arg.endswith(".jpg")]
+    if outputs:
+        Path(outputs[-1]).write_bytes(b"\xff\xd8\xff\xd9")
+
+
+class _JikanHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        body = json.dumps({"data": [{
+            "mal_id": 1,
+            "score": 8.0,
+            "synopsis": "A synthetic series for benchmarking.",
+            "genres": [{"name": "Action"}, {"name": "Comedy"}],
+        }]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class JikanStub:
+    """Local HTTP server answering every /anime search with the same result."""
+
+    def __init__(self):
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), _JikanHandler)
+        self.base_url = f"http://127.0.0.1:{self.server.server_port}/v4"
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def api(self):
+        """A JikanAPI pointed at the stub, without Jikan's rate limits."""
+        from core.api import JikanAPI, TokenBucket
+        api = JikanAPI(base_url=self.base_url)
+        api.limits = (TokenBucket(10000, 1.0),)
+        return api
+
+
+class StubPlayer:
+    """Player backend for core.player.PlayerController that plays nothing.
+
+    load() reads the start of the file the way a demuxer probes it and then
+    reports the first frame right away (unless `auto_first_frame` is off);
+    tick() and finish() play the part of mpv's position updates and end of
+    file. Every load is kept in `loads` as (path, start).
+    """
+
+    def __init__(self, probe_bytes=64 * 1024, auto_first_frame=True):
+        self.probe_bytes = probe_bytes
+        self.auto_first_frame = auto_first_frame
+        self.loads = []
+        self.paused = False
+        self.position = 0.0
+        self.on_first_frame = None
+        self.on_position = None
+        self.on_paused = None
+        self.on_end = None
+
+    def load(self, path, start=0.0):
+        self.loads.append((path, start))
+        self.position = start
+        with open(path, "rb") as f:
+            f.read(self.probe_bytes)
+        if self.auto_first_frame:
+            self.on_first_frame()
+
+    def set_paused(self, paused):
+        self.paused = paused
+        self.on_paused(paused)
+
+    def seek(self, position):
+        self.position = position
+        self.on_first_frame()
+
+    def stop(self):
+        pass
+
+    def tick(self, position, duration=None):
+        self.position = position
+        self.on_position(position, duration)
+
+    def finish(self):
+        self.on_end()
+
+
+if __name__ == "__main__" and sys.argv[1:2] == ["--ffmpeg-stub"]:
+    _ffmpeg_stub(sys.argv[2:])
@@ -1,60 +1,114 @@
+"""Headless library scanner: builds aniplay.db without starting the UI.
+
+Usage: python first_run.py ROOT [ROOT ...] [--db PATH] [--incremental] [--no-metadata] [--json]
+                           [--io-limit KIND=N ...] [--thumb-workers N] [--metadata-workers N]
+
+Meant for media servers and first runs on big libraries: it imports no Qt,
+so it starts fast and runs without a display. Roots on different devices
+are scanned in parallel, roots on the same device one after the other,
+reading `--io-limit` files at once per device (see core.devices). Ctrl+C
+cancels the scan at the next file and keeps its checkpoints, so running
+the same command again resumes it. With --json, a stats record per root
+is printed to stdout and everything else goes to stderr.
+"""
+import argparse
+import contextlib
+import json
 import os
 import sys
+import threading
+import time
 from pathlib import Path
 
-# 1. SETUP PATHS
-# ROOT_DIR is .../aniplay
 ROOT_DIR = Path(__file__).parent.absolute()
-# SRC_DIR is .../aniplay/src
 SRC_DIR = ROOT_DIR / "src"
-
-# Add 'src' to the Python path so it can see 'core'
 if str(SRC_DIR) not in sys.path:
     sys.path.insert(0, str(SRC_DIR))
 
-# 2. WINDOWS DLL FIX
-os.environ["PATH"] = str(ROOT_DIR) + os.pathsep + os.environ["PATH"]
-if hasattr(os, 'add_dll_directory'):
-    try:
-        os.add_dll_directory(str(ROOT_DIR))
-    except Exception:
-        pass
+from core.database import DatabaseManager
+from core.devices import DEFAULT_IO_LIMITS
+from core.metadata import MetadataService
+from core.scanner import MultiRootScanner
 
-# Debug prints to confirm
-print(f"Checking for 'core' in: {SRC_DIR}")
-print(f"Does 'src/core' exist? {(SRC_DIR / 'core').exists()}")
 
-# 3. IMPORTS
-try:
-    from core.database import DatabaseManager
-    from core.scanner import ScannerWorker
+def parse_io_limit(value):
+    kind, _, limit = value.partition("=")
+    if kind not in DEFAULT_IO_LIMITS or not limit.isdigit() or int(limit) < 1:
+        raise argparse.ArgumentTypeError(f"expected KIND=N with KIND one of {', '.join(DEFAULT_IO_LIMITS)}")
+    return kind, int(limit)
 
-    print("✅ Success: Modules imported correctly from src/core!")
-except ImportError as e:
-    print(f"❌ Still failing. Error: {e}")
-    sys.exit(1)
+
+def scan(roots, db, metadata, args):
+    """Runs the scan on a worker thread so Ctrl+C on the main thread can cancel it cleanly."""
+    def on_progress(progress):
+        print(f"  > {progress.describe()}", file=sys.stderr)
+
+    scanner = MultiRootScanner(roots, db, io_limits=dict(args.io_limit), incremental=args.incremental,
+                               thumb_workers=args.thumb_workers, metadata_service=metadata,
+                               fetch_metadata=metadata is not None, progress_interval=args.progress_interval,
+                               on_progress=None if args.quiet else on_progress,
+                               on_found_anime=None if args.quiet else lambda title: print(f"📂 {title}",
+                                                                                            file=sys.stderr))
+    thread = threading.Thread(target=scanner.run, name="scan")
+    start = time.perf_counter()
+    thread.start()
+    try:
+        while thread.is_alive():
+            thread.join(0.2)
+    except KeyboardInterrupt:
+        print("\n⏹ Cancelling; the next run resumes from the checkpoint...", file=sys.stderr)
+        scanner.cancel()
+        thread.join()
+    return scanner, time.perf_counter() - start
 
 
-def start_test_scan(target_path):
-    print("\n--- Aniplay First Run: Backend Test ---")
-    db = DatabaseManager()
-    print(f"✅ Database initialized at: {db.db_path}")
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    arg_parser.add_argument('roots', nargs='+', help="Library folders to scan")
+    arg_parser.add_argument('--db', help="Database to write (the app's aniplay.db by default)")
+    arg_parser.add_argument('--incremental', action='store_true',
+                            help="Skip files whose size/mtime/inode are unchanged since the last scan")
+    arg_parser.add_argument('--no-metadata', action='store_true', help="Don't look up series metadata")
+    arg_parser.add_argument('--io-limit', type=parse_io_limit, action='append', default=[], metavar='KIND=N',
+                            help="Files read at once per device of a kind, e.g. hdd=1 or network=8 "
+                                 f"(defaults: {', '.join(f'{k}={v}' for k, v in DEFAULT_IO_LIMITS.items())})")
+    arg_parser.add_argument('--thumb-workers', type=int, default=None, help="ffmpeg processes (CPU count by default)")
+    arg_parser.add_argument('--metadata-workers', type=int, default=2)
+    arg_parser.add_argument('--progress-interval', type=float, default=1.0, help="Seconds between progress lines")
+    arg_parser.add_argument('--json', action='store_true', help="Print per-root stats as JSON")
+    arg_parser.add_argument('--quiet', action='store_true', help="No progress output")
+    args = arg_parser.parse_args()
 
-    scanner = ScannerWorker(target_path, db)
+    roots = [Path(os.path.abspath(root)) for root in args.roots]
+    missing = [str(root) for root in roots if not root.is_dir()]
+    if missing:
+        arg_parser.error(f"not a folder: {', '.join(missing)}")
 
-    scanner.signals.found_anime.connect(lambda name: print(f"📂 Found Anime: {name}"))
-    scanner.signals.progress.connect(lambda msg: print(f"  > {msg}"))
-    scanner.signals.finished.connect(lambda count: print(f"\n✨ SUCCESS! Indexed {count} episodes."))
+    # Keep stdout clean for the JSON stats
+    with contextlib.redirect_stdout(sys.stderr) if args.json else contextlib.nullcontext():
+        db = DatabaseManager(db_path=args.db)
+        metadata = None if args.no_metadata else MetadataService(db, workers=args.metadata_workers)
+        print(f"🚀 Scanning {len(roots)} folder(s)...")
+        scanner, seconds = scan(roots, db, metadata, args)
+        for device in scanner.devices:
+            print(f"💽 {device.kind} (dev {device.dev}): {', '.join(str(root) for root in device.roots)}")
+        print(scanner.summary())
+        print(f"✨ {sum(result['episodes'] for result in scanner.results)} episodes in {seconds:.1f}s")
 
-    print(f"🚀 Starting scan of: {target_path}...")
-    scanner.run()
+        if metadata is not None and not scanner.cancelled:
+            print("⏳ Waiting for metadata lookups...")
+            start = time.perf_counter()
+            metadata.wait()
+            print(f"✨ Metadata done in {time.perf_counter() - start:.1f}s")
 
+    if args.json:
+        stats = {'database': str(db.db_path), 'seconds': round(seconds, 3), 'cancelled': scanner.cancelled,
+                 'roots': scanner.results}
+        if scanner.stats is not None:
+            stats['trace'] = scanner.stats
+        print(json.dumps(stats, indent=2))
+    return 130 if scanner.cancelled else 0
 
-if __name__ == "__main__":
-    # Ensure this path is correct for your machine
-    MY_ANIME_PATH = r"C:\Users\Naisam\Desktop\Anime\Love, Chuunibyou and other Delusions"
 
-    if os.path.exists(MY_ANIME_PATH):
-        start_test_scan(MY_ANIME_PATH)
-    else:
-        print(f"❌ Error: The path '{MY_ANIME_PATH}' does not exist.")
\ No newline at end of file
+if __name__ == '__main__':
+    sys.exit(main())
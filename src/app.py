@@ -1,29 +1,77 @@
+import time
+
+# Taken before anything else is imported, so the startup report covers the imports too
+STARTUP = time.perf_counter()
+
+import argparse
 import sys
 from pathlib import Path
+from PySide6.QtCore import QEvent, QObject, QTimer
 from PySide6.QtWidgets import QApplication
 
 # Path setup
 ROOT_DIR = Path(__file__).parent.parent.absolute()
 sys.path.insert(0, str(ROOT_DIR / "src"))
 
+# Only the UI and the database are loaded here; the scanner, metadata (requests) and
+# hashing modules are imported on first use, see AniplayCore
 from ui.main_window import MainWindow
-from core.database import DatabaseManager  # Import the real DB manager
+from core.manager import AniplayCore
+from core.startup import StartupTimer, budget_from_env, report_from_env
+
+
+class FirstPaintFilter(QObject):
+    """Marks "first_paint" in the StartupTimer when the window paints for the first time."""
+
+    def __init__(self, timer, parent=None):
+        super().__init__(parent)
+        self.timer = timer
 
+    def eventFilter(self, watched, event):
+        if event.type() == QEvent.Paint:
+            self.timer.mark("first_paint")
+            watched.removeEventFilter(self)
+        return False
 
-class AppLauncher:
-    def __init__(self):
-        # Initialize the REAL database
-        self.db = DatabaseManager()
+
+def parse_args():
+    arg_parser = argparse.ArgumentParser(description="Aniplay")
+    arg_parser.add_argument('--startup-report', action='store_true',
+                            help="Print startup timings once the library is shown (or set ANIPLAY_STARTUP_REPORT=1)")
+    arg_parser.add_argument('--first-paint-budget', type=float, default=budget_from_env(), metavar='MS',
+                            help="Time-to-first-paint budget the report is checked against")
+    arg_parser.add_argument('--quit-after-startup', action='store_true',
+                            help="Exit once the library is shown; the exit code is 1 if over budget (for CI)")
+    # Anything else (e.g. -platform offscreen) is left for Qt
+    return arg_parser.parse_known_args()
 
 
 if __name__ == "__main__":
-    app = QApplication(sys.argv)
+    args, qt_args = parse_args()
+    startup = StartupTimer(start=STARTUP, budget_ms=args.first_paint_budget)
+    startup.mark("imports")
+
+    app = QApplication(sys.argv[:1] + qt_args)
 
-    # Create the launcher with the real DB
-    launcher = AppLauncher()
+    # The core owns the real DB, the shared metadata service and the running scans
+    launcher = AniplayCore()
 
     window = MainWindow(launcher)
+    startup.mark("window_created")
+    paint_filter = FirstPaintFilter(startup, window)
+    window.installEventFilter(paint_filter)
+
+    def on_library_loaded():
+        window.library_loaded.disconnect(on_library_loaded)
+        startup.mark("library_loaded")
+        if args.startup_report or args.quit_after_startup or report_from_env():
+            print(startup.report())
+        if args.quit_after_startup:
+            # Let pending paints finish first
+            QTimer.singleShot(0, lambda: app.exit(1 if startup.over_budget() else 0))
+
+    window.library_loaded.connect(on_library_loaded)
     window.show()
 
     print("App is running with Database connected")
-    sys.exit(app.exec())
\ No newline at end of file
+    sys.exit(app.exec())
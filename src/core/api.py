@@ -1,29 +1,92 @@
 import requests
+import threading
 import time
+from requests.adapters import HTTPAdapter
+
+from .tracing import get_tracer
+
+
+class TokenBucket:
+    """Allows `rate` calls per `per` seconds, with bursts of up to `rate` calls."""
+
+    def __init__(self, rate, per):
+        self.capacity = rate
+        self.fill_rate = rate / per
+        self.tokens = rate
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def reserve(self):
+        """Takes a token, returning how long the caller has to wait before using it."""
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.fill_rate)
+            self.updated = now
+            self.tokens -= 1
+            if self.tokens >= 0:
+                return 0.0
+            return -self.tokens / self.fill_rate
 
 
 class JikanAPI:
-    def __init__(self):
-        self.base_url = "https://api.jikan.moe/v4"
+    # Jikan allows 3 requests per second and 60 per minute
+    limits = (TokenBucket(3, 1.0), TokenBucket(60, 60.0))
+
+    def __init__(self, max_retries=4, backoff=1.0, pool_size=4, base_url="https://api.jikan.moe/v4"):
+        self.base_url = base_url
+        self.max_retries = max_retries
+        self.backoff = backoff
+        # One pooled session keeps the TLS connection alive between lookups
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def wait_for_slot(self):
+        # Reserve from every bucket first so the waits overlap instead of adding up
+        delay = max(bucket.reserve() for bucket in self.limits)
+        if delay > 0:
+            with get_tracer().span("api_rate_limit", cat="api"):
+                time.sleep(delay)
+
+    def get(self, path, params):
+        """GETs a Jikan endpoint, retrying with exponential backoff on 429 and 5xx."""
+        tracer = get_tracer()
+        for attempt in range(self.max_retries + 1):
+            self.wait_for_slot()
+            with tracer.span("api", cat="api", path=path):
+                response = self.session.get(f"{self.base_url}{path}", params=params, timeout=10)
+            if response.status_code != 429 and response.status_code < 500:
+                break
+            if attempt == self.max_retries:
+                break
+            tracer.count("api_retries")
+
+            retry_after = response.headers.get("Retry-After", "")
+            delay = float(retry_after) if retry_after.isdigit() else self.backoff * (2 ** attempt)
+            time.sleep(delay)
+
+        response.raise_for_status()
+        return response.json()
+
+    def fetch_anime(self, title):
+        """Returns the top result's metadata, None if nothing matched. Raises on network/API errors."""
+        data = self.get("/anime", params={"q": title, "limit": 1})
+
+        if data['data']:
+            anime = data['data'][0]
+            return {
+                "mal_id": anime['mal_id'],
+                "rating": anime['score'],
+                "synopsis": anime['synopsis'],
+                "genres": ", ".join([g['name'] for g in anime['genres']])
+            }
+        return None
 
     def search_anime(self, title):
         """Searches for an anime and returns the top result's metadata."""
         try:
-            # Jikan has a rate limit (3 requests per second), we add a small delay
-            time.sleep(0.5)
-
-            response = requests.get(f"{self.base_url}/anime", params={"q": title, "limit": 1})
-            response.raise_for_status()
-            data = response.json()
-
-            if data['data']:
-                anime = data['data'][0]
-                return {
-                    "mal_id": anime['mal_id'],
-                    "rating": anime['score'],
-                    "synopsis": anime['synopsis'],
-                    "genres": ", ".join([g['name'] for g in anime['genres']])
-                }
+            return self.fetch_anime(title)
         except Exception as e:
             print(f"API Error for {title}: {e}")
-        return None
\ No newline at end of file
+        return None
@@ -1,75 +1,634 @@
 import sqlite3
 import os
+import threading
+import time
 from pathlib import Path
 
+from .tracing import get_tracer
+
+EPISODE_UPSERT = '''
+    INSERT INTO episodes (anime_id, file_path, file_hash, season, title, episode_num, thumbnail_path)
+    VALUES (?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT(file_hash) DO UPDATE SET
+    anime_id = excluded.anime_id,
+    file_path = excluded.file_path,
+    season = excluded.season,
+    episode_num = excluded.episode_num,
+    title = COALESCE(excluded.title, episodes.title),
+    thumbnail_path = COALESCE(excluded.thumbnail_path, episodes.thumbnail_path)
+    ON CONFLICT(file_path) DO UPDATE SET
+    file_hash = excluded.file_hash,
+    season = excluded.season,
+    episode_num = excluded.episode_num,
+    title = COALESCE(excluded.title, episodes.title),
+    thumbnail_path = COALESCE(excluded.thumbnail_path, episodes.thumbnail_path)
+'''
+
+FILE_INDEX_UPSERT = '''
+    INSERT INTO file_index (file_path, size, mtime_ns, inode)
+    VALUES (?, ?, ?, ?)
+    ON CONFLICT(file_path) DO UPDATE SET
+    size = excluded.size, mtime_ns = excluded.mtime_ns, inode = excluded.inode
+'''
+
+ANIME_UPSERT = '''
+    INSERT INTO anime (title, folder_path, poster_path)
+    VALUES (?, ?, ?)
+    ON CONFLICT(folder_path) DO UPDATE SET
+    poster_path = COALESCE(excluded.poster_path, anime.poster_path)
+    RETURNING id
+'''
+
+# Full-text index over series and episode titles. Both tables are external content
+# (the text lives only in anime/episodes) and the triggers keep them in sync.
+SEARCH_SCHEMA = '''
+    CREATE VIRTUAL TABLE IF NOT EXISTS anime_fts USING fts5(
+        title, synopsis, genres, content='anime', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3');
+    CREATE VIRTUAL TABLE IF NOT EXISTS episode_fts USING fts5(
+        title, content='episodes', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3');
+
+    CREATE TRIGGER IF NOT EXISTS anime_fts_insert AFTER INSERT ON anime BEGIN
+        INSERT INTO anime_fts (rowid, title, synopsis, genres) VALUES (new.id, new.title, new.synopsis, new.genres);
+    END;
+    CREATE TRIGGER IF NOT EXISTS anime_fts_delete AFTER DELETE ON anime BEGIN
+        INSERT INTO anime_fts (anime_fts, rowid, title, synopsis, genres)
+        VALUES ('delete', old.id, old.title, old.synopsis, old.genres);
+    END;
+    CREATE TRIGGER IF NOT EXISTS anime_fts_update AFTER UPDATE OF title, synopsis, genres ON anime
+    WHEN old.title IS NOT new.title OR old.synopsis IS NOT new.synopsis OR old.genres IS NOT new.genres BEGIN
+        INSERT INTO anime_fts (anime_fts, rowid, title, synopsis, genres)
+        VALUES ('delete', old.id, old.title, old.synopsis, old.genres);
+        INSERT INTO anime_fts (rowid, title, synopsis, genres) VALUES (new.id, new.title, new.synopsis, new.genres);
+    END;
+
+    CREATE TRIGGER IF NOT EXISTS episode_fts_insert AFTER INSERT ON episodes BEGIN
+        INSERT INTO episode_fts (rowid, title) VALUES (new.id, new.title);
+    END;
+    CREATE TRIGGER IF NOT EXISTS episode_fts_delete AFTER DELETE ON episodes BEGIN
+        INSERT INTO episode_fts (episode_fts, rowid, title) VALUES ('delete', old.id, old.title);
+    END;
+    CREATE TRIGGER IF NOT EXISTS episode_fts_update AFTER UPDATE OF title ON episodes
+    WHEN old.title IS NOT new.title BEGIN
+        INSERT INTO episode_fts (episode_fts, rowid, title) VALUES ('delete', old.id, old.title);
+        INSERT INTO episode_fts (rowid, title) VALUES (new.id, new.title);
+    END;
+'''
+
+# Series matching an FTS query, best first. Title hits outrank synopsis/genre hits,
+# and a series that only matches through an episode title ranks below both.
+SEARCH_QUERY = '''
+    WITH hits (anime_id, score) AS (
+        SELECT rowid, bm25(anime_fts, 10.0, 1.0, 3.0) FROM anime_fts WHERE anime_fts MATCH :query
+        UNION ALL
+        SELECT e.anime_id, bm25(episode_fts) * 0.5
+        FROM episode_fts JOIN episodes e ON e.id = episode_fts.rowid
+        WHERE episode_fts MATCH :query
+    )
+    SELECT a.id, a.title, a.poster_path, a.rating
+    FROM hits JOIN anime a ON a.id = hits.anime_id
+    GROUP BY a.id
+    ORDER BY MIN(hits.score), a.title
+    LIMIT :limit
+'''
+
+
+def migrate_base_schema(cursor):
+    """Version 1: the schema from before migrations existed. Every statement is IF NOT EXISTS,
+    so databases created by older versions (user_version 0) go through it unharmed."""
+    # Journal mode is stored in the file, so this only has to run once per database
+    cursor.execute("PRAGMA journal_mode = WAL")
+
+    # Anime Table
+    cursor.execute('''CREATE TABLE IF NOT EXISTS anime (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        title TEXT NOT NULL,
+        folder_path TEXT UNIQUE,
+        poster_path TEXT,
+        mal_id INTEGER,
+        rating REAL,
+        synopsis TEXT,
+        genres TEXT
+    )''')
+
+    # Episode Table - Including 'title' and 'episode_num'
+    cursor.execute('''CREATE TABLE IF NOT EXISTS episodes (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        anime_id INTEGER,
+        file_path TEXT UNIQUE,
+        file_hash TEXT UNIQUE,
+        season INTEGER,
+        title TEXT,
+        episode_num INTEGER,
+        thumbnail_path TEXT,
+        last_position REAL DEFAULT 0,
+        is_watched INTEGER DEFAULT 0,
+        FOREIGN KEY(anime_id) REFERENCES anime(id) ON DELETE CASCADE
+    )''')
+
+    # File Index - last seen stat() of every scanned file, used by incremental scans
+    cursor.execute('''CREATE TABLE IF NOT EXISTS file_index (
+        file_path TEXT PRIMARY KEY,
+        size INTEGER,
+        mtime_ns INTEGER,
+        inode INTEGER
+    )''')
+
+    # Metadata Cache - Jikan lookups by normalized title, including misses and errors
+    cursor.execute('''CREATE TABLE IF NOT EXISTS metadata_cache (
+        title_key TEXT PRIMARY KEY,
+        status TEXT NOT NULL,
+        mal_id INTEGER,
+        rating REAL,
+        synopsis TEXT,
+        genres TEXT,
+        fetched_at REAL NOT NULL
+    )''')
+
+    # Scan Checkpoint - an unfinished scan per library root, and the directories it completed
+    cursor.execute('''CREATE TABLE IF NOT EXISTS scan_checkpoint (
+        root_path TEXT PRIMARY KEY,
+        status TEXT NOT NULL,
+        started_at REAL NOT NULL,
+        updated_at REAL NOT NULL,
+        files_done INTEGER DEFAULT 0
+    )''')
+    cursor.execute('''CREATE TABLE IF NOT EXISTS scan_completed_dirs (
+        root_path TEXT NOT NULL,
+        dir_path TEXT NOT NULL,
+        PRIMARY KEY (root_path, dir_path)
+    ) WITHOUT ROWID''')
+
+    # Indexes for the library grid and the episode list
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_anime_title ON anime(title)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_episodes_anime_num ON episodes(anime_id, episode_num)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_episodes_anime_season_num "
+                   "ON episodes(anime_id, season, episode_num)")
+
+    # Search index; a freshly created index is filled from the existing rows
+    existing = {row[0] for row in cursor.execute(
+        "SELECT name FROM sqlite_master WHERE name IN ('anime_fts', 'episode_fts')")}
+    cursor.connection.commit()
+    cursor.executescript(SEARCH_SCHEMA)
+    for table in ('anime_fts', 'episode_fts'):
+        if table not in existing:
+            cursor.execute(f"INSERT INTO {table} ({table}) VALUES ('rebuild')")
+
+
+# Keeps anime.episode_count / watched_count / watch_state in step with the episodes table,
+# so the watched-state facet is an index lookup instead of an aggregate over every episode
+WATCH_STATE_SCHEMA = '''
+    CREATE TRIGGER IF NOT EXISTS anime_counts_insert AFTER INSERT ON episodes BEGIN
+        UPDATE anime SET episode_count = episode_count + 1, watched_count = watched_count + (new.is_watched != 0)
+        WHERE id = new.anime_id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS anime_counts_delete AFTER DELETE ON episodes BEGIN
+        UPDATE anime SET episode_count = episode_count - 1, watched_count = watched_count - (old.is_watched != 0)
+        WHERE id = old.anime_id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS anime_counts_update AFTER UPDATE OF anime_id, is_watched ON episodes
+    WHEN old.anime_id IS NOT new.anime_id OR (old.is_watched != 0) != (new.is_watched != 0) BEGIN
+        UPDATE anime SET episode_count = episode_count - 1, watched_count = watched_count - (old.is_watched != 0)
+        WHERE id = old.anime_id;
+        UPDATE anime SET episode_count = episode_count + 1, watched_count = watched_count + (new.is_watched != 0)
+        WHERE id = new.anime_id;
+    END;
+    CREATE TRIGGER IF NOT EXISTS anime_watch_state AFTER UPDATE OF episode_count, watched_count ON anime BEGIN
+        UPDATE anime SET watch_state = CASE
+            WHEN new.watched_count <= 0 THEN 0
+            WHEN new.watched_count < new.episode_count THEN 1
+            ELSE 2 END
+        WHERE id = new.id;
+    END;
+'''
+
+
+def add_column(cursor, table, column, declaration):
+    """ALTER TABLE ... ADD COLUMN, unless an earlier, interrupted run of the migration already added it."""
+    if column not in {row[1] for row in cursor.execute(f"PRAGMA table_info({table})")}:
+        cursor.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+
+
+def migrate_genres(cursor):
+    """Version 2: genres as rows (genre, anime_genre) and per-series watch counts, for filter_library."""
+    cursor.execute('''CREATE TABLE IF NOT EXISTS genre (
+        id INTEGER PRIMARY KEY,
+        name TEXT NOT NULL UNIQUE COLLATE NOCASE
+    )''')
+    # Both directions are covering: series -> genres for facet counts, genre -> series for filtering
+    cursor.execute('''CREATE TABLE IF NOT EXISTS anime_genre (
+        anime_id INTEGER NOT NULL REFERENCES anime(id) ON DELETE CASCADE,
+        genre_id INTEGER NOT NULL REFERENCES genre(id),
+        PRIMARY KEY (anime_id, genre_id)
+    ) WITHOUT ROWID''')
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_anime_genre_genre ON anime_genre(genre_id, anime_id)")
+    cursor.execute("CREATE TRIGGER IF NOT EXISTS anime_genre_delete AFTER DELETE ON anime BEGIN "
+                   "DELETE FROM anime_genre WHERE anime_id = old.id; END")
+
+    add_column(cursor, "anime", "episode_count", "INTEGER NOT NULL DEFAULT 0")
+    add_column(cursor, "anime", "watched_count", "INTEGER NOT NULL DEFAULT 0")
+    # 0 unwatched, 1 in progress, 2 watched (see WATCH_STATES)
+    add_column(cursor, "anime", "watch_state", "INTEGER NOT NULL DEFAULT 0")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_anime_rating ON anime(rating, title)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_anime_watch_state ON anime(watch_state, rating)")
+    cursor.executescript(WATCH_STATE_SCHEMA)
+
+    # Fill both in from the existing rows
+    cursor.execute('''UPDATE anime SET
+        episode_count = (SELECT COUNT(*) FROM episodes WHERE episodes.anime_id = anime.id),
+        watched_count = (SELECT COUNT(*) FROM episodes WHERE episodes.anime_id = anime.id AND is_watched != 0)''')
+    for anime_id, genres in cursor.execute("SELECT id, genres FROM anime WHERE genres IS NOT NULL").fetchall():
+        set_anime_genres(cursor, anime_id, split_genres(genres))
+
+
+# The per-row episode triggers, skipped while a row is in bulk_ingest. BulkWriter.flush inserts
+# that row inside its own transaction (so no other connection ever sees it) and brings the
+# search index and the counts up to date once per batch instead (see BulkWriter.flush).
+EPISODE_TRIGGERS = '''
+    CREATE TRIGGER episode_fts_insert AFTER INSERT ON episodes
+    WHEN NOT EXISTS (SELECT 1 FROM bulk_ingest) BEGIN
+        INSERT INTO episode_fts (rowid, title) VALUES (new.id, new.title);
+    END;
+    CREATE TRIGGER episode_fts_delete AFTER DELETE ON episodes
+    WHEN NOT EXISTS (SELECT 1 FROM bulk_ingest) BEGIN
+        INSERT INTO episode_fts (episode_fts, rowid, title) VALUES ('delete', old.id, old.title);
+    END;
+    CREATE TRIGGER episode_fts_update AFTER UPDATE OF title ON episodes
+    WHEN old.title IS NOT new.title AND NOT EXISTS (SELECT 1 FROM bulk_ingest) BEGIN
+        INSERT INTO episode_fts (episode_fts, rowid, title) VALUES ('delete', old.id, old.title);
+        INSERT INTO episode_fts (rowid, title) VALUES (new.id, new.title);
+    END;
+
+    CREATE TRIGGER anime_counts_insert AFTER INSERT ON episodes
+    WHEN NOT EXISTS (SELECT 1 FROM bulk_ingest) BEGIN
+        UPDATE anime SET episode_count = episode_count + 1, watched_count = watched_count + (new.is_watched != 0)
+        WHERE id = new.anime_id;
+    END;
+    CREATE TRIGGER anime_counts_delete AFTER DELETE ON episodes
+    WHEN NOT EXISTS (SELECT 1 FROM bulk_ingest) BEGIN
+        UPDATE anime SET episode_count = episode_count - 1, watched_count = watched_count - (old.is_watched != 0)
+        WHERE id = old.anime_id;
+    END;
+    CREATE TRIGGER anime_counts_update AFTER UPDATE OF anime_id, is_watched ON episodes
+    WHEN (old.anime_id IS NOT new.anime_id OR (old.is_watched != 0) != (new.is_watched != 0))
+    AND NOT EXISTS (SELECT 1 FROM bulk_ingest) BEGIN
+        UPDATE anime SET episode_count = episode_count - 1, watched_count = watched_count - (old.is_watched != 0)
+        WHERE id = old.anime_id;
+        UPDATE anime SET episode_count = episode_count + 1, watched_count = watched_count + (new.is_watched != 0)
+        WHERE id = new.anime_id;
+    END;
+'''
+
+
+def migrate_bulk_triggers(cursor):
+    """Version 3: lets BulkWriter skip the per-row episode triggers and catch up once per batch."""
+    cursor.execute("CREATE TABLE IF NOT EXISTS bulk_ingest (active INTEGER)")
+    for name in ('episode_fts_insert', 'episode_fts_delete', 'episode_fts_update',
+                 'anime_counts_insert', 'anime_counts_delete', 'anime_counts_update'):
+        cursor.execute(f"DROP TRIGGER IF EXISTS {name}")
+    cursor.executescript(EPISODE_TRIGGERS)
+
+
+# Applied in order by DatabaseManager.init_db; the database's PRAGMA user_version is how many have run.
+# Never edit a released migration, append a new one. Migrations must be safe to run again after failing
+# part-way (IF NOT EXISTS, add_column): executescript() commits as it goes, so a step isn't atomic.
+MIGRATIONS = [migrate_base_schema, migrate_genres, migrate_bulk_triggers]
+SCHEMA_VERSION = len(MIGRATIONS)
+
+WATCH_STATES = {'unwatched': 0, 'in_progress': 1, 'watched': 2}
+
+
+def split_genres(genres):
+    """Genre names from a comma-joined string (as JikanAPI returns them) or a list."""
+    if not genres:
+        return []
+    if isinstance(genres, str):
+        genres = genres.split(",")
+    return list(dict.fromkeys(name.strip() for name in genres if name and name.strip()))
+
+
+def set_anime_genres(cursor, anime_id, names):
+    """Replaces a series' genre rows with `names`, creating genres on first sight."""
+    cursor.execute("DELETE FROM anime_genre WHERE anime_id = ?", (anime_id,))
+    if not names:
+        return
+    cursor.executemany("INSERT OR IGNORE INTO genre (name) VALUES (?)", [(name,) for name in names])
+    cursor.execute(f"INSERT OR IGNORE INTO anime_genre (anime_id, genre_id) "
+                   f"SELECT ?, id FROM genre WHERE name IN ({', '.join('?' * len(names))})", [anime_id, *names])
+
+
+def prefix_range(path):
+    """(low, high) bounds matching every path strictly inside directory `path`.
+
+    Used as a range scan on an indexed path column instead of LIKE, so it stays indexed.
+    """
+    prefix = os.path.join(str(path), "")
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+
+def connect(db_path, read_only=False):
+    """Opens a connection tuned for the WAL-mode library database."""
+    if read_only:
+        conn = sqlite3.connect(f"{Path(db_path).absolute().as_uri()}?mode=ro", uri=True, timeout=10)
+        conn.execute("PRAGMA query_only = ON")
+    else:
+        conn = sqlite3.connect(db_path, timeout=10)
+        # WAL is durable across commits with NORMAL; only a power loss can drop the last commits
+        conn.execute("PRAGMA synchronous = NORMAL")
+    return conn
+
+
+class BulkWriter:
+    """Buffers scan writes on a single connection and commits them in large transactions.
+
+    Rows are flushed with executemany once `batch_size` rows are pending or
+    `flush_interval` seconds have passed since the last flush. Use it from one
+    thread only and close it (or use it as a context manager) to flush the rest.
+
+    A flush skips the per-row episode triggers: it updates the search index
+    and the series' episode counts for the rows it touched in a few set-based
+    statements instead, which keeps ingest close to the cost of the upserts.
+    """
+
+    def __init__(self, db_path, batch_size=5000, flush_interval=1.0, on_flush=None):
+        self.conn = connect(db_path)
+        # Keys of the episodes in the batch being flushed, and those episodes before and after it
+        self.conn.execute("CREATE TEMP TABLE IF NOT EXISTS ingest_keys (file_path TEXT, file_hash TEXT)")
+        for table in ('ingest_before', 'ingest_after'):
+            self.conn.execute(f"CREATE TEMP TABLE IF NOT EXISTS {table} "
+                              f"(id INTEGER PRIMARY KEY, title TEXT, anime_id INTEGER)")
+        # Called after every commit, once the written rows are visible to other connections
+        self.on_flush = on_flush
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.episodes = []
+        self.file_stats = []
+        self.completed_dirs = []
+        self.checkpoint_state = None
+        self.last_flush = time.monotonic()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def get_or_create_anime(self, title, path, poster=None):
+        # Committed right away: episode rows wait in memory until flush(), so this is the only
+        # open transaction and other writers (metadata updates) aren't locked out until the flush
+        res = self.conn.execute(ANIME_UPSERT, (title, path, poster)).fetchone()
+        self.conn.commit()
+        return res[0] if res else None
+
+    def get_anime_details(self, anime_id):
+        return self.conn.execute("SELECT * FROM anime WHERE id = ?", (anime_id,)).fetchone()
+
+    def add_episode(self, anime_id, file_path, season, episode, title, file_hash, thumbnail_path):
+        self.episodes.append((anime_id, file_path, file_hash, season, title, episode, thumbnail_path))
+        self.maybe_flush()
+
+    def update_file_index(self, file_path, size, mtime_ns, inode):
+        self.file_stats.append((file_path, size, mtime_ns, inode))
+        self.maybe_flush()
+
+    def complete_dir(self, root_path, dir_path):
+        """Marks a directory's files as done for the scan checkpoint of root_path."""
+        self.completed_dirs.append((root_path, dir_path))
+
+    def checkpoint(self, root_path, files_done):
+        """Records scan progress; written with the next flush, in the same transaction as the rows."""
+        self.checkpoint_state = (files_done, time.time(), root_path)
+
+    def maybe_flush(self):
+        pending = len(self.episodes) + len(self.file_stats)
+        if pending >= self.batch_size or time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Writes every buffered row in one transaction."""
+        with get_tracer().span("db_flush", cat="db", rows=len(self.episodes) + len(self.file_stats)):
+            try:
+                self._write_episodes()
+                self._write_many(FILE_INDEX_UPSERT, self.file_stats)
+                self._write_many("INSERT OR IGNORE INTO scan_completed_dirs (root_path, dir_path) VALUES (?, ?)",
+                                 self.completed_dirs)
+                if self.checkpoint_state is not None:
+                    self.conn.execute("UPDATE scan_checkpoint SET files_done = ?, updated_at = ? WHERE root_path = ?",
+                                      self.checkpoint_state)
+                self.conn.commit()
+            except BaseException:
+                # Also drops the bulk_ingest row, so the triggers never stay switched off
+                self.conn.rollback()
+                raise
+        self.episodes = []
+        self.file_stats = []
+        self.completed_dirs = []
+        self.checkpoint_state = None
+        self.last_flush = time.monotonic()
+        if self.on_flush:
+            self.on_flush()
+
+    def _write_episodes(self):
+        if not self.episodes: return
+        conn = self.conn
+        snapshot = ("SELECT id, title, anime_id FROM episodes WHERE file_path IN (SELECT file_path FROM ingest_keys) "
+                    "OR file_hash IN (SELECT file_hash FROM ingest_keys)")
+        conn.execute("INSERT INTO bulk_ingest (active) VALUES (1)")
+        conn.executemany("INSERT INTO ingest_keys (file_path, file_hash) VALUES (?, ?)",
+                         [(row[1], row[2]) for row in self.episodes])
+        conn.execute(f"INSERT INTO ingest_before {snapshot}")
+        self._write_many(EPISODE_UPSERT, self.episodes)
+        conn.execute(f"INSERT INTO ingest_after {snapshot}")
+
+        # Only new rows and rows whose title or series changed need any work
+        conn.execute('''INSERT INTO episode_fts (episode_fts, rowid, title)
+            SELECT 'delete', b.id, b.title FROM ingest_before b JOIN ingest_after a ON a.id = b.id
+            WHERE a.title IS NOT b.title''')
+        conn.execute('''INSERT INTO episode_fts (rowid, title)
+            SELECT a.id, a.title FROM ingest_after a LEFT JOIN ingest_before b ON b.id = a.id
+            WHERE b.id IS NULL OR a.title IS NOT b.title''')
+        conn.execute('''UPDATE anime SET
+            episode_count = (SELECT COUNT(*) FROM episodes WHERE episodes.anime_id = anime.id),
+            watched_count = (SELECT COUNT(*) FROM episodes WHERE episodes.anime_id = anime.id AND is_watched != 0)
+            WHERE id IN (
+                SELECT a.anime_id FROM ingest_after a LEFT JOIN ingest_before b ON b.id = a.id
+                WHERE b.id IS NULL OR a.anime_id IS NOT b.anime_id
+                UNION
+                SELECT b.anime_id FROM ingest_before b JOIN ingest_after a ON a.id = b.id
+                WHERE a.anime_id IS NOT b.anime_id)''')
+        for table in ('ingest_keys', 'ingest_before', 'ingest_after', 'bulk_ingest'):
+            conn.execute(f"DELETE FROM {table}")
+
+    def _write_many(self, query, rows):
+        if not rows: return
+        try:
+            self.conn.executemany(query, rows)
+        except sqlite3.IntegrityError:
+            # One bad row aborts the whole executemany; retry row by row so only it is lost
+            for row in rows:
+                try:
+                    self.conn.execute(query, row)
+                except sqlite3.IntegrityError as e:
+                    print(f"DB Error: {e}")
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self.conn.close()
+
+
 class DatabaseManager:
-    def __init__(self):
+    """Owns the library database.
+
+    Every thread gets its own long-lived connections: a read/write one from
+    get_connection() and a read-only one from get_read_connection() for UI
+    queries. The database runs in WAL mode, so readers never wait on a scan's
+    write transaction.
+    """
+
+    def __init__(self, db_path=None):
         base_dir = Path(__file__).parent.parent.absolute()
-        self.db_path = base_dir / "aniplay.db"
+        self.db_path = Path(db_path) if db_path else base_dir / "aniplay.db"
+        self._local = threading.local()
         self.init_db()
 
     def get_connection(self):
-        return sqlite3.connect(self.db_path)
+        """Returns this thread's persistent read/write connection."""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._local.conn = connect(self.db_path)
+        return conn
+
+    def get_read_connection(self):
+        """Returns this thread's persistent read-only connection."""
+        conn = getattr(self._local, 'read_conn', None)
+        if conn is None:
+            conn = self._local.read_conn = connect(self.db_path, read_only=True)
+        return conn
+
+    def close(self):
+        """Closes the calling thread's connections."""
+        for name in ('conn', 'read_conn'):
+            conn = getattr(self._local, name, None)
+            if conn is not None:
+                conn.close()
+                setattr(self._local, name, None)
 
     def init_db(self):
-        """Creates the full schema. Note: This only runs if the .db file is new/deleted."""
+        """Brings the database up to SCHEMA_VERSION, running each migration it hasn't had yet."""
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            # Anime Table
-            cursor.execute('''CREATE TABLE IF NOT EXISTS anime (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                title TEXT NOT NULL,
-                folder_path TEXT UNIQUE,
-                poster_path TEXT,
-                mal_id INTEGER,
-                rating REAL,
-                synopsis TEXT,
-                genres TEXT
-            )''')
-
-            # Episode Table - Including 'title' and 'episode_num'
-            cursor.execute('''CREATE TABLE IF NOT EXISTS episodes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                anime_id INTEGER,
-                file_path TEXT UNIQUE,
-                file_hash TEXT UNIQUE,
-                season INTEGER,
-                title TEXT,
-                episode_num INTEGER,
-                thumbnail_path TEXT,
-                last_position REAL DEFAULT 0,
-                is_watched INTEGER DEFAULT 0,
-                FOREIGN KEY(anime_id) REFERENCES anime(id) ON DELETE CASCADE
-            )''')
-            conn.commit()
+            # A normal launch only needs this one read; the DDL runs once per schema version
+            version = cursor.execute("PRAGMA user_version").fetchone()[0]
+            for number, migration in enumerate(MIGRATIONS[version:], version + 1):
+                migration(cursor)
+                # Recorded after each step, so a failed migration runs again, from its start, on the next launch
+                cursor.execute(f"PRAGMA user_version = {number}")
+                conn.commit()
 
     def get_or_create_anime(self, title, path, poster=None):
         with self.get_connection() as conn:
             cursor = conn.cursor()
-            cursor.execute('''
-                INSERT INTO anime (title, folder_path, poster_path)
-                VALUES (?, ?, ?)
-                ON CONFLICT(folder_path) DO UPDATE SET
-                poster_path = COALESCE(excluded.poster_path, anime.poster_path)
-                RETURNING id
-            ''', (title, path, poster))
+            cursor.execute(ANIME_UPSERT, (title, path, poster))
             res = cursor.fetchone()
             return res[0] if res else None
 
     def add_episode(self, anime_id, file_path, season, episode, title, file_hash, thumbnail_path):
         """Saves the title extracted by the scanner."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(EPISODE_UPSERT, (anime_id, file_path, file_hash, season, title, episode, thumbnail_path))
+            conn.commit()
+
+    def get_file_index(self, root_path):
+        """Returns {file_path: (size, mtime_ns, inode)} for every indexed file under root_path."""
+        prefix, upper = prefix_range(root_path)
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT file_path, size, mtime_ns, inode FROM file_index WHERE file_path >= ? AND file_path < ?",
+                           (prefix, upper))
+            return {row[0]: tuple(row[1:]) for row in cursor.fetchall()}
+
+    def update_file_index(self, file_path, size, mtime_ns, inode):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(FILE_INDEX_UPSERT, (file_path, size, mtime_ns, inode))
+            conn.commit()
+
+    def delete_paths(self, paths):
+        """Removes the episodes and file index entries at or under each path.
+
+        Series whose folder is at or under one of the paths are removed too,
+        once they have no episodes left. Returns the number of episodes deleted.
+        """
+        deleted = 0
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            for path in paths:
+                path = str(path)
+                prefix, upper = prefix_range(path)
+                params = (path, prefix, upper)
+                cursor.execute("DELETE FROM episodes WHERE file_path = ? OR (file_path >= ? AND file_path < ?)", params)
+                deleted += cursor.rowcount
+                cursor.execute("DELETE FROM file_index WHERE file_path = ? OR (file_path >= ? AND file_path < ?)", params)
+                cursor.execute("DELETE FROM anime WHERE (folder_path = ? OR (folder_path >= ? AND folder_path < ?)) "
+                               "AND NOT EXISTS (SELECT 1 FROM episodes WHERE episodes.anime_id = anime.id)", params)
+            conn.commit()
+        return deleted
+
+    def get_scan_checkpoint(self, root_path):
+        """Returns (status, started_at, updated_at, files_done) of an unfinished scan of root_path, or None."""
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT status, started_at, updated_at, files_done FROM scan_checkpoint WHERE root_path = ?",
+                           (str(root_path),))
+            return cursor.fetchone()
+
+    def get_completed_dirs(self, root_path):
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT dir_path FROM scan_completed_dirs WHERE root_path = ?", (str(root_path),))
+            return {row[0] for row in cursor.fetchall()}
+
+    def start_scan_checkpoint(self, root_path):
+        """Marks a scan of root_path as running, keeping the progress of an earlier unfinished one."""
+        now = time.time()
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute('''
-                INSERT INTO episodes (anime_id, file_path, file_hash, season, title, episode_num, thumbnail_path)
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-                ON CONFLICT(file_hash) DO UPDATE SET
-                file_path = excluded.file_path,
-                title = COALESCE(excluded.title, episodes.title),
-                thumbnail_path = COALESCE(excluded.thumbnail_path, episodes.thumbnail_path)
-            ''', (anime_id, file_path, file_hash, season, title, episode, thumbnail_path))
+                INSERT INTO scan_checkpoint (root_path, status, started_at, updated_at) VALUES (?, 'running', ?, ?)
+                ON CONFLICT(root_path) DO UPDATE SET status = 'running', updated_at = excluded.updated_at
+            ''', (str(root_path), now, now))
+            conn.commit()
+
+    def set_scan_status(self, root_path, status):
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("UPDATE scan_checkpoint SET status = ?, updated_at = ? WHERE root_path = ?",
+                           (status, time.time(), str(root_path)))
+            conn.commit()
+
+    def clear_scan_checkpoint(self, root_path):
+        """Forgets the checkpoint once a scan of root_path has finished."""
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM scan_completed_dirs WHERE root_path = ?", (str(root_path),))
+            cursor.execute("DELETE FROM scan_checkpoint WHERE root_path = ?", (str(root_path),))
             conn.commit()
 
+    def get_file_hashes(self):
+        """Returns the set of every episode's file_hash."""
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT file_hash FROM episodes WHERE file_hash IS NOT NULL")
+            return {row[0] for row in cursor.fetchall()}
+
+    def bulk_writer(self, batch_size=5000, flush_interval=1.0, on_flush=None):
+        """Returns a BulkWriter for high-volume ingest (e.g. a library scan)."""
+        return BulkWriter(self.db_path, batch_size=batch_size, flush_interval=flush_interval, on_flush=on_flush)
+
     def get_episodes(self, anime_id):
         """Returns 5 columns for the UI to unpack."""
         query = """
@@ -78,26 +637,227 @@ class DatabaseManager:
                 WHERE anime_id = ? 
                 ORDER BY episode_num ASC
                 """
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute(query, (anime_id,))
             return cursor.fetchall()
 
-    def get_library(self):
+    def get_episodes_page(self, anime_id, after=None, limit=200, season=None):
+        """Keyset-paginated get_episodes: the `limit` episodes after the (episode_num, id) key `after`.
+
+        Rows are (id, file_path, thumbnail_path, title, episode_num, season).
+        """
+        where = "anime_id = ?"
+        params = [anime_id]
+        if season is not None:
+            where += " AND season = ?"
+            params.append(season)
+        if after is not None:
+            where += " AND (episode_num, id) > (?, ?)"
+            params.extend(after)
+        query = f"""
+                SELECT id, file_path, thumbnail_path, title, episode_num, season
+                FROM episodes
+                WHERE {where}
+                ORDER BY episode_num ASC, id ASC
+                LIMIT ?
+                """
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(query, (*params, limit))
+            return cursor.fetchall()
+
+    def get_episode_by_path(self, file_path):
+        """Returns (id, anime_id) of the episode at file_path, or None."""
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT id, anime_id FROM episodes WHERE file_path = ?", (str(file_path),))
+            return cursor.fetchone()
+
+    def get_playback_state(self, episode_id):
+        """Returns (last_position, is_watched) of an episode, or None."""
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT last_position, is_watched FROM episodes WHERE id = ?", (episode_id,))
+            return cursor.fetchone()
+
+    def save_playback_state(self, rows):
+        """Writes (episode_id, position, watched) rows in one transaction; None leaves a column as it is."""
         with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.executemany("UPDATE episodes SET last_position = COALESCE(?, last_position), "
+                               "is_watched = COALESCE(?, is_watched) WHERE id = ?",
+                               [(position, None if watched is None else int(watched), episode_id)
+                                for episode_id, position, watched in rows])
+            conn.commit()
+
+    def get_seasons(self, anime_id):
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT DISTINCT season FROM episodes WHERE anime_id = ? AND season IS NOT NULL "
+                           "ORDER BY season", (anime_id,))
+            return [row[0] for row in cursor.fetchall()]
+
+    def get_library(self):
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT id, title, poster_path, rating FROM anime ORDER BY title ASC")
             return cursor.fetchall()
 
+    def get_library_rows(self, anime_ids):
+        """get_library() rows for the given ids, in the order given."""
+        if not anime_ids:
+            return []
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(f"SELECT id, title, poster_path, rating FROM anime WHERE id IN "
+                           f"({', '.join('?' * len(anime_ids))})", list(anime_ids))
+            rows = {row[0]: row for row in cursor.fetchall()}
+        return [rows[anime_id] for anime_id in anime_ids if anime_id in rows]
+
+    def get_library_version(self):
+        """Cheap fingerprint of the anime table; changes when series are added or removed."""
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COUNT(*), MAX(id) FROM anime")
+            return cursor.fetchone()
+
+    def search_library(self, match_query, limit=50, is_cancelled=None):
+        """Full-text search; returns get_library() rows ranked by relevance.
+
+        `match_query` is an FTS5 query (see core.search). If `is_cancelled` is
+        given it's polled while the query runs, and a true result aborts it
+        with sqlite3.OperationalError.
+        """
+        with self.get_read_connection() as conn:
+            if is_cancelled is not None:
+                conn.set_progress_handler(is_cancelled, 1000)
+            try:
+                cursor = conn.cursor()
+                cursor.execute(SEARCH_QUERY, {'query': match_query, 'limit': limit})
+                return cursor.fetchall()
+            finally:
+                if is_cancelled is not None:
+                    conn.set_progress_handler(None, 0)
+
     def get_anime_details(self, anime_id):
-        with self.get_connection() as conn:
+        with self.get_read_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("SELECT * FROM anime WHERE id = ?", (anime_id,))
             return cursor.fetchone()
 
     def update_anime_metadata(self, anime_id, mal_id, rating, synopsis, genres):
+        """Saves looked-up metadata; `genres` is a comma-joined string or a list of names."""
+        names = split_genres(genres)
         with self.get_connection() as conn:
             cursor = conn.cursor()
             cursor.execute("UPDATE anime SET mal_id=?, rating=?, synopsis=?, genres=? WHERE id=?",
-                           (mal_id, rating, synopsis, genres, anime_id))
-            conn.commit()
\ No newline at end of file
+                           (mal_id, rating, synopsis, ", ".join(names) or None, anime_id))
+            set_anime_genres(cursor, anime_id, names)
+            conn.commit()
+
+    def get_genres(self):
+        """Returns (name, series count) for every genre in the library, by name."""
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT g.name, COUNT(*) FROM anime_genre ag JOIN genre g ON g.id = ag.genre_id
+                GROUP BY ag.genre_id ORDER BY g.name
+            ''')
+            return cursor.fetchall()
+
+    def filter_library(self, genres=(), match_all=True, min_rating=None, max_rating=None, watched=None,
+                       limit=None):
+        """Faceted library filter. Returns (rows, facets).
+
+        `rows` are get_library() rows, by title, of the series that have all of
+        `genres` (any of them if not `match_all`), a rating within
+        [min_rating, max_rating] and a watch state among `watched` (a
+        WATCH_STATES key or a list of them). `facets` counts the matching
+        series (all of them, whatever `limit` says) by genre, by watch state
+        and by whole-number rating:
+        {'genres': {name: n}, 'watch_state': {state: n}, 'rating': {7: n, ...}}.
+
+        Every filter is answered from an index, not by scanning the anime
+        table or anime_genre: a genre filter walks idx_anime_genre_genre for
+        the first genre and checks each further one with a primary key lookup
+        (EXISTS), ratings use idx_anime_rating and watch states
+        idx_anime_watch_state. Rows and genre counts come from one query.
+        """
+        conditions, params, source = [], [], "anime a"
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            if genres:
+                names = split_genres(genres)
+                cursor.execute(f"SELECT id FROM genre WHERE name IN ({', '.join('?' * len(names))})", names)
+                genre_ids = [row[0] for row in cursor.fetchall()]
+                if not genre_ids or (match_all and len(genre_ids) < len(names)):
+                    return [], {'genres': {}, 'watch_state': {}, 'rating': {}}
+                if match_all:
+                    source = "anime_genre g JOIN anime a ON a.id = g.anime_id"
+                    conditions.append("g.genre_id = ?")
+                    conditions.extend("EXISTS (SELECT 1 FROM anime_genre x WHERE x.anime_id = g.anime_id "
+                                      "AND x.genre_id = ?)" for _ in genre_ids[1:])
+                else:
+                    source = (f"(SELECT DISTINCT anime_id FROM anime_genre "
+                              f"WHERE genre_id IN ({', '.join('?' * len(genre_ids))})) g JOIN anime a ON a.id = g.anime_id")
+                params.extend(genre_ids)
+            if min_rating is not None:
+                conditions.append("a.rating >= ?")
+                params.append(min_rating)
+            if max_rating is not None:
+                conditions.append("a.rating <= ?")
+                params.append(max_rating)
+            if watched is not None:
+                states = [WATCH_STATES[state] for state in ([watched] if isinstance(watched, str) else watched)]
+                conditions.append(f"a.watch_state IN ({', '.join('?' * len(states))})")
+                params.extend(states)
+
+            where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+            # Materialized, so the filter runs once; CROSS JOIN keeps matched as the outer loop, so genres are
+            # looked up per matching series. Kind 0 rows are the series (by title), kind 1 the genre facet (by name)
+            cursor.execute(f'''
+                WITH matched AS MATERIALIZED (
+                    SELECT a.id, a.title, a.poster_path, a.rating, a.watch_state FROM {source} {where})
+                SELECT 0, title, id, poster_path, rating, watch_state FROM matched
+                UNION ALL
+                SELECT 1, g.name, COUNT(*), NULL, NULL, NULL FROM matched m
+                CROSS JOIN anime_genre ag ON ag.anime_id = m.id JOIN genre g ON g.id = ag.genre_id
+                GROUP BY ag.genre_id
+                ORDER BY 1, 2
+            ''', params)
+            matches, genre_counts = [], {}
+            for kind, key, value, poster, rating, state in cursor.fetchall():
+                if kind:
+                    genre_counts[key] = value
+                else:
+                    matches.append((value, key, poster, rating, state))
+
+        state_names = {value: name for name, value in WATCH_STATES.items()}
+        facets = {'genres': genre_counts, 'watch_state': {}, 'rating': {}}
+        for _, _, _, rating, state in matches:
+            name = state_names[state]
+            facets['watch_state'][name] = facets['watch_state'].get(name, 0) + 1
+            if rating is not None:
+                facets['rating'][int(rating)] = facets['rating'].get(int(rating), 0) + 1
+        rows = [row[:4] for row in (matches[:limit] if limit else matches)]
+        return rows, facets
+
+    def get_cached_metadata(self, title_key):
+        """Returns (status, mal_id, rating, synopsis, genres, fetched_at) or None."""
+        with self.get_read_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT status, mal_id, rating, synopsis, genres, fetched_at FROM metadata_cache "
+                           "WHERE title_key = ?", (title_key,))
+            return cursor.fetchone()
+
+    def cache_metadata(self, title_key, status, metadata, fetched_at):
+        metadata = metadata or {}
+        with self.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                INSERT OR REPLACE INTO metadata_cache (title_key, status, mal_id, rating, synopsis, genres, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (title_key, status, metadata.get('mal_id'), metadata.get('rating'), metadata.get('synopsis'),
+                  metadata.get('genres'), fetched_at))
+            conn.commit()
@@ -0,0 +1,65 @@
+import os
+import sys
+from collections import namedtuple
+
+from .watcher import NETWORK_FILESYSTEMS, filesystem_type
+
+HDD, SSD, NETWORK, UNKNOWN = "hdd", "ssd", "network", "unknown"
+
+# Files read at once per device: a spinning disk thrashes on parallel reads, flash and NAS shares don't
+DEFAULT_IO_LIMITS = {HDD: 1, SSD: 4, NETWORK: 4, UNKNOWN: 2}
+
+
+class Device(namedtuple('Device', 'dev kind roots')):
+    """The library roots that live on one storage device (one st_dev)."""
+    __slots__ = ()
+
+
+def _rotational(dev):
+    """Reads /sys/.../queue/rotational for a block device; None if it can't be told (e.g. not Linux)."""
+    try:
+        block = os.path.realpath(f"/sys/dev/block/{os.major(dev)}:{os.minor(dev)}")
+    except (AttributeError, OSError):
+        return None
+    # Partitions have no queue/ of their own; it's on the parent disk
+    for folder in (block, os.path.dirname(block)):
+        try:
+            with open(os.path.join(folder, "queue", "rotational")) as f:
+                return f.read().strip() == "1"
+        except OSError:
+            continue
+    return None
+
+
+def _is_network_path(path):
+    if sys.platform == "win32":
+        if path.startswith("\\\\"):
+            return True
+        import ctypes
+        drive = os.path.splitdrive(os.path.abspath(path))[0] + "\\"
+        # DRIVE_REMOTE: a mapped network drive
+        return ctypes.windll.kernel32.GetDriveTypeW(drive) == 4
+    return filesystem_type(path) in NETWORK_FILESYSTEMS
+
+
+def device_kind(path, dev=None):
+    """Classifies the storage `path` is on as HDD, SSD, NETWORK or UNKNOWN."""
+    if _is_network_path(str(path)):
+        return NETWORK
+    if dev is None:
+        dev = os.stat(path).st_dev
+    rotational = _rotational(dev)
+    if rotational is None:
+        return UNKNOWN
+    return HDD if rotational else SSD
+
+
+def group_by_device(roots):
+    """Groups library roots by st_dev, in the order each device first appears."""
+    devices = {}
+    for root in roots:
+        dev = os.stat(root).st_dev
+        if dev not in devices:
+            devices[dev] = Device(dev, device_kind(root, dev), [])
+        devices[dev].roots.append(root)
+    return list(devices.values())
@@ -1,35 +1,80 @@
 from PySide6.QtCore import QObject, QThreadPool, Signal, Slot
 from .database import DatabaseManager
-from .scanner import ScannerWorker
+from .playback import PlaybackStateService
 
 
 class AniplayCore(QObject):
+    """Owns the database, the metadata service, playback state and the running scans.
+
+    The scanner (xxhash, ffmpeg helpers) and the metadata service (requests)
+    are only imported when first used, so constructing the core at startup
+    costs little more than opening the database.
+    """
     # Signals to update the UI
-    scan_progress = Signal(int)
+    scan_progress = Signal(object)  # core.progress.ScanProgress
     scan_finished = Signal()
 
-    def __init__(self):
+    def __init__(self, db=None, metadata=None):
         super().__init__()
-        self.db = DatabaseManager()
+        self.db = db or DatabaseManager()
+        self._metadata = metadata
+        # Positions and watched flags are written behind, in batches; see PlaybackStateService
+        self.playback = PlaybackStateService(self.db)
         self.thread_pool = QThreadPool.globalInstance()
         self.active_tasks = 0
+        # Running scans, so they can be cancelled
+        self.scans = []
+
+    @property
+    def metadata(self):
+        """Shared by every scan so lookups stay deduplicated and rate limited."""
+        if self._metadata is None:
+            from .metadata import MetadataService
+            self._metadata = MetadataService(self.db)
+        return self._metadata
 
-    def start_library_scan(self, root_path):
-        """Launches a background scan of the user's library."""
+    def start_library_scan(self, root_path, **kwargs):
+        """Launches a background scan of the user's library; resumes an unfinished one of the same root.
+
+        `root_path` may be a list of roots; they're scanned device by device, see MultiRootScanner.
+        """
+        from .tasks import ScannerWorker
         self.active_tasks += 1
-        worker = ScannerWorker(root_path, self.db)
+        worker = ScannerWorker(root_path, self.db, metadata_service=self.metadata, **kwargs)
+        self.scans.append(worker)
 
         # Connect signals to track task completion
         worker.signals.progress.connect(self.scan_progress.emit)
-        worker.signals.finished.connect(self._on_task_finished)
+        worker.signals.finished.connect(lambda count, worker=worker: self._on_task_finished(worker))
 
         self.thread_pool.start(worker)
+        return worker
+
+    def cancel_scans(self):
+        """Stops every running scan at its next file; their checkpoints are kept for the next scan."""
+        for worker in self.scans:
+            worker.cancel()
 
-    def _on_task_finished(self):
+    def _on_task_finished(self, worker):
         self.active_tasks -= 1
+        if worker in self.scans:
+            self.scans.remove(worker)
         if self.active_tasks == 0:
             self.scan_finished.emit()
 
+    def shutdown(self):
+        """Stops the scans (keeping their checkpoints) and saves unwritten playback state."""
+        self.cancel_scans()
+        self.playback.close()
+
     def is_busy(self):
         """Returns True if any background thread is currently running."""
-        return self.active_tasks > 0
\ No newline at end of file
+        return self.active_tasks > 0
+
+    def is_scanning(self):
+        return bool(self.scans)
+
+    def has_unfinished_scan(self, root_path):
+        """True if a scan of root_path (or one of a list of roots) was cancelled or interrupted."""
+        roots = root_path if isinstance(root_path, (list, tuple)) else [root_path]
+        return any(self.db.get_scan_checkpoint(root) is not None for root in roots)
\ No newline at end of file
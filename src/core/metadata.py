@@ -0,0 +1,144 @@
+import queue
+import re
+import threading
+import time
+
+
+def normalize_title(title):
+    """Folds a folder name to a lookup key: lowercase, no brackets or punctuation."""
+    title = re.sub(r'\[[^\]]*\]|\([^)]*\)', ' ', title.lower())
+    return " ".join(re.sub(r'[^\w]+', ' ', title).split())
+
+
+class MetadataCache:
+    """Persistent cache of Jikan lookups, keyed by normalized title.
+
+    Stored in the library database's metadata_cache table. Misses ("no
+    result") and errors are cached too, with their own shorter TTLs, so a
+    title that failed isn't retried on every scan.
+    """
+    HIT = "hit"
+    MISS = "miss"
+    ERROR = "error"
+
+    def __init__(self, db_manager, ttl=30 * 86400, miss_ttl=7 * 86400, error_ttl=3600):
+        self.db = db_manager
+        self.ttls = {self.HIT: ttl, self.MISS: miss_ttl, self.ERROR: error_ttl}
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Returns (status, metadata) for a fresh entry, or None if the title has to be fetched."""
+        row = self.db.get_cached_metadata(key)
+        fresh = row is not None and time.time() - row[5] < self.ttls.get(row[0], 0)
+        with self._lock:
+            if fresh:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if not fresh:
+            return None
+
+        status, mal_id, rating, synopsis, genres = row[:5]
+        if status != self.HIT:
+            return status, None
+        return status, {"mal_id": mal_id, "rating": rating, "synopsis": synopsis, "genres": genres}
+
+    def put(self, key, status, metadata=None):
+        self.db.cache_metadata(key, status, metadata, time.time())
+
+    def stats(self):
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses}
+
+
+class MetadataService:
+    """Fetches anime metadata on background threads so scans never wait on the network.
+
+    Lookups are queued with enqueue() and deduplicated by normalized title:
+    several folders with the same title share one request. Results are
+    answered from the MetadataCache when possible; everything else goes
+    through JikanAPI, which applies Jikan's rate limits and retries.
+    """
+
+    def __init__(self, db_manager, api=None, workers=2, on_update=None, cache=None):
+        self.db = db_manager
+        if api is None:
+            # requests is only imported once metadata is actually needed
+            from .api import JikanAPI
+            api = JikanAPI()
+        self.api = api
+        self.cache = cache or MetadataCache(db_manager)
+        self.workers = workers
+        # Called with the anime id after its metadata has been saved
+        self.on_update = on_update
+        self.queue = queue.Queue()
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def enqueue(self, anime_id, title):
+        """Schedules a lookup; returns False if the same title is already in flight."""
+        key = normalize_title(title)
+        with self._lock:
+            if key in self._in_flight:
+                self._in_flight[key][1].add(anime_id)
+                return False
+            self._in_flight[key] = (title, {anime_id})
+            self._start()
+        self.queue.put(key)
+        return True
+
+    def wait(self, timeout=None):
+        """Blocks until every queued lookup has finished. Returns False on timeout."""
+        with self.queue.all_tasks_done:
+            return self.queue.all_tasks_done.wait_for(lambda: not self.queue.unfinished_tasks, timeout)
+
+    def _start(self):
+        if self._threads: return
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"metadata-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def lookup(self, key, title):
+        """Returns metadata for a title from the cache, falling back to Jikan."""
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached[1]
+
+        try:
+            metadata = self.api.fetch_anime(title)
+        except Exception as e:
+            print(f"API Error for {title}: {e}")
+            self.cache.put(key, MetadataCache.ERROR)
+            return None
+
+        self.cache.put(key, MetadataCache.HIT if metadata else MetadataCache.MISS, metadata)
+        return metadata
+
+    def _work(self):
+        while True:
+            key = self.queue.get()
+            try:
+                with self._lock:
+                    title = self._in_flight[key][0]
+                metadata = self.lookup(key, title)
+
+                # Ids enqueued while the request ran are picked up here too
+                with self._lock:
+                    anime_ids = self._in_flight.pop(key)[1]
+                if metadata:
+                    for anime_id in anime_ids:
+                        self.db.update_anime_metadata(anime_id, metadata['mal_id'], metadata['rating'],
+                                                      metadata['synopsis'], metadata['genres'])
+                        if self.on_update:
+                            self.on_update(anime_id)
+            except Exception as e:
+                print(f"Metadata Error for {key}: {e}")
+            finally:
+                # A failed lookup must not leave the title marked as in flight forever
+                with self._lock:
+                    self._in_flight.pop(key, None)
+                self.queue.task_done()
@@ -1,38 +1,132 @@
+import os
 import re
-from pathlib import Path
+from collections import namedtuple
+
+VIDEO_EXTENSIONS = ('.mkv', '.mp4', '.avi', '.mov')
+
+ParsedName = namedtuple('ParsedName', 'season episode version title episode_title resolution crc group')
+
+# Every token the parser cares about, matched in a single left-to-right pass
+TOKEN_PATTERN = re.compile(r'''
+    (?=[\[(\-\dSsEe])   # cheap first-character check, so most positions skip the alternatives below
+    (?:
+      \[(?P<bracket>[^\]]*)\]                                                   # [Group] [1080p] [ABCD1234]
+    | \((?P<paren>[^)]*)\)                                                      # (2019) (BD 1080p)
+    | (?P<se>\b(?:S(?P<se_s>\d{1,2})\s?E|(?P<se_x>\d{1,2})x)(?P<se_e>\d{1,4})(?:v(?P<se_v>\d))?\b)  # S01E01 / 2x05
+    | (?P<dash>(?:^|(?<=\s))-\s*(?P<dash_e>\d{1,4})(?:v(?P<dash_v>\d))?(?=[\s\[(]|$))  # " - 01" / " - 01v2"
+    | (?P<kw>\b(?:episode|ep|e)\s?(?P<kw_e>\d{1,4})(?:v(?P<kw_v>\d))?\b)        # Episode 01 / Ep01 / E01
+    | (?P<season>\b(?:season\s?|S)(?P<season_n>\d{1,2})\b)                      # Season 2 / S2
+    | (?P<res>\b(?:\d{3,4}[pi]|\d{3,4}x\d{3,4}|4k)\b)                           # 1080p / 1920x1080
+    | (?P<num>\b(?P<num_e>\d{1,4})(?:v(?P<num_v>\d))?\b)                        # bare number
+    )
+''', re.I | re.X)
+
+RESOLUTION_PATTERN = re.compile(r'(?<!\d)(\d{3,4}[pi]|\d{3,4}x\d{3,4}|4k)\b', re.I)
+CRC_PATTERN = re.compile(r'^[0-9A-Fa-f]{8}$')
+YEAR_PATTERN = re.compile(r'^(?:19|20)\d\d$')
+# An episode title runs until the first tag or resolution after the episode number
+TAIL_END_PATTERN = re.compile(r'[\[(]|\b\d{3,4}[pi]\b', re.I)
+
+# Episode markers, most specific first. Bare numbers are only a fallback.
+MARKER_PRIORITY = {'se': 0, 'dash': 1, 'kw': 2}
 
 
 class EpisodeParser:
+    """Parses release names like "[Group] Title - 01v2 [1080p][ABCD1234].mkv".
+
+    Each name is tokenized in one regex pass. Season folders ("Season 02")
+    are matched once per parent directory and memoized.
+    """
+
     def __init__(self):
-        # Pattern 1: S01E01 or s1e1
-        self.se_pattern = re.compile(r'[Ss](\d+)[Ee](\d+)', re.I)
-        # Pattern 2: "Episode 01" or "Ep 01"
-        self.ep_only_pattern = re.compile(r'(?:episode|ep|e)\s*(\d+)', re.I)
-        # Pattern 3: Season folder names like "Season 02"
+        # Season folder names like "Season 02"
         self.season_folder_pattern = re.compile(r'season\s*(\d+)', re.I)
+        self._folder_seasons = {}
+
+    def folder_season(self, parent):
+        """Season from a "Season XX" parent folder (0 if none), memoized per directory."""
+        season = self._folder_seasons.get(parent)
+        if season is None:
+            folder_match = self.season_folder_pattern.search(os.path.basename(parent))
+            season = self._folder_seasons[parent] = int(folder_match.group(1)) if folder_match else 0
+        return season
+
+    def parse(self, file_path):
+        parent, filename = os.path.split(file_path)
+        stem = os.path.splitext(filename)[0].replace('_', ' ')
+        if ' ' not in stem:
+            # Scene-style names use dots as spaces
+            stem = stem.replace('.', ' ')
+
+        group = resolution = crc = season = marker = None
+        title_start, title_end = 0, None
+
+        for match in TOKEN_PATTERN.finditer(stem):
+            kind = match.lastgroup
+            if kind == 'num':
+                # Numbers are often part of the title ("Mob Psycho 100"), see the fallback below
+                continue
+
+            if kind in ('bracket', 'paren'):
+                tag = match.group(kind).strip()
+                if CRC_PATTERN.match(tag):
+                    crc = tag.upper()
+                elif resolution is None:
+                    res_match = RESOLUTION_PATTERN.search(tag)
+                    if res_match:
+                        resolution = res_match.group(1).lower()
+                if title_end is None and not stem[title_start:match.start()].strip():
+                    # Tags in front of the title; the first bracket is the release group
+                    if kind == 'bracket' and group is None and crc is None:
+                        group = tag
+                    title_start = match.end()
+                    continue
+            elif kind == 'res':
+                if resolution is None:
+                    resolution = match.group('res').lower()
+            elif kind == 'season':
+                season = int(match.group('season_n'))
+            else:
+                if marker is None or MARKER_PRIORITY[kind] < MARKER_PRIORITY[marker.lastgroup]:
+                    marker = match
+                if kind == 'se':
+                    season = int(match.group('se_s') or match.group('se_x'))
+
+            if title_end is None:
+                title_end = match.start()
+
+        if marker is None:
+            # Fallback: the last bare number after the title that isn't a year ("Title 01.mkv")
+            numbers = [match for match in TOKEN_PATTERN.finditer(stem, title_start)
+                       if match.lastgroup == 'num' and not YEAR_PATTERN.match(match.group('num_e'))]
+            if numbers:
+                marker = numbers[-1]
+
+        episode, version, episode_title = 0, 1, None
+        if marker is not None:
+            kind = marker.lastgroup
+            episode = int(marker.group(f'{kind}_e'))
+            version = int(marker.group(f'{kind}_v') or 1)
+            title_end = marker.start() if title_end is None else min(title_end, marker.start())
+
+            # "Title - 01 - Episode Title [1080p]" or "Title - 01 Episode Title"
+            if kind in ('se', 'dash'):
+                tail = TAIL_END_PATTERN.split(stem[marker.end():], 1)[0]
+                if kind == 'dash' or tail.lstrip().startswith('-'):
+                    episode_title = tail.strip(' -_.') or None
+
+        title = stem[title_start:title_end].strip(' -_.') or None
+
+        if season is None:
+            season = self.folder_season(parent) or 1
+        return ParsedName(season, episode, version, title, episode_title, resolution, crc, group)
+
+    def parse_many(self, file_paths):
+        """Parses a batch of paths; returns a list of ParsedName."""
+        parse = self.parse
+        return [parse(file_path) for file_path in file_paths]
 
     def parse_path(self, file_path):
-        path_obj = Path(file_path)
-        filename = path_obj.name
-        parent_name = path_obj.parent.name
-
-        season = 1
-        episode = 0
-
-        # Step 1: Check if the file is inside a "Season XX" folder
-        folder_match = self.season_folder_pattern.search(parent_name)
-        if folder_match:
-            season = int(folder_match.group(1))
-
-        # Step 2: Try to find S01E01 in the filename (overwrites folder season if found)
-        se_match = self.se_pattern.search(filename)
-        if se_match:
-            season = int(se_match.group(1))
-            episode = int(se_match.group(2))
-        else:
-            # Step 3: If no S01E01, just look for the episode number
-            ep_match = self.ep_only_pattern.search(filename)
-            if ep_match:
-                episode = int(ep_match.group(1))
-
-        return season, episode
\ No newline at end of file
+        """Returns (season, episode) for a path."""
+        parsed = self.parse(file_path)
+        return parsed.season, parsed.episode
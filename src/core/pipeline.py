@@ -0,0 +1,117 @@
+import queue
+import threading
+
+from .tracing import get_tracer
+
+# Sentinel pushed through the queues once the source is exhausted
+_DONE = object()
+
+
+class CancelToken:
+    """Shared flag asking a running job to stop at its next unit of work."""
+
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    def is_cancelled(self):
+        return self._event.is_set()
+
+
+class Stage:
+    """One step of a Pipeline: `workers` threads applying `func` to every item.
+
+    `func` returns the item to hand to the next stage, or None to drop it.
+    The input queue is bounded, so a slow stage blocks the ones before it.
+    Once the pipeline's CancelToken is cancelled, queued items are dropped unprocessed.
+    """
+
+    def __init__(self, name, func, workers=1, queue_size=64, on_finish=None):
+        self.name = name
+        self.func = func
+        self.workers = max(1, int(workers or 1))
+        self.queue = queue.Queue(maxsize=max(1, queue_size))
+        self.on_finish = on_finish
+        self.next_stage = None
+        self.cancel = None
+        self._remaining = self.workers
+        self._lock = threading.Lock()
+        self._threads = []
+
+    def start(self):
+        for i in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"{self.name}-{i}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def join(self):
+        for thread in self._threads:
+            thread.join()
+
+    def _work(self):
+        tracer = get_tracer()
+        while True:
+            item = self.queue.get()
+            if item is _DONE:
+                # Put it back so the sibling workers see it too
+                self.queue.put(_DONE)
+                break
+            if self.cancel is not None and self.cancel.is_cancelled():
+                continue
+            try:
+                with tracer.span(self.name):
+                    result = self.func(item)
+            except Exception as e:
+                print(f"Pipeline error in {self.name}: {e}")
+                continue
+            if result is not None and self.next_stage is not None:
+                self.next_stage.queue.put(result)
+
+        with self._lock:
+            self._remaining -= 1
+            last = self._remaining == 0
+
+        # The last worker out finishes the stage and closes the next one
+        if last:
+            if self.on_finish:
+                try:
+                    self.on_finish()
+                except Exception as e:
+                    print(f"Pipeline error finishing {self.name}: {e}")
+            if self.next_stage is not None:
+                self.next_stage.queue.put(_DONE)
+
+
+class Pipeline:
+    """Feeds the items of `source` through a chain of Stages connected by bounded queues."""
+
+    def __init__(self, stages, cancel=None):
+        self.stages = stages
+        self.cancel = cancel
+        for current, following in zip(stages, stages[1:]):
+            current.next_stage = following
+        for stage in stages:
+            stage.cancel = cancel
+
+    def run(self, source):
+        """Runs `source` on the calling thread and blocks until every stage has drained."""
+        for stage in self.stages:
+            stage.start()
+
+        head = self.stages[0].queue
+        tracer = get_tracer()
+        items = iter(source)
+        try:
+            while True:
+                # Timed apart from put(), which only measures how far behind the stages are
+                with tracer.span("walk"):
+                    item = next(items, _DONE)
+                if item is _DONE: break
+                if self.cancel is not None and self.cancel.is_cancelled(): break
+                head.put(item)
+        finally:
+            head.put(_DONE)
+            for stage in self.stages:
+                stage.join()
@@ -0,0 +1,115 @@
+import atexit
+import threading
+
+
+class PlaybackStateService:
+    """Write-behind store for playback position and watched state.
+
+    The player calls update_position() on every tick: that only records the
+    latest position per episode in memory, so repeated updates of one
+    episode coalesce into a single row. A background thread writes what
+    changed in one transaction `flush_interval` seconds after the first
+    unsaved update, or right away on flush() (pause, stop). close() writes
+    the rest and waits for it, for shutdown. A crash loses at most
+    `flush_interval` seconds of positions; nothing here waits on SQLite
+    except close() and flush(wait=True).
+    """
+
+    def __init__(self, db_manager, flush_interval=5.0, watched_fraction=0.9):
+        self.db = db_manager
+        self.flush_interval = flush_interval
+        # Playing past this fraction of an episode marks it watched
+        self.watched_fraction = watched_fraction
+        # episode id -> [position, watched (True/False, or None to leave it as is)]
+        self._pending = {}
+        self._requested = 0
+        self._done = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def update_position(self, episode_id, position, duration=None):
+        watched = True if duration and position >= duration * self.watched_fraction else None
+        with self._cond:
+            state = self._pending.get(episode_id)
+            if state is None:
+                self._pending[episode_id] = [position, watched]
+                self._start()
+                # Starts the writer's flush_interval countdown
+                self._cond.notify_all()
+            else:
+                state[0] = position
+                if watched:
+                    state[1] = True
+
+    def set_watched(self, episode_id, watched=True):
+        with self._cond:
+            state = self._pending.get(episode_id)
+            if state is None:
+                # Keep the position as stored; only is_watched changes
+                self._pending[episode_id] = [None, watched]
+                self._start()
+                self._cond.notify_all()
+            else:
+                state[1] = watched
+
+    def get_state(self, episode_id):
+        """Returns (position, watched) for an episode, including updates that aren't written yet."""
+        with self._cond:
+            state = self._pending.get(episode_id)
+        stored = self.db.get_playback_state(episode_id) or (0, 0)
+        if state is None:
+            return stored[0] or 0, bool(stored[1])
+        position = state[0] if state[0] is not None else stored[0] or 0
+        return position, bool(state[1]) if state[1] is not None else bool(stored[1])
+
+    def flush(self, wait=False):
+        """Writes the pending updates now (on the writer thread); with `wait`, returns once they are saved."""
+        with self._cond:
+            if self._thread is None:
+                return
+            self._requested += 1
+            target = self._requested
+            self._cond.notify_all()
+            if wait:
+                self._cond.wait_for(lambda: self._done >= target or not self._thread.is_alive())
+
+    def close(self):
+        """Writes everything still pending and stops the writer thread."""
+        with self._cond:
+            if self._thread is None or self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    def _start(self):
+        if self._thread is not None or self._closed: return
+        self._thread = threading.Thread(target=self._work, name="playback-state", daemon=True)
+        self._thread.start()
+        # A normal interpreter exit still saves what's pending, even without close()
+        atexit.register(self.close)
+
+    def _work(self):
+        while True:
+            with self._cond:
+                self._cond.wait_for(lambda: self._pending or self._requested > self._done or self._closed)
+                # Give ticks flush_interval seconds to coalesce, unless a flush was asked for
+                self._cond.wait_for(lambda: self._requested > self._done or self._closed,
+                                    timeout=self.flush_interval)
+                batch, self._pending = self._pending, {}
+                requested, closed = self._requested, self._closed
+
+            if batch:
+                try:
+                    self.db.save_playback_state([(episode_id, position, watched)
+                                                 for episode_id, (position, watched) in batch.items()])
+                except Exception as e:
+                    print(f"Playback state error: {e}")
+
+            with self._cond:
+                self._done = requested
+                self._cond.notify_all()
+            if closed:
+                self.db.close()
+                return
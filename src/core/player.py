@@ -0,0 +1,296 @@
+import os
+import threading
+import time
+
+from .tracing import get_tracer
+
+# Episodes stopped this close to the start play from the beginning again
+MIN_RESUME_SECONDS = 10
+
+
+class Prefetcher:
+    """Warms the OS page cache for the episode that plays next and keeps it open.
+
+    warm() runs on a background thread: it opens the file (the slow part on
+    SMB/NFS shares), asks the kernel to read ahead (posix_fadvise WILLNEED
+    where there is one) and reads the first `head_bytes` and the last
+    `tail_bytes`, where containers keep their headers and index (MKV cues,
+    MP4 moov). The player's open and first frame then come from the cache.
+    The player opens the file by path itself; take() only gives the
+    prefetch's descriptor to PlayerController, which keeps it open until
+    the first frame, so a share keeps its open handle (and an SMB client
+    its lease on the cached pages) through the player's open. Only one
+    file is prefetched at a time.
+    """
+
+    def __init__(self, head_bytes=32 * 1024 ** 2, tail_bytes=4 * 1024 ** 2, chunk_size=1024 ** 2):
+        self.head_bytes = head_bytes
+        self.tail_bytes = tail_bytes
+        self.chunk_size = chunk_size
+        self.path = None
+        self.bytes_read = 0
+        self._fd = None
+        self._done = threading.Event()
+        self._cancel = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def warm(self, path):
+        """Starts prefetching `path`, dropping whatever was prefetched before."""
+        self.cancel()
+        with self._lock:
+            self.path = str(path)
+            self.bytes_read = 0
+            self._done = threading.Event()
+            self._cancel = threading.Event()
+            self._thread = threading.Thread(target=self._work, args=(self.path, self._done, self._cancel),
+                                            name="prefetch", daemon=True)
+            self._thread.start()
+
+    def is_warm(self, path):
+        return self.path == str(path) and self._done.is_set()
+
+    def take(self, path):
+        """Called as the player opens `path`: returns the prefetch's open descriptor, or None if `path`
+        wasn't being prefetched (or couldn't be opened).
+
+        The prefetch stops where it is; the caller owns the descriptor and must close it.
+        """
+        wanted = self.path == str(path)
+        self._stop()
+        fd = None
+        if wanted:
+            fd, self._fd = self._fd, None
+        self._close()
+        self.path = None
+        return fd
+
+    def wait(self, timeout=None):
+        """Waits for the prefetch in flight to finish; True if it did (or there is none)."""
+        return self._done.wait(timeout)
+
+    def cancel(self):
+        """Stops the prefetch and closes its descriptor."""
+        self._stop()
+        self._close()
+        self.path = None
+
+    def _stop(self):
+        with self._lock:
+            thread, self._thread = self._thread, None
+            self._cancel.set()
+        if thread is not None:
+            thread.join()
+
+    def _close(self):
+        fd, self._fd = self._fd, None
+        if fd is not None:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def _work(self, path, done, cancel):
+        tracer = get_tracer()
+        try:
+            with tracer.span("prefetch", cat="player", path=os.path.basename(path)):
+                fd = self._fd = os.open(path, os.O_RDONLY | getattr(os, 'O_BINARY', 0))
+                size = os.fstat(fd).st_size
+                ranges = [(0, min(size, self.head_bytes))]
+                if size > self.head_bytes:
+                    tail = max(self.head_bytes, size - self.tail_bytes)
+                    ranges.append((tail, size - tail))
+                for offset, length in ranges:
+                    if hasattr(os, 'posix_fadvise'):
+                        os.posix_fadvise(fd, offset, length, os.POSIX_FADV_WILLNEED)
+                    # Reading is what actually pulls the data over a network share
+                    end = offset + length
+                    while offset < end and not cancel.is_set():
+                        chunk = self._read_at(fd, offset, min(self.chunk_size, end - offset))
+                        if not chunk: break
+                        offset += len(chunk)
+                        self.bytes_read += len(chunk)
+        except OSError as e:
+            print(f"Prefetch error for {path}: {e}")
+        finally:
+            done.set()
+
+    @staticmethod
+    def _read_at(fd, offset, length):
+        if hasattr(os, 'pread'):
+            return os.pread(fd, length, offset)
+        # Windows has no pread; the descriptor is only used by this thread
+        os.lseek(fd, offset, os.SEEK_SET)
+        return os.read(fd, length)
+
+
+class EpisodeQueue:
+    """The episodes of one series in get_episodes() order, with a cursor on the one playing."""
+
+    def __init__(self, episodes, index=0):
+        # Rows are (id, file_path, thumbnail_path, title, episode_num)
+        self.episodes = list(episodes)
+        self.index = index
+
+    @classmethod
+    def for_file(cls, db_manager, file_path):
+        """The queue of the series `file_path` belongs to, positioned on it; None if it isn't in the library."""
+        episode = db_manager.get_episode_by_path(file_path)
+        if episode is None:
+            return None
+        episodes = db_manager.get_episodes(episode[1])
+        index = next((i for i, row in enumerate(episodes) if row[0] == episode[0]), 0)
+        return cls(episodes, index)
+
+    @property
+    def current(self):
+        return self.episodes[self.index] if 0 <= self.index < len(self.episodes) else None
+
+    def peek_next(self):
+        return self.episodes[self.index + 1] if self.index + 1 < len(self.episodes) else None
+
+    def advance(self, step=1):
+        """Moves the cursor; returns the new current episode, or None past either end (the cursor stays)."""
+        if not 0 <= self.index + step < len(self.episodes):
+            return None
+        self.index += step
+        return self.current
+
+
+class PlayerController:
+    """Plays a series' episodes through a player backend, prefetching the next one.
+
+    The backend is anything with load(path, start), set_paused(paused),
+    seek(position) and stop(); the controller sets its on_first_frame(),
+    on_position(position, duration), on_paused(paused) and on_end()
+    callbacks, which the backend calls on the controller's thread (see
+    ui.player_view.MpvBackend, or benchmarks/synthetic.StubPlayer headless).
+
+    Once an episode shows its first frame, the next one in get_episodes()
+    order is prefetched (see Prefetcher), so "next episode" opens from the
+    page cache even on a slow share. The open-to-first-frame latency of
+    every episode is kept in `latencies` and traced as "open_to_first_frame",
+    with `warm_cache` telling whether its prefetch had finished by the time
+    it was opened.
+    Positions go to a PlaybackStateService, which writes them behind.
+    """
+
+    def __init__(self, backend, db_manager, playback=None, prefetcher=None, auto_next=True, on_opened=None):
+        self.backend = backend
+        self.db = db_manager
+        self.playback = playback
+        self.prefetcher = prefetcher if prefetcher is not None else Prefetcher()
+        self.auto_next = auto_next
+        # Called with (episode row, latency in seconds, warm_cache) once an episode shows its first frame
+        self.on_opened = on_opened
+        self.queue = None
+        self.latencies = []
+        self._opened_ns = None
+        self._warm_cache = False
+        # The prefetch's descriptor of the episode being opened, held (not used) until its first frame
+        self._held_fd = None
+
+        backend.on_first_frame = self.handle_first_frame
+        backend.on_position = self.handle_position
+        backend.on_paused = self.handle_paused
+        backend.on_end = self.handle_end
+
+    @property
+    def current(self):
+        return self.queue.current if self.queue is not None else None
+
+    def play_file(self, file_path):
+        """Plays a library file and queues the rest of its series after it. Returns False if it isn't in the library."""
+        queue = EpisodeQueue.for_file(self.db, file_path)
+        if queue is None:
+            return False
+        self.queue = queue
+        self.open_current()
+        return True
+
+    def play_next(self):
+        if self.queue is None or self.queue.advance(1) is None:
+            return False
+        self.open_current()
+        return True
+
+    def play_previous(self):
+        if self.queue is None or self.queue.advance(-1) is None:
+            return False
+        self.open_current()
+        return True
+
+    def open_current(self):
+        episode_id, file_path = self.current[:2]
+        start = 0.0
+        if self.playback is not None:
+            position, watched = self.playback.get_state(episode_id)
+            if not watched and position >= MIN_RESUME_SECONDS:
+                start = position
+        self._release()
+        self._warm_cache = self.prefetcher.is_warm(file_path)
+        self._held_fd = self.prefetcher.take(file_path)
+        self._opened_ns = time.perf_counter_ns()
+        self.backend.load(file_path, start)
+
+    def stop(self):
+        self.backend.stop()
+        self.prefetcher.cancel()
+        self._release()
+        if self.playback is not None:
+            self.playback.flush()
+        self._opened_ns = None
+
+    def set_paused(self, paused):
+        self.backend.set_paused(paused)
+
+    def seek(self, position):
+        self.backend.seek(position)
+
+    def _release(self):
+        fd, self._held_fd = self._held_fd, None
+        if fd is not None:
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    # --- Backend callbacks ---
+
+    def handle_first_frame(self):
+        # Seeks restart playback too; only the first frame after load() counts
+        if self._opened_ns is None: return
+        opened_ns, self._opened_ns = self._opened_ns, None
+        now_ns = time.perf_counter_ns()
+        latency = (now_ns - opened_ns) / 1e9
+        episode = self.current
+        self.latencies.append({'episode_id': episode[0], 'path': episode[1], 'seconds': latency,
+                               'warm_cache': self._warm_cache})
+        get_tracer().record("open_to_first_frame", "player", opened_ns, now_ns,
+                            {'episode_id': episode[0], 'warm_cache': self._warm_cache})
+        if self.on_opened:
+            self.on_opened(episode, latency, self._warm_cache)
+        # The player has its own handle on the file now
+        self._release()
+
+        # Only now, so the prefetch doesn't compete with the episode that is opening
+        following = self.queue.peek_next()
+        if following is not None:
+            self.prefetcher.warm(following[1])
+
+    def handle_position(self, position, duration):
+        if self.playback is not None and self.current is not None and position is not None:
+            self.playback.update_position(self.current[0], position, duration)
+
+    def handle_paused(self, paused):
+        # A pause is a natural point to get the position onto disk
+        if paused and self.playback is not None:
+            self.playback.flush()
+
+    def handle_end(self):
+        if self.current is None: return
+        if self.playback is not None:
+            self.playback.set_watched(self.current[0])
+            self.playback.flush()
+        if self.auto_next:
+            self.play_next()
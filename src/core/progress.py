@@ -0,0 +1,150 @@
+import threading
+import time
+from collections import namedtuple
+
+
+def format_bytes(count):
+    for unit in ("B", "KB", "MB", "GB"):
+        if count < 1024:
+            return f"{count:.0f} {unit}" if unit == "B" else f"{count:.1f} {unit}"
+        count /= 1024
+    return f"{count:.1f} TB"
+
+
+def format_duration(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}:{minutes:02d}:{seconds:02d}" if hours else f"{minutes}:{seconds:02d}"
+
+
+class ScanProgress(namedtuple('ScanProgress', 'stage files_done files_total bytes_done bytes_total '
+                                              'total_known current rate eta elapsed')):
+    """One progress update. `files_total` keeps growing until `total_known` (the walk is done);
+    `rate` is files/s, `eta` is seconds left (None until the total is known)."""
+    __slots__ = ()
+
+    @property
+    def fraction(self):
+        if not self.total_known or not self.files_total:
+            return None
+        return self.files_done / self.files_total
+
+    def describe(self):
+        """One-line human-readable summary, e.g. for a status label or the console."""
+        if self.total_known:
+            text = f"{self.stage.capitalize()}: {self.files_done:,} / {self.files_total:,} files"
+        else:
+            text = f"{self.stage.capitalize()}: {self.files_done:,} files ({self.files_total:,} found so far)"
+        if self.bytes_done:
+            text += f" · {format_bytes(self.bytes_done)}"
+        if self.rate:
+            text += f" · {self.rate:,.0f} files/s"
+        if self.eta is not None and self.stage not in ("done", "cancelled"):
+            text += f" · ETA {format_duration(self.eta)}"
+        return text
+
+
+def combine_progress(updates, stage, expected=None):
+    """Merges the latest ScanProgress of several concurrent scans into one.
+
+    `expected` is how many scans there are in all; until each of them has
+    reported a final total, the combined total isn't known either.
+    """
+    updates = list(updates)
+    total_known = all(update.total_known for update in updates) and len(updates) >= (expected or 0)
+    rates = [update.rate for update in updates if update.rate]
+    etas = [update.eta for update in updates]
+    current = next((update.current for update in reversed(updates) if update.current), None)
+    return ScanProgress(stage, sum(update.files_done for update in updates),
+                        sum(update.files_total for update in updates),
+                        sum(update.bytes_done for update in updates), sum(update.bytes_total for update in updates),
+                        total_known, current, sum(rates) if rates else None,
+                        # Scans run side by side, so the slowest one decides
+                        max(etas) if total_known and updates and None not in etas else None,
+                        max((update.elapsed for update in updates), default=0.0))
+
+
+class ProgressReporter:
+    """Collects scan progress from any number of threads and reports it at most every `interval` seconds.
+
+    Workers call discover()/advance() per file, which only updates counters;
+    `callback(ScanProgress)` runs at a fixed rate at most, however fast files
+    go by, so the receiver (e.g. a cross-thread Qt signal) sees a bounded
+    number of updates. Stage changes and finish() are always reported.
+    """
+
+    def __init__(self, callback, interval=0.1):
+        self.callback = callback
+        self.interval = interval
+        self._lock = threading.Lock()
+        self.stage = "starting"
+        self.files_done = 0
+        self.files_total = 0
+        self.bytes_done = 0
+        self.bytes_total = 0
+        self.total_known = False
+        self.current = None
+        self.started = time.monotonic()
+        self._last_report = 0.0
+        self._rate = None
+        self._rate_mark = (self.started, 0)
+
+    def set_stage(self, stage):
+        with self._lock:
+            self.stage = stage
+        self.report(force=True)
+
+    def discover(self, files=1, size=0):
+        """Counts files found by the walk that still have to be processed."""
+        with self._lock:
+            self.files_total += files
+            self.bytes_total += size
+        self.report()
+
+    def advance(self, files=1, size=0, current=None):
+        """Counts processed files (and their size in bytes)."""
+        with self._lock:
+            self.files_done += files
+            self.bytes_done += size
+            if current is not None:
+                self.current = current
+        self.report()
+
+    def total_complete(self):
+        """Called once the walk is over, so files_total is final and an ETA can be given."""
+        with self._lock:
+            self.total_known = True
+        self.report(force=True)
+
+    def finish(self, stage="done"):
+        with self._lock:
+            self.stage = stage
+            self.total_known = True
+        self.report(force=True)
+
+    def snapshot(self, now=None):
+        now = now or time.monotonic()
+        with self._lock:
+            return self._snapshot(now)
+
+    def _snapshot(self, now):
+        mark_time, mark_done = self._rate_mark
+        if now - mark_time >= self.interval:
+            # Smoothed files/s, so the rate and ETA don't jump around between reports
+            rate = (self.files_done - mark_done) / (now - mark_time)
+            self._rate = rate if self._rate is None else 0.7 * self._rate + 0.3 * rate
+            self._rate_mark = (now, self.files_done)
+        eta = None
+        if self.total_known and self._rate:
+            eta = max(0, self.files_total - self.files_done) / self._rate
+        return ScanProgress(self.stage, self.files_done, self.files_total, self.bytes_done, self.bytes_total,
+                            self.total_known, self.current, self._rate, eta, now - self.started)
+
+    def report(self, force=False):
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._last_report < self.interval:
+                return
+            self._last_report = now
+            # Delivered under the lock so reports from different threads can't arrive out of order
+            self.callback(self._snapshot(now))
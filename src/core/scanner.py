@@ -1,37 +1,132 @@
 import os
-import xxhash
-import re
+import threading
+import time
 from pathlib import Path
-from PySide6.QtCore import QRunnable, QObject, Signal, Slot
 
-from .parser import EpisodeParser
+from .devices import DEFAULT_IO_LIMITS, HDD, group_by_device
+from .fingerprint import Fingerprinter, SAMPLED
+from .parser import EpisodeParser, VIDEO_EXTENSIONS
+from .pipeline import CancelToken, Pipeline, Stage
+from .progress import ProgressReporter, combine_progress
 from .thumbnails import ThumbnailManager
-from .api import JikanAPI
+from .tracing import get_tracer
+from .metadata import MetadataService
 
 
-class ScannerSignals(QObject):
-    progress = Signal(str)
-    found_anime = Signal(str)
-    finished = Signal(int)
+class ScanItem:
+    """A single video file travelling through the scan pipeline."""
+    __slots__ = ('full_path', 'file_name', 'anime_title', 'anime_folder', 'cover_path', 'stat_key',
+                 'file_hash', 'season', 'episode', 'ep_title', 'thumb_path')
 
+    def __init__(self, full_path, file_name, anime_title, anime_folder, cover_path, stat_key):
+        self.full_path = full_path
+        self.file_name = file_name
+        self.anime_title = anime_title
+        self.anime_folder = anime_folder
+        self.cover_path = cover_path
+        self.stat_key = stat_key
+        self.file_hash = None
+        self.season = 1
+        self.episode = 0
+        self.ep_title = None
+        self.thumb_path = None
 
-class ScannerWorker(QRunnable):
-    def __init__(self, root_path, db_manager):
-        super().__init__()
+
+class LibraryScanner:
+    """Scans a library root as a pipeline: walk -> hash -> parse -> thumbnail -> DB write.
+
+    The walk runs on the worker's own thread, hashing and thumbnailing run on
+    their own thread pools and a single writer thread batches every DB write
+    through DatabaseManager.bulk_writer.
+    Stages are connected by bounded queues of `queue_size` items.
+
+    With `paths` (files or directories under the root, e.g. from a
+    LibraryWatcher) only those are scanned. Paths that no longer exist have
+    their episodes deleted once the pipeline is done, so a file that moved
+    is first relinked to its new path by its hash and keeps its row.
+
+    cancel() stops the scan at the next file. Full scans keep a checkpoint in
+    the database: every directory whose files have all been written is
+    recorded with the writer's flushes, so a scan that was cancelled or
+    interrupted resumes by skipping those directories, incremental or not.
+
+    It has no Qt dependency, so it also runs headless (see first_run.py);
+    core.tasks.ScannerWorker runs it on a QThreadPool and turns the
+    `on_progress` / `on_found_anime` callbacks into signals.
+    """
+
+    def __init__(self, root_path, db_manager, incremental=True, hash_workers=4, thumb_workers=None,
+                 queue_size=256, batch_size=5000, metadata_service=None, paths=None, fingerprint_mode=SAMPLED,
+                 progress_interval=0.1, fetch_metadata=True, on_progress=None, on_found_anime=None,
+                 trace_session=True):
         self.root_path = Path(root_path)
+        self.paths = [Path(path) for path in paths] if paths is not None else None
         self.db = db_manager
-        self.signals = ScannerSignals()
+        # Incremental mode skips files whose size/mtime/inode match the file index
+        self.incremental = incremental
+        self.hash_workers = hash_workers
+        self.thumb_workers = thumb_workers or os.cpu_count() or 2
+        self.queue_size = queue_size
+        self.batch_size = batch_size
+        # Called with a ScanProgress at most every `progress_interval` seconds, however fast files are processed
+        self.on_progress = on_progress
+        # Called with the title of every series the scan creates or touches
+        self.on_found_anime = on_found_anime
+        self.progress_interval = progress_interval
+        self.progress = ProgressReporter(self.report_progress, interval=progress_interval)
         self.parser = EpisodeParser()
-        self.thumb_manager = ThumbnailManager()
-        self.api = JikanAPI()
-        self.video_extensions = ('.mkv', '.mp4', '.avi', '.mov')
+        # "head" reproduces the hashes of older versions (first MB only), see Fingerprinter
+        self.fingerprinter = Fingerprinter(fingerprint_mode)
+        self.thumb_manager = ThumbnailManager(workers=self.thumb_workers)
+        # Metadata is fetched in the background and keeps filling in after the scan ends
+        self.metadata = (metadata_service or MetadataService(db_manager)) if fetch_metadata else None
+        self.video_extensions = VIDEO_EXTENSIONS
+        self.cancel_token = CancelToken()
+        self.cancelled = False
+        # True if this run picked up where an unfinished scan of the same root left off
+        self.resumed = False
+
+        # Writer-thread state
+        self._writer = None
+        self._anime_ids = {}
+        self._needs_metadata = []
+        self._written = 0
+        self._skipped = 0
+        self._removed = []
+        # Checkpoint state: directories done in an earlier run, files still in flight per directory
+        self._checkpointing = False
+        self._completed_dirs = set()
+        self._dir_pending = {}
+        self._dirs_walked = set()
+        self._dirs_done = []
+        self._dir_lock = threading.Lock()
+        # With tracing on, run() is a tracing session of its own: it resets the tracer, then prints its
+        # stats and exports the trace at the end. MultiRootScanner turns that off and does it once for all roots,
+        # and so do watch scans, which would otherwise wipe the trace of the last full scan.
+        self.trace_session = trace_session
+        # Snapshot of the tracer's stats after run(), for a tracing session (see core.tracing)
+        self.stats = None
+
+    def cancel(self):
+        """Asks the scan to stop; safe to call from any thread."""
+        self.cancel_token.cancel()
+
+    @property
+    def written(self):
+        """Episodes hashed and written by the last run()."""
+        return self._written
+
+    @property
+    def unchanged(self):
+        """Episodes the last run() skipped as unchanged (or done by an earlier, resumed run)."""
+        return self._skipped
+
+    def report_progress(self, progress):
+        if self.on_progress:
+            self.on_progress(progress)
 
     def generate_hash(self, file_path):
-        try:
-            with open(file_path, "rb") as f:
-                return xxhash.xxh64(f.read(1024 * 1024)).hexdigest()
-        except Exception:
-            return None
+        return self.fingerprinter.fingerprint(file_path)
 
     def find_cover(self, folder_path):
         folder = Path(folder_path)
@@ -41,53 +136,388 @@ class ScannerWorker(QRunnable):
                 return str(potential_path)
         return None
 
-    @Slot()
-    def run(self):
-        total_indexed = 0
-        for root, dirs, files in os.walk(self.root_path):
+    def stat_key(self, file_path):
+        try:
+            st = os.stat(file_path)
+            return st.st_size, st.st_mtime_ns, st.st_ino
+        except OSError:
+            return None
+
+    # --- Pipeline stages ---
+
+    def scan_targets(self):
+        """Yields (directory, file names) to scan and collects paths that are gone in self._removed."""
+        if self.paths is None:
+            for root, dirs, files in os.walk(self.root_path):
+                yield root, files
+            return
+
+        for path in self.paths:
+            if path.is_dir():
+                for root, dirs, files in os.walk(path):
+                    yield root, files
+            elif path.is_file():
+                yield str(path.parent), [path.name]
+            else:
+                self._removed.append(path)
+                # The whole series folder may have gone with it
+                parts = path.relative_to(self.root_path).parts
+                if parts and not (self.root_path / parts[0]).exists():
+                    self._removed.append(self.root_path / parts[0])
+
+    def known_files(self):
+        if not self.incremental:
+            return {}
+        if self.paths is None:
+            return self.db.get_file_index(self.root_path)
+        known = {}
+        for folder in {path if path.is_dir() else path.parent for path in self.paths}:
+            known.update(self.db.get_file_index(folder))
+        return known
+
+    def walk(self):
+        """Walker stage: yields a ScanItem for every new or changed video file."""
+        known_files = self.known_files()
+        covers = {}
+
+        for root, files in self.scan_targets():
+            if self.cancel_token.is_cancelled(): return
             if 'extras' in root.lower(): continue
 
+            if root in self._completed_dirs:
+                # Finished by an earlier, interrupted run of this scan
+                done = sum(1 for file in files if file.lower().endswith(self.video_extensions))
+                self._skipped += done
+                self.progress.discover(done)
+                self.progress.advance(done)
+                continue
+
             relative_path = Path(root).relative_to(self.root_path)
             if str(relative_path) == ".": continue
 
             anime_title = relative_path.parts[0]
             anime_root_folder = str(self.root_path / anime_title)
-            cover_path = self.find_cover(root) if len(relative_path.parts) == 1 else None
+            if anime_title not in covers:
+                covers[anime_title] = self.find_cover(anime_root_folder)
 
-            anime_id = self.db.get_or_create_anime(title=anime_title, path=anime_root_folder, poster=cover_path)
-            self.signals.found_anime.emit(anime_title)
+            for file in files:
+                if not file.lower().endswith(self.video_extensions): continue
 
-            # Metadata fetching
-            existing_data = self.db.get_anime_details(anime_id)
-            if existing_data and existing_data[4] is None:
-                metadata = self.api.search_anime(anime_title)
-                if metadata:
-                    self.db.update_anime_metadata(anime_id, metadata['mal_id'], metadata['rating'],
-                                                  metadata['synopsis'], metadata['genres'])
+                full_path = os.path.join(root, file)
+                stat_key = self.stat_key(full_path)
 
-            for file in files:
-                if file.lower().endswith(self.video_extensions):
-                    full_path = os.path.join(root, file)
-                    self.signals.progress.emit(f"Processing: {file}")
+                size = stat_key[0] if stat_key else 0
+                self.progress.discover(size=size)
+
+                # Unchanged since the last scan: nothing to hash, thumbnail or write
+                if stat_key is not None and known_files.get(full_path) == stat_key:
+                    self._skipped += 1
+                    self.progress.advance(size=size)
+                    continue
+
+                with self._dir_lock:
+                    self._dir_pending[root] = self._dir_pending.get(root, 0) + 1
+                yield ScanItem(full_path, file, anime_title, anime_root_folder, covers[anime_title], stat_key)
+
+            self.finish_dir(root, walked=True)
+
+        self.progress.total_complete()
+
+    def finish_dir(self, folder, walked=False):
+        """Tracks when every file of a directory has been written, so it can go into the checkpoint."""
+        with self._dir_lock:
+            if walked:
+                self._dirs_walked.add(folder)
+            else:
+                self._dir_pending[folder] -= 1
+            if folder in self._dirs_walked and not self._dir_pending.get(folder):
+                self._dirs_walked.discard(folder)
+                self._dir_pending.pop(folder, None)
+                self._dirs_done.append(folder)
+
+    def save_checkpoint(self):
+        """Hands finished directories to the writer; they're committed with its next flush."""
+        if not self._checkpointing: return
+        with self._dir_lock:
+            done, self._dirs_done = self._dirs_done, []
+        for folder in done:
+            self._writer.complete_dir(str(self.root_path), folder)
+        self._writer.checkpoint(str(self.root_path), self._written + self._skipped)
 
-                    season, episode = self.parser.parse_path(full_path)
+    def hash_item(self, item):
+        item.file_hash = self.generate_hash(item.full_path)
+        return item
 
-                    # Improved Title Extraction Regex
-                    # Matches " - 01 - Title" or " - 01 Title"
-                    title_match = re.search(r" - \d+\s*-\s*(.+?)\.[a-z0-9]+$", file, re.I)
-                    if not title_match:
-                        title_match = re.search(r" - \d+\s+(.+?)\.[a-z0-9]+$", file, re.I)
+    def parse_item(self, item):
+        parsed = self.parser.parse(item.full_path)
+        item.season, item.episode = parsed.season, parsed.episode
+        item.ep_title = parsed.episode_title
+        return item
 
-                    ep_title = title_match.group(1).strip() if title_match else None
+    def thumbnail_item(self, item):
+        item.thumb_path = self.thumb_manager.generate_for_episode(item.full_path, item.file_hash)
+        return item
 
-                    file_hash = self.generate_hash(full_path)
-                    thumb_path = self.thumb_manager.generate_for_episode(full_path, file_hash)
+    def resolve_anime(self, item):
+        """Returns the anime id for the item's series, creating it on first sight."""
+        anime_id = self._anime_ids.get(item.anime_folder)
+        if anime_id is not None:
+            return anime_id
+
+        anime_id = self._writer.get_or_create_anime(title=item.anime_title, path=item.anime_folder,
+                                                    poster=item.cover_path)
+        self._anime_ids[item.anime_folder] = anime_id
+        if self.on_found_anime:
+            self.on_found_anime(item.anime_title)
+
+        # Metadata is requested once the row is committed, see release_metadata
+        existing_data = self._writer.get_anime_details(anime_id)
+        if existing_data and existing_data[4] is None:
+            self._needs_metadata.append((anime_id, item.anime_title))
+        return anime_id
+
+    def release_metadata(self):
+        if self.metadata is None:
+            self._needs_metadata = []
+            return
+        for anime_id, title in self._needs_metadata:
+            self.metadata.enqueue(anime_id, title)
+        self._needs_metadata = []
+
+    def write_item(self, item):
+        # The writer's connection has to be opened on the writer thread itself
+        if self._writer is None:
+            self._writer = self.db.bulk_writer(batch_size=self.batch_size, on_flush=self.release_metadata)
+
+        anime_id = self.resolve_anime(item)
+        self._writer.add_episode(
+            anime_id=anime_id, file_path=item.full_path, season=item.season,
+            episode=item.episode, title=item.ep_title, file_hash=item.file_hash,
+            thumbnail_path=item.thumb_path
+        )
+        if item.stat_key is not None and item.file_hash is not None:
+            self._writer.update_file_index(item.full_path, *item.stat_key)
+        self._written += 1
+        self.progress.advance(size=item.stat_key[0] if item.stat_key else 0, current=item.file_name)
+        self.finish_dir(os.path.dirname(item.full_path))
+        self.save_checkpoint()
+
+    def close_writer(self):
+        if self._writer is None and self._checkpointing and self._dirs_done:
+            # Nothing was written, but the walk still finished directories
+            self._writer = self.db.bulk_writer(batch_size=self.batch_size, on_flush=self.release_metadata)
+        if self._writer is not None:
+            self.save_checkpoint()
+            self._writer.close()
+            self._writer = None
+
+    def start_checkpoint(self):
+        """Sets up the checkpoint for a full scan, resuming an unfinished one of the same root."""
+        self._completed_dirs = set()
+        self._dir_pending = {}
+        self._dirs_walked = set()
+        self._dirs_done = []
+        # Watcher scans (explicit paths) are short and don't checkpoint
+        self._checkpointing = self.paths is None
+        if not self._checkpointing: return
+
+        root = str(self.root_path)
+        # A checkpoint only exists while a scan is unfinished, so it is resumed whether or not this scan
+        # is incremental: the directories it lists were fully (re)written by the interrupted run
+        if self.db.get_scan_checkpoint(root) is not None:
+            self._completed_dirs = self.db.get_completed_dirs(root)
+        self.resumed = bool(self._completed_dirs)
+        self.db.start_scan_checkpoint(root)
+
+    def run(self):
+        """Runs the scan on the calling thread; returns the number of episodes found (written or unchanged)."""
+        self._anime_ids = {}
+        self._needs_metadata = []
+        self._written = 0
+        self._skipped = 0
+        self._removed = []
+        self.progress = ProgressReporter(self.report_progress, interval=self.progress_interval)
+        tracer = get_tracer()
+        if self.trace_session:
+            tracer.reset()
+        self.start_checkpoint()
+        self.progress.set_stage("resuming" if self.resumed else "scanning")
+
+        pipeline = Pipeline([
+            Stage("hash", self.hash_item, workers=self.hash_workers, queue_size=self.queue_size),
+            Stage("parse", self.parse_item, queue_size=self.queue_size),
+            Stage("thumbnail", self.thumbnail_item, workers=self.thumb_workers, queue_size=self.queue_size),
+            # A single writer keeps every DB write on one thread
+            Stage("write", self.write_item, queue_size=self.queue_size, on_finish=self.close_writer),
+        ], cancel=self.cancel_token)
+        pipeline.run(self.walk())
+        # Commit the thumbnails the last batch added to the manifest
+        self.thumb_manager.cache.flush()
+
+        if self.cancel_token.is_cancelled():
+            # Keep the checkpoint; the next scan of this root resumes from it
+            self.cancelled = True
+            if self._checkpointing:
+                self.db.set_scan_status(str(self.root_path), "cancelled")
+            self.progress.finish("cancelled")
+            return self._written + self._skipped
+
+        # After the writes, so moved files were relinked by hash before their old path is dropped
+        self.progress.set_stage("cleaning up")
+        if self._removed:
+            self.db.delete_paths(self._removed)
+
+        # Drop thumbnails of episodes that are no longer in the library; a scan of a few
+        # watched paths leaves that to the next full scan instead of reading every hash
+        if self.paths is None:
+            self.thumb_manager.cache.gc(self.db.get_file_hashes())
+        if self._checkpointing:
+            self.db.clear_scan_checkpoint(str(self.root_path))
+        self.progress.finish()
+
+        tracer.count("files_written", self._written)
+        tracer.count("files_skipped", self._skipped)
+        if self.trace_session and tracer.enabled:
+            self.stats = tracer.stats.snapshot()
+            print(f"📊 Scan stats for {self.root_path}:\n{tracer.stats.summary()}")
+            export_trace(tracer)
+
+        return self._written + self._skipped
+
+
+def export_trace(tracer):
+    trace_path = tracer.export_chrome()
+    if trace_path:
+        print(f"📊 Trace written to {trace_path}")
+
+
+class MultiRootScanner:
+    """Scans several library roots, running storage devices in parallel but never fighting over one.
+
+    Roots are grouped by st_dev (see core.devices). Each device gets one
+    thread that scans its roots one after the other, hashing with
+    `io_limits[kind]` workers (1 for a spinning disk), so the total time
+    approaches that of the slowest device rather than the sum of all of
+    them. Takes LibraryScanner's arguments otherwise; progress of the
+    running scans is merged into one ScanProgress, and `results` holds a
+    throughput record per root once run() returns. With tracing on, the
+    stats and the trace cover every root and are printed and exported once.
+    """
+
+    def __init__(self, roots, db_manager, io_limits=None, on_progress=None, on_found_anime=None,
+                 progress_interval=0.1, **scanner_kwargs):
+        self.roots = [Path(root) for root in roots]
+        self.db = db_manager
+        self.io_limits = dict(DEFAULT_IO_LIMITS, **(io_limits or {}))
+        self.on_progress = on_progress
+        self.on_found_anime = on_found_anime
+        self.progress_interval = progress_interval
+        # One metadata service for every root, so lookups stay deduplicated and rate limited
+        if scanner_kwargs.get('fetch_metadata', True) and scanner_kwargs.get('metadata_service') is None:
+            scanner_kwargs['metadata_service'] = MetadataService(db_manager)
+        self.metadata = scanner_kwargs.get('metadata_service')
+        self.scanner_kwargs = scanner_kwargs
+        self.cancel_token = CancelToken()
+        self.cancelled = False
+        self.resumed = False
+        self.devices = []
+        self.results = []
+        self.stats = None
+        self._scanners = []
+        self._progress = {}
+        self._last_report = 0.0
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        """Asks every running scan to stop; roots that haven't started are skipped."""
+        self.cancel_token.cancel()
+        with self._lock:
+            for scanner in self._scanners:
+                scanner.cancel()
+
+    def report_progress(self, root, progress):
+        now = time.monotonic()
+        with self._lock:
+            self._progress[root] = progress
+            # Every root reports at `progress_interval`; keep the merged updates to that rate too
+            if now - self._last_report < self.progress_interval:
+                return
+            self._last_report = now
+            update = combine_progress(self._progress.values(), "scanning", expected=len(self.roots))
+        if self.on_progress:
+            self.on_progress(update)
+
+    def scan_device(self, device):
+        limit = max(1, self.io_limits.get(device.kind, 1))
+        kwargs = dict(self.scanner_kwargs, hash_workers=limit)
+        if device.kind == HDD:
+            # ffmpeg reads from the disk too
+            kwargs['thumb_workers'] = limit
+
+        for root in device.roots:
+            if self.cancel_token.is_cancelled(): return
+            scanner = LibraryScanner(root, self.db, progress_interval=self.progress_interval,
+                                     on_progress=lambda progress, root=root: self.report_progress(root, progress),
+                                     on_found_anime=self.on_found_anime, trace_session=False, **kwargs)
+            with self._lock:
+                self._scanners.append(scanner)
+            if self.cancel_token.is_cancelled():
+                scanner.cancel()
+
+            start = time.perf_counter()
+            count = scanner.run()
+            seconds = time.perf_counter() - start
+            with self._lock:
+                self._scanners.remove(scanner)
+                self.results.append({
+                    'root': str(root),
+                    'device': device.kind,
+                    'io_limit': limit,
+                    'episodes': count,
+                    'written': scanner.written,
+                    'unchanged': scanner.unchanged,
+                    'bytes': scanner.progress.bytes_done,
+                    'seconds': round(seconds, 3),
+                    'files_per_sec': round(count / seconds, 1) if seconds else None,
+                    'mb_per_sec': round(scanner.progress.bytes_done / seconds / 1024 ** 2, 2) if seconds else None,
+                    'cancelled': scanner.cancelled,
+                    'resumed': scanner.resumed,
+                })
+
+    def run(self):
+        """Scans every root; returns the number of episodes found across all of them."""
+        self.results = []
+        self._progress = {}
+        tracer = get_tracer()
+        tracer.reset()
+        self.devices = group_by_device(self.roots)
+        threads = [threading.Thread(target=self.scan_device, args=(device,), name=f"scan-dev-{device.dev}")
+                   for device in self.devices]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
 
-                    self.db.add_episode(
-                        anime_id=anime_id, file_path=full_path, season=season,
-                        episode=episode, title=ep_title, file_hash=file_hash,
-                        thumbnail_path=thumb_path
-                    )
-                    total_indexed += 1
+        self.cancelled = self.cancel_token.is_cancelled()
+        self.resumed = any(result['resumed'] for result in self.results)
+        # Results in the order the roots were given
+        order = {str(root): index for index, root in enumerate(self.roots)}
+        self.results.sort(key=lambda result: order[result['root']])
+        if tracer.enabled:
+            # The per-root scans share the tracer, so stats and trace cover all of them at once
+            self.stats = tracer.stats.snapshot()
+            print(f"📊 Combined scan stats for {len(self.roots)} root(s):\n{tracer.stats.summary()}")
+            export_trace(tracer)
+        if self.on_progress and self._progress:
+            self.on_progress(combine_progress(self._progress.values(), "cancelled" if self.cancelled else "done"))
+        return sum(result['episodes'] for result in self.results)
 
-        self.signals.finished.emit(total_indexed)
\ No newline at end of file
+    def summary(self):
+        """Per-root throughput, one line per root."""
+        lines = []
+        for result in self.results:
+            rate = f"{result['files_per_sec']:,.0f} files/s, {result['mb_per_sec']:,.1f} MB/s" \
+                if result['seconds'] else "-"
+            lines.append(f"{result['root']} [{result['device']}, {result['io_limit']} at once]: "
+                         f"{result['episodes']} episodes ({result['written']} new) in {result['seconds']:.1f}s, {rate}")
+        return "\n".join(lines)
@@ -0,0 +1,82 @@
+import re
+import sqlite3
+import threading
+
+from .metadata import normalize_title
+
+
+def build_match_query(text):
+    """Turns what the user typed into an FTS5 query: every word must match, as a prefix.
+
+    "frier 2" becomes '"frier"* "2"*', so results show up while a word is still being typed.
+    """
+    return " ".join(f'"{word}"*' for word in re.findall(r'\w+', text.lower()))
+
+
+class LibrarySearch:
+    """Library search: SQLite FTS5 first, rapidfuzz when that finds nothing.
+
+    FTS covers series titles, synopses, genres and episode titles. The fuzzy
+    fallback catches typos ("freiren") and runs over the normalized series
+    titles, which are kept in memory and only reloaded when series are
+    added or removed.
+    """
+
+    def __init__(self, db_manager, fuzzy_cutoff=75):
+        self.db = db_manager
+        self.fuzzy_cutoff = fuzzy_cutoff
+        self._lock = threading.Lock()
+        self._version = None
+        self._ids = []
+        self._choices = []
+
+    def invalidate(self):
+        """Forces the fuzzy candidates to be reloaded on the next search."""
+        with self._lock:
+            self._version = None
+
+    def candidates(self):
+        """Returns (anime ids, normalized titles), reloading them if the library changed."""
+        version = self.db.get_library_version()
+        with self._lock:
+            if version != self._version:
+                rows = self.db.get_library()
+                self._ids = [row[0] for row in rows]
+                self._choices = [normalize_title(row[1] or "") for row in rows]
+                self._version = version
+            return self._ids, self._choices
+
+    def search(self, text, limit=50, is_cancelled=None):
+        """Returns get_library() rows matching `text`, best first (the whole library if it's empty).
+
+        `is_cancelled()` is polled while the query runs; if it turns true the
+        search stops early and returns None.
+        """
+        match_query = build_match_query(text)
+        if not match_query:
+            return self.db.get_library()
+
+        try:
+            rows = self.db.search_library(match_query, limit=limit, is_cancelled=is_cancelled)
+        except sqlite3.OperationalError as e:
+            if is_cancelled is not None and is_cancelled():
+                return None
+            print(f"Search error: {e}")
+            rows = []
+        if rows:
+            return rows
+        if is_cancelled is not None and is_cancelled():
+            return None
+        return self.fuzzy_search(text, limit)
+
+    def fuzzy_search(self, text, limit=50):
+        """Typo-tolerant title match over the in-memory candidates."""
+        # Imported on the first fuzzy search, not at startup
+        from rapidfuzz import fuzz, process
+        query = normalize_title(text)
+        if not query:
+            return []
+        ids, choices = self.candidates()
+        matches = process.extract(query, choices, scorer=fuzz.WRatio, processor=None,
+                                  score_cutoff=self.fuzzy_cutoff, limit=limit)
+        return self.db.get_library_rows([ids[index] for _, _, index in matches])
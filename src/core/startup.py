@@ -0,0 +1,58 @@
+import os
+import sys
+import time
+
+# ANIPLAY_STARTUP_REPORT=1 prints the startup timings; ANIPLAY_FIRST_PAINT_BUDGET_MS sets the budget they're held to
+REPORT_ENV = "ANIPLAY_STARTUP_REPORT"
+BUDGET_ENV = "ANIPLAY_FIRST_PAINT_BUDGET_MS"
+
+
+class StartupTimer:
+    """Milestones of one app launch, in ms since `start` (taken before the app's own imports).
+
+    app.py marks "imports", "window_created", "first_paint" and
+    "library_loaded"; report() lists them with the time between each, and
+    over_budget() checks first_paint against `budget_ms`.
+    """
+
+    def __init__(self, start=None, budget_ms=None):
+        self.start = start if start is not None else time.perf_counter()
+        self.budget_ms = budget_ms
+        self.marks = {}
+
+    def mark(self, name):
+        """Records a milestone once; later marks with the same name are ignored."""
+        if name not in self.marks:
+            self.marks[name] = (time.perf_counter() - self.start) * 1000
+        return self.marks[name]
+
+    def over_budget(self):
+        first_paint = self.marks.get("first_paint")
+        return self.budget_ms is not None and first_paint is not None and first_paint > self.budget_ms
+
+    def modules(self):
+        """Heavy optional modules that got imported during startup (ideally none)."""
+        return sorted(name for name in ("xxhash", "requests", "rapidfuzz", "core.scanner", "core.fingerprint")
+                      if name in sys.modules)
+
+    def report(self):
+        lines = ["⏱ Startup timings:"]
+        previous = 0.0
+        for name, ms in sorted(self.marks.items(), key=lambda mark: mark[1]):
+            lines.append(f"  {name:<16} {ms:>8.1f} ms  (+{ms - previous:.1f})")
+            previous = ms
+        if self.budget_ms is not None:
+            verdict = "OVER BUDGET" if self.over_budget() else "within budget"
+            lines.append(f"  first paint budget {self.budget_ms:.0f} ms: {verdict}")
+        if self.modules():
+            lines.append(f"  loaded before first use: {', '.join(self.modules())}")
+        return "\n".join(lines)
+
+
+def budget_from_env():
+    value = os.environ.get(BUDGET_ENV, "").strip()
+    return float(value) if value else None
+
+
+def report_from_env():
+    return os.environ.get(REPORT_ENV, "").strip().lower() not in ("", "0", "false", "off")
@@ -1,21 +1,46 @@
 from PySide6.QtCore import QRunnable, QObject, Signal, Slot
 
-class WorkerSignals(QObject):
-    finished = Signal()
-    result = Signal(object)
-    progress = Signal(int)
+from .scanner import LibraryScanner, MultiRootScanner
+
+
+class ScannerSignals(QObject):
+    # ScanProgress updates, throttled by ProgressReporter
+    progress = Signal(object)
+    found_anime = Signal(str)
+    finished = Signal(int)
+
 
 class ScannerWorker(QRunnable):
-    def __init__(self, folder_path):
+    """Runs a LibraryScanner on a QThreadPool and reports it through Qt signals.
+
+    Takes the same arguments as LibraryScanner; given a list of roots it runs
+    a MultiRootScanner instead. The scan engine itself has no Qt dependency;
+    this adapter is what AniplayCore and MainWindow use.
+    """
+
+    def __init__(self, root_path, db_manager, **kwargs):
         super().__init__()
-        self.folder_path = folder_path
-        self.signals = WorkerSignals()
+        self.signals = ScannerSignals()
+        scanner_class = MultiRootScanner if isinstance(root_path, (list, tuple)) else LibraryScanner
+        self.scanner = scanner_class(root_path, db_manager, on_progress=self.signals.progress.emit,
+                                     on_found_anime=self.signals.found_anime.emit, **kwargs)
+
+    @property
+    def cancelled(self):
+        return self.scanner.cancelled
+
+    @property
+    def resumed(self):
+        return self.scanner.resumed
+
+    @property
+    def stats(self):
+        return self.scanner.stats
+
+    def cancel(self):
+        """Asks the scan to stop; safe to call from any thread."""
+        self.scanner.cancel()
 
     @Slot()
     def run(self):
-        # 1. Start Directory Walking
-        # 2. Perform XXHash on new files
-        # 3. Insert into Database
-        # 4. Emit progress
-        self.signals.progress.emit(50)
-        self.signals.finished.emit()
\ No newline at end of file
+        self.signals.finished.emit(self.scanner.run())
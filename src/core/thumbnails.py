@@ -1,35 +1,235 @@
 import subprocess
 import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 
+from .tracing import get_tracer
+
+# The episode list (ui.episode_view.EpisodeDelegate) shows thumbnails at 160x90;
+# render at 2x so they stay sharp on HiDPI screens
+THUMB_SIZE = (320, 180)
+
+
+def default_cache_dir():
+    """ANIPLAY_CACHE_DIR if set, otherwise the platform's per-user cache directory."""
+    if os.environ.get("ANIPLAY_CACHE_DIR"):
+        return Path(os.environ["ANIPLAY_CACHE_DIR"]).absolute() / "thumbnails"
+    if sys.platform == "win32":
+        base = Path(os.environ.get("LOCALAPPDATA", Path.home() / "AppData" / "Local"))
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Caches"
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME", Path.home() / ".cache"))
+    return base.absolute() / "aniplay" / "thumbnails"
+
+
+class ThumbnailCache:
+    """Content-addressed thumbnail store with a byte budget and LRU eviction.
+
+    Files live at <root>/<first 2 hex digits>/<hash>.jpg so no directory gets
+    huge. A manifest.db next to them tracks each file's size and last access;
+    touches are buffered in memory and written out on the next eviction pass.
+    New entries are committed every `commit_every` adds or `commit_interval`
+    seconds, and by flush(), gc() and close(), instead of once per thumbnail.
+    Use ThumbnailCache.shared() so every component sees the same budget.
+    """
+    _instances = {}
+    _instances_lock = threading.Lock()
+
+    def __init__(self, root=None, max_bytes=1024 ** 3, gc_grace=3600, commit_every=256, commit_interval=2.0):
+        self.root = Path(root).absolute() if root else default_cache_dir()
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        # Entries used this recently survive gc(), so a running scan can't lose fresh thumbnails
+        self.gc_grace = gc_grace
+        self.commit_every = commit_every
+        self.commit_interval = commit_interval
+        self._lock = threading.Lock()
+        self._touched = {}
+        self._uncommitted = 0
+        self._last_commit = time.monotonic()
+        self.conn = sqlite3.connect(self.root / "manifest.db", check_same_thread=False)
+        self.conn.execute('''CREATE TABLE IF NOT EXISTS entries (
+            file_hash TEXT PRIMARY KEY,
+            size INTEGER NOT NULL,
+            atime REAL NOT NULL
+        )''')
+        self.conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_atime ON entries(atime)")
+        self.conn.commit()
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+
+    @classmethod
+    def shared(cls, root=None):
+        """Returns the process-wide cache for `root` (the default location if None)."""
+        key = str(Path(root).absolute()) if root else None
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(root)
+            return cls._instances[key]
+
+    def path_for(self, file_hash):
+        return self.root / file_hash[:2] / f"{file_hash}.jpg"
+
+    def touch(self, file_hash):
+        with self._lock:
+            self._touched[file_hash] = time.time()
+
+    def touch_path(self, thumb_path):
+        """Marks a thumbnail as used, given the path stored in the episodes table."""
+        if thumb_path and Path(thumb_path).parent.parent == self.root:
+            self.touch(Path(thumb_path).stem)
+
+    def add(self, file_hash):
+        """Registers a freshly written thumbnail and evicts old ones if over budget."""
+        try:
+            size = self.path_for(file_hash).stat().st_size
+        except OSError:
+            return
+        with self._lock:
+            old = self.conn.execute("SELECT size FROM entries WHERE file_hash = ?", (file_hash,)).fetchone()
+            self.conn.execute("INSERT OR REPLACE INTO entries (file_hash, size, atime) VALUES (?, ?, ?)",
+                              (file_hash, size, time.time()))
+            self._uncommitted += 1
+            if (self._uncommitted >= self.commit_every
+                    or time.monotonic() - self._last_commit >= self.commit_interval):
+                self._commit()
+            self.total_bytes += size - (old[0] if old else 0)
+            over_budget = self.total_bytes > self.max_bytes
+        if over_budget:
+            self.evict()
+
+    def _commit(self):
+        self.conn.commit()
+        self._uncommitted = 0
+        self._last_commit = time.monotonic()
+
+    def _flush_touches(self):
+        if self._touched:
+            self.conn.executemany("UPDATE entries SET atime = ? WHERE file_hash = ?",
+                                  [(atime, file_hash) for file_hash, atime in self._touched.items()])
+            self._touched = {}
+
+    def _remove(self, hashes):
+        for file_hash in hashes:
+            try:
+                self.path_for(file_hash).unlink()
+            except FileNotFoundError:
+                pass
+        self.conn.executemany("DELETE FROM entries WHERE file_hash = ?", [(h,) for h in hashes])
+
+    def evict(self, target_bytes=None):
+        """Deletes least recently used thumbnails until the cache fits in `target_bytes`.
+
+        Defaults to 90% of the budget, so eviction doesn't run again on the
+        very next add. Returns the evicted hashes.
+        """
+        target = int(self.max_bytes * 0.9) if target_bytes is None else target_bytes
+        evicted = []
+        with self._lock:
+            self._flush_touches()
+            for file_hash, size in self.conn.execute("SELECT file_hash, size FROM entries ORDER BY atime ASC"):
+                if self.total_bytes <= target: break
+                evicted.append(file_hash)
+                self.total_bytes -= size
+            self._remove(evicted)
+            self._commit()
+        return evicted
+
+    def gc(self, valid_hashes):
+        """Deletes thumbnails whose hash is not in `valid_hashes`. Returns the deleted hashes."""
+        cutoff = time.time() - self.gc_grace
+        with self._lock:
+            self._flush_touches()
+            stale = [(file_hash, size) for file_hash, size, atime in
+                     self.conn.execute("SELECT file_hash, size, atime FROM entries").fetchall()
+                     if file_hash not in valid_hashes and atime < cutoff]
+            self._remove([file_hash for file_hash, _ in stale])
+            self.total_bytes -= sum(size for _, size in stale)
+            self._commit()
+        return [file_hash for file_hash, _ in stale]
+
+    def flush(self):
+        """Writes buffered touches and commits pending adds."""
+        with self._lock:
+            self._flush_touches()
+            self._commit()
+
+    def close(self):
+        self.flush()
+        with self._instances_lock:
+            for key, instance in list(self._instances.items()):
+                if instance is self:
+                    del self._instances[key]
+        self.conn.close()
+
 
 class ThumbnailManager:
-    def __init__(self, cache_dir=".cache/thumbnails"):
-        self.cache_dir = Path(cache_dir)
-        self.cache_dir.mkdir(parents=True, exist_ok=True)
+    """Extracts episode thumbnails with ffmpeg into a ThumbnailCache.
 
-    def generate_for_episode(self, video_path, file_hash):
-        """Generates a thumbnail for a specific video file using its hash."""
-        output_path = self.cache_dir / f"{file_hash}.jpg"
+    At most `workers` ffmpeg processes run at once, however many threads call
+    in. Frames are scaled and cropped by ffmpeg to the display size, so no
+    full-resolution JPEG is ever encoded.
+    """
 
-        # If thumbnail already exists, don't recreate it
-        if output_path.exists():
-            return str(output_path)
+    def __init__(self, cache=None, workers=None, size=THUMB_SIZE):
+        self.cache = cache or ThumbnailCache.shared()
+        self.workers = workers or os.cpu_count() or 2
+        self.size = size
+        self._slots = threading.BoundedSemaphore(self.workers)
 
-        # FFmpeg command:
+    def build_command(self, video_path, output_path):
+        width, height = self.size
         # -ss 00:00:20 (Seek to 20 seconds to avoid going past NCOP lengths of some files)
         # -i (input file)
         # -frames:v 1 (capture 1 frame)
-        # -q:v 2 (high quality)
-        cmd = [
+        # -vf (fill the display size, then crop the overflow, like KeepAspectRatioByExpanding)
+        # -threads 1 (parallelism comes from running several processes)
+        return [
             'ffmpeg', '-ss', '00:00:20', '-i', str(video_path),
-            '-frames:v', '1', '-q:v', '2', str(output_path),
+            '-frames:v', '1', '-an', '-sn', '-threads', '1',
+            '-vf', f'scale={width}:{height}:force_original_aspect_ratio=increase,crop={width}:{height}',
+            '-q:v', '3', str(output_path),
             '-y', '-loglevel', 'quiet'  # Overwrite and stay silent
         ]
 
+    def generate_for_episode(self, video_path, file_hash):
+        """Generates a thumbnail for a specific video file using its hash."""
+        if not file_hash:
+            return None
+        output_path = self.cache.path_for(file_hash)
+
+        # If thumbnail already exists, don't recreate it
+        tracer = get_tracer()
+        if output_path.exists():
+            self.cache.touch(file_hash)
+            tracer.count("thumbnails_cached")
+            return str(output_path)
+
         try:
-            subprocess.run(cmd, check=True)
+            output_path.parent.mkdir(exist_ok=True)
+            with self._slots:
+                with tracer.span("ffmpeg", cat="thumbnail"):
+                    subprocess.run(self.build_command(video_path, output_path), check=True)
+            self.cache.add(file_hash)
+            tracer.count("thumbnails_generated")
             return str(output_path)
         except Exception as e:
             print(f"Error generating thumbnail: {e}")
-            return None
\ No newline at end of file
+            tracer.count("thumbnails_failed")
+            return None
+
+    def generate_many(self, jobs):
+        """Generates thumbnails for (video_path, file_hash) jobs in parallel.
+
+        Yields (video_path, file_hash, thumbnail_path) in completion order.
+        """
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="thumbnail") as pool:
+            futures = {pool.submit(self.generate_for_episode, video, file_hash): (video, file_hash)
+                       for video, file_hash in jobs}
+            for future in as_completed(futures):
+                video, file_hash = futures[future]
+                yield video, file_hash, future.result()
@@ -0,0 +1,187 @@
+import json
+import os
+import threading
+import time
+from collections import deque
+
+# ANIPLAY_TRACE=1 collects stats; a path ending in .json also writes a Chrome/Perfetto trace there
+TRACE_ENV = "ANIPLAY_TRACE"
+
+
+class ScanStats:
+    """Per-name timers and counters, safe to update from any thread."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.timers = {}
+        self.counters = {}
+
+    def add_time(self, name, duration_ns):
+        with self._lock:
+            timer = self.timers.get(name)
+            if timer is None:
+                self.timers[name] = [1, duration_ns, duration_ns]
+            else:
+                timer[0] += 1
+                timer[1] += duration_ns
+                timer[2] = max(timer[2], duration_ns)
+
+    def count(self, name, value=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def snapshot(self):
+        """Returns {'timers': {name: {count, total_ms, max_ms}}, 'counters': {name: value}}."""
+        with self._lock:
+            return {
+                'timers': {name: {'count': count, 'total_ms': round(total / 1e6, 3), 'max_ms': round(peak / 1e6, 3)}
+                           for name, (count, total, peak) in self.timers.items()},
+                'counters': dict(self.counters),
+            }
+
+    def summary(self):
+        snapshot = self.snapshot()
+        lines = [f"{'timer':<24}{'count':>10}{'total ms':>14}{'avg ms':>10}{'max ms':>10}"]
+        for name, timer in sorted(snapshot['timers'].items(), key=lambda item: -item[1]['total_ms']):
+            lines.append(f"{name:<24}{timer['count']:>10}{timer['total_ms']:>14.1f}"
+                         f"{timer['total_ms'] / timer['count']:>10.2f}{timer['max_ms']:>10.1f}")
+        for name, value in sorted(snapshot['counters'].items()):
+            lines.append(f"{name:<24}{value:>10}")
+        return "\n".join(lines)
+
+
+class _Span:
+    __slots__ = ('tracer', 'name', 'cat', 'args', 'start')
+
+    def __init__(self, tracer, name, cat, args):
+        self.tracer = tracer
+        self.name = name
+        self.cat = cat
+        self.args = args
+
+    def __enter__(self):
+        self.start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.tracer.record(self.name, self.cat, self.start, time.perf_counter_ns(), self.args)
+        return False
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class Tracer:
+    """Records timed spans and counters.
+
+    Every span is kept as a Chrome trace "complete" event (export_chrome()
+    writes a file that chrome://tracing and ui.perfetto.dev open) and also
+    added to the aggregate `stats`. Only the latest `max_events` events are
+    kept; reset() starts a new session (each top-level scan calls it), so a
+    long-running app doesn't pile up every scan it ever ran.
+    """
+    enabled = True
+
+    def __init__(self, trace_path=None, max_events=500_000):
+        self.trace_path = trace_path
+        self.max_events = max_events
+        self.pid = os.getpid()
+        self.reset()
+
+    def reset(self):
+        """Drops the recorded events and stats."""
+        self.stats = ScanStats()
+        self.events = deque(maxlen=self.max_events)
+        self.origin = time.perf_counter_ns()
+
+    def span(self, name, cat="scan", **args):
+        return _Span(self, name, cat, args)
+
+    def record(self, name, cat, start_ns, end_ns, args=None):
+        self.stats.add_time(name, end_ns - start_ns)
+        thread = threading.current_thread()
+        # deque.append is atomic, so worker threads don't need a lock here
+        self.events.append((name, cat, start_ns, end_ns, thread.ident, thread.name, args))
+
+    def count(self, name, value=1):
+        self.stats.count(name, value)
+
+    def export_chrome(self, path=None):
+        """Writes the trace in Chrome's Trace Event format. Returns the path written, if any."""
+        path = path or self.trace_path
+        if not path:
+            return None
+        events = []
+        threads = {}
+        for name, cat, start, end, tid, thread_name, args in list(self.events):
+            threads[tid] = thread_name
+            event = {'name': name, 'cat': cat, 'ph': 'X', 'pid': self.pid, 'tid': tid,
+                     'ts': (start - self.origin) / 1000, 'dur': (end - start) / 1000}
+            if args:
+                event['args'] = args
+            events.append(event)
+        for tid, thread_name in threads.items():
+            events.append({'name': 'thread_name', 'ph': 'M', 'pid': self.pid, 'tid': tid,
+                           'args': {'name': thread_name}})
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({'traceEvents': events, 'displayTimeUnit': 'ms', 'otherData': self.stats.snapshot()}, f)
+        return path
+
+
+class NullTracer:
+    """Stand-in used when tracing is off: every call is a no-op."""
+    enabled = False
+    trace_path = None
+    stats = ScanStats()
+
+    def reset(self):
+        pass
+
+    def span(self, name, cat="scan", **args):
+        return _NULL_SPAN
+
+    def record(self, name, cat, start_ns, end_ns, args=None):
+        pass
+
+    def count(self, name, value=1):
+        pass
+
+    def export_chrome(self, path=None):
+        return None
+
+
+def _from_env():
+    value = os.environ.get(TRACE_ENV, "").strip()
+    if value.lower() in ("", "0", "false", "off"):
+        return NullTracer()
+    return Tracer(trace_path=value if value.lower().endswith(".json") else None)
+
+
+_tracer = _from_env()
+
+
+def get_tracer():
+    """The process-wide tracer (a NullTracer unless tracing was switched on)."""
+    return _tracer
+
+
+def enable(trace_path=None):
+    """Switches tracing on at runtime (e.g. from a setting). Returns the new tracer."""
+    global _tracer
+    _tracer = Tracer(trace_path=trace_path)
+    return _tracer
+
+
+def disable():
+    global _tracer
+    _tracer = NullTracer()
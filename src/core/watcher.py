@@ -0,0 +1,284 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import threading
+import time
+
+from .parser import VIDEO_EXTENSIONS
+
+# inotify(7) event bits
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_MOVE_SELF = 0x00000800
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE |
+              IN_DELETE_SELF | IN_MOVE_SELF | IN_ONLYDIR)
+EVENT_HEADER = struct.Struct('iIII')
+
+# inotify only sees changes made through the local kernel, so these get polled instead
+NETWORK_FILESYSTEMS = {'nfs', 'nfs4', 'cifs', 'smb3', 'smbfs', '9p', 'afs', 'ceph', 'glusterfs',
+                       'fuse.sshfs', 'fuse.rclone', 'fuse.s3fs', 'davfs', 'fuse.davfs2'}
+
+
+def filesystem_type(path):
+    """Returns the type of the filesystem `path` lives on (from /proc/mounts), or None."""
+    path = os.path.realpath(path)
+    best, fs_type = "", None
+    try:
+        with open("/proc/mounts") as mounts:
+            for line in mounts:
+                fields = line.split()
+                if len(fields) < 3: continue
+                # Spaces in mount points are escaped as \040
+                mount_point = fields[1].replace("\\040", " ")
+                if (path == mount_point or path.startswith(mount_point.rstrip("/") + "/")) and len(mount_point) > len(best):
+                    best, fs_type = mount_point, fields[2]
+    except OSError:
+        return None
+    return fs_type
+
+
+class InotifyBackend:
+    """Recursive inotify watch of a directory tree (Linux only)."""
+    mode = "inotify"
+
+    def __init__(self, root_path, extensions):
+        self.root = str(root_path)
+        self.extensions = extensions
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.watches = {}
+        self.add_tree(self.root)
+
+    def add_watch(self, path):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(path), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err == errno.ENOSPC:
+                raise OSError(err, "inotify watch limit reached (fs.inotify.max_user_watches)")
+            # The directory vanished before we got to it
+            return
+        self.watches[wd] = path
+
+    def add_tree(self, path):
+        for root, dirs, files in os.walk(path):
+            self.add_watch(root)
+
+    def drop_tree(self, path):
+        prefix = os.path.join(path, "")
+        for wd, watched in list(self.watches.items()):
+            if watched == path or watched.startswith(prefix):
+                self.libc.inotify_rm_watch(self.fd, wd)
+                del self.watches[wd]
+
+    def read(self, timeout):
+        """Waits up to `timeout` seconds; returns the set of paths that changed."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 256 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, cookie, length = EVENT_HEADER.unpack_from(data, offset)
+            name = os.fsdecode(data[offset + EVENT_HEADER.size:offset + EVENT_HEADER.size + length].rstrip(b"\0"))
+            offset += EVENT_HEADER.size + length
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were lost; let the incremental scan of the whole root sort it out
+                changed.add(self.root)
+                continue
+            if mask & IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+            parent = self.watches.get(wd)
+            if parent is None or mask & (IN_DELETE_SELF | IN_MOVE_SELF):
+                continue
+
+            path = os.path.join(parent, name)
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    try:
+                        self.add_tree(path)
+                    except OSError as e:
+                        print(f"⚠️ Can't watch {path}: {e}")
+                elif mask & IN_MOVED_FROM:
+                    self.drop_tree(path)
+                changed.add(path)
+            elif name.lower().endswith(self.extensions):
+                changed.add(path)
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+class PollingBackend:
+    """Finds changes by comparing stat() snapshots of the tree every `interval` seconds."""
+    mode = "polling"
+
+    def __init__(self, root_path, extensions, interval=30.0):
+        self.root = str(root_path)
+        self.extensions = extensions
+        self.interval = interval
+        self.snapshot = self.take_snapshot()
+        self.next_poll = time.monotonic() + interval
+
+    def take_snapshot(self):
+        snapshot = {}
+        for root, dirs, files in os.walk(self.root):
+            for file in files:
+                if not file.lower().endswith(self.extensions): continue
+                path = os.path.join(root, file)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                snapshot[path] = (st.st_size, st.st_mtime_ns, st.st_ino)
+        return snapshot
+
+    def read(self, timeout):
+        wait = self.next_poll - time.monotonic()
+        if wait > timeout:
+            time.sleep(timeout)
+            return set()
+        time.sleep(max(0.0, wait))
+        self.next_poll = time.monotonic() + self.interval
+
+        snapshot = self.take_snapshot()
+        changed = {path for path, key in snapshot.items() if self.snapshot.get(path) != key}
+        changed.update(path for path in self.snapshot if path not in snapshot)
+        self.snapshot = snapshot
+        return changed
+
+    def close(self):
+        pass
+
+
+def collapse_paths(paths):
+    """Drops every path that lies inside another one in the set."""
+    kept = []
+    for path in sorted(paths):
+        if kept and (path == kept[-1] or path.startswith(os.path.join(kept[-1], ""))):
+            continue
+        kept.append(path)
+    return kept
+
+
+class LibraryWatcher:
+    """Watches a library root and reports changed paths in debounced batches.
+
+    Uses inotify on Linux and falls back to polling elsewhere, on network
+    filesystems (where inotify misses remote changes) or if inotify can't
+    be set up. `on_change(paths)` is called on the watcher's thread once no
+    new event has arrived for `debounce` seconds (or `max_delay` seconds
+    after the first one, during a long burst). The paths are files or
+    directories that were created, modified, moved or deleted; a path that
+    no longer exists means it was removed.
+
+    The watches (or the first polling snapshot) are set up on the watcher's
+    thread, which can take a while on a large network library; `ready` is
+    set, and `on_ready()` called, once they are in place. Changes made from
+    then on are reported.
+    """
+
+    def __init__(self, root_path, on_change, debounce=2.0, max_delay=10.0, poll_interval=30.0, polling=None,
+                 extensions=VIDEO_EXTENSIONS, on_ready=None):
+        self.root_path = os.path.abspath(str(root_path))
+        self.on_change = on_change
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self.poll_interval = poll_interval
+        # None picks a backend automatically, True/False forces polling/inotify
+        self.polling = polling
+        self.extensions = extensions
+        self.on_ready = on_ready
+        self.backend = None
+        self.ready = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def mode(self):
+        # None until the watcher thread has set up its backend
+        return self.backend.mode if self.backend else None
+
+    def create_backend(self):
+        polling = self.polling
+        if polling is None:
+            polling = not sys.platform.startswith("linux") or filesystem_type(self.root_path) in NETWORK_FILESYSTEMS
+        if not polling:
+            try:
+                return InotifyBackend(self.root_path, self.extensions)
+            except (OSError, AttributeError) as e:
+                print(f"⚠️ inotify unavailable ({e}), polling {self.root_path} instead")
+        return PollingBackend(self.root_path, self.extensions, interval=self.poll_interval)
+
+    def start(self):
+        # Walking the tree for the watches happens in _run, off the caller's (GUI) thread
+        self.backend = None
+        self.ready.clear()
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="library-watcher", daemon=True)
+        self._thread.start()
+
+    def wait_ready(self, timeout=None):
+        """Blocks until the watches are in place. Returns False on timeout."""
+        return self.ready.wait(timeout)
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _run(self):
+        try:
+            self.backend = self.create_backend()
+        except Exception as e:
+            print(f"⚠️ Can't watch {self.root_path}: {e}")
+        finally:
+            self.ready.set()
+        if self.on_ready:
+            self.on_ready()
+        if self.backend is None: return
+
+        pending = set()
+        first_event = last_event = None
+        try:
+            while not self._stop.is_set():
+                changed = self.backend.read(0.25)
+                now = time.monotonic()
+                if changed:
+                    pending |= changed
+                    last_event = now
+                    first_event = first_event or now
+
+                if pending and (now - last_event >= self.debounce or now - first_event >= self.max_delay):
+                    batch, pending, first_event = collapse_paths(pending), set(), None
+                    try:
+                        self.on_change(batch)
+                    except Exception as e:
+                        print(f"Watcher callback error: {e}")
+        finally:
+            self.backend.close()
@@ -0,0 +1,163 @@
+from PySide6.QtWidgets import QListView, QStyle, QStyledItemDelegate
+from PySide6.QtCore import QAbstractListModel, QModelIndex, QRect, QSize, Qt, Signal
+from PySide6.QtGui import QColor, QFont
+
+from core.thumbnails import ThumbnailCache
+from ui.image_loader import ImageLoader
+
+THUMB_SLOT = QSize(160, 90)  # 16:9 ratio
+ROW_HEIGHT = 102
+
+FilePathRole = Qt.UserRole + 1
+ThumbnailRole = Qt.UserRole + 2
+
+
+class EpisodeListModel(QAbstractListModel):
+    """Episodes of one series, fetched from SQLite a page at a time as the view scrolls.
+
+    Pages are keyset-paginated on (episode_num, id), so fetching page N costs
+    the same as fetching page 1.
+    """
+
+    def __init__(self, db_manager, page_size=200, parent=None):
+        super().__init__(parent)
+        self.db = db_manager
+        self.page_size = page_size
+        self.anime_id = None
+        self.season = None
+        self.rows = []
+        self.exhausted = True
+
+    def set_anime(self, anime_id, season=None):
+        self.beginResetModel()
+        self.anime_id = anime_id
+        self.season = season
+        self.rows = []
+        self.exhausted = anime_id is None
+        self.endResetModel()
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and not self.exhausted
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid() or self.exhausted: return
+        after = (self.rows[-1][4], self.rows[-1][0]) if self.rows else None
+        page = self.db.get_episodes_page(self.anime_id, after=after, limit=self.page_size, season=self.season)
+        if len(page) < self.page_size:
+            self.exhausted = True
+        if not page: return
+
+        # Keeps recently viewed thumbnails at the back of the eviction queue
+        thumb_cache = ThumbnailCache.shared()
+        for row in page:
+            thumb_cache.touch_path(row[2])
+
+        self.beginInsertRows(QModelIndex(), len(self.rows), len(self.rows) + len(page) - 1)
+        self.rows.extend(page)
+        self.endInsertRows()
+
+    def row_for_episode(self, episode_num):
+        """Returns the row of the first episode numbered >= episode_num, fetching pages as needed."""
+        row = 0
+        while True:
+            for row in range(row, len(self.rows)):
+                if self.rows[row][4] is not None and self.rows[row][4] >= episode_num:
+                    return row
+            if self.exhausted:
+                return len(self.rows) - 1 if self.rows else None
+            self.fetchMore()
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        ep_id, file_path, thumb_path, db_title, db_ep_num, season = self.rows[index.row()]
+
+        # Logic: Use Number if exists, otherwise Index. Use Title if exists, otherwise "Episode X"
+        num = db_ep_num if db_ep_num else index.row() + 1
+        if role == Qt.DisplayRole:
+            title = db_title if db_title else f"Episode {num}"
+            return f"Episode {num}: {title}"
+        if role == FilePathRole:
+            return file_path
+        if role == ThumbnailRole:
+            return thumb_path
+        return None
+
+
+class EpisodeDelegate(QStyledItemDelegate):
+    """Paints an episode row (thumbnail, title, play affordance) without any per-row widgets."""
+
+    def __init__(self, view):
+        super().__init__(view)
+        self.view = view
+        self.loader = ImageLoader.instance()
+        self.loader.loaded.connect(lambda key, pixmap: self.view.viewport().update())
+        self.title_font = QFont()
+        self.title_font.setPixelSize(14)
+        self.title_font.setBold(True)
+
+    def sizeHint(self, option, index):
+        return QSize(option.rect.width(), ROW_HEIGHT)
+
+    def paint(self, painter, option, index):
+        painter.save()
+        card = option.rect.adjusted(2, 2, -2, -2)
+        hovered = option.state & (QStyle.State_MouseOver | QStyle.State_Selected)
+        painter.fillRect(card, QColor("#2a2a2a" if hovered else "#1e1e1e"))
+
+        # 1. Thumbnail
+        thumb_rect = QRect(card.left() + 4, card.top() + (card.height() - THUMB_SLOT.height()) // 2,
+                           THUMB_SLOT.width(), THUMB_SLOT.height())
+        thumb_path = index.data(ThumbnailRole)
+        pixmap = None
+        if thumb_path:
+            pixmap = self.loader.cached(thumb_path, THUMB_SLOT)
+            if pixmap is None:
+                self.loader.request(thumb_path, THUMB_SLOT)
+        if pixmap is not None and not pixmap.isNull():
+            painter.drawPixmap(thumb_rect, pixmap)
+        else:
+            painter.fillRect(thumb_rect, QColor("#333"))
+            if not thumb_path or pixmap is not None:
+                # Fallback if thumbnail failed to generate (a null pixmap is a failed load)
+                painter.setPen(QColor("#777"))
+                painter.drawText(thumb_rect, Qt.AlignCenter, "No Preview")
+
+        # 2. Episode Info
+        play_rect = QRect(card.right() - 88, card.center().y() - 14, 80, 28)
+        text_rect = QRect(thumb_rect.right() + 12, card.top(), play_rect.left() - thumb_rect.right() - 24,
+                          card.height())
+        painter.setFont(self.title_font)
+        painter.setPen(QColor("white"))
+        text = painter.fontMetrics().elidedText(index.data(Qt.DisplayRole), Qt.ElideRight, text_rect.width())
+        painter.drawText(text_rect, Qt.AlignVCenter | Qt.AlignLeft, text)
+
+        # 3. Play Button
+        painter.setFont(option.font)
+        painter.fillRect(play_rect, QColor("#3a3a3a" if hovered else "#333"))
+        painter.drawText(play_rect, Qt.AlignCenter, "▶ Play")
+        painter.restore()
+
+
+class EpisodeListView(QListView):
+    """Virtualized episode list; clicking a row plays it."""
+    episode_activated = Signal(str)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setUniformItemSizes(True)
+        self.setMouseTracking(True)
+        self.setEditTriggers(QListView.NoEditTriggers)
+        self.setVerticalScrollMode(QListView.ScrollPerPixel)
+        self.setItemDelegate(EpisodeDelegate(self))
+        self.clicked.connect(lambda index: self.episode_activated.emit(index.data(FilePathRole)))
+
+    def jump_to_episode(self, episode_num):
+        row = self.model().row_for_episode(episode_num)
+        if row is not None:
+            index = self.model().index(row)
+            self.setCurrentIndex(index)
+            self.scrollTo(index, QListView.PositionAtTop)
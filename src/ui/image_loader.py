@@ -0,0 +1,132 @@
+from collections import OrderedDict
+
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QSize, Qt, Signal
+from PySide6.QtGui import QImage, QImageReader, QPixmap
+
+
+class _LoaderSignals(QObject):
+    # key, decoded QImage (null on failure)
+    decoded = Signal(str, QImage)
+
+
+class _DecodeTask(QRunnable):
+    """Decodes and scales one image off the GUI thread. QImage is safe to build here, QPixmap isn't."""
+
+    def __init__(self, key, path, size, mode, signals):
+        super().__init__()
+        self.key = key
+        self.path = path
+        self.size = size
+        self.mode = mode
+        self.signals = signals
+
+    def run(self):
+        reader = QImageReader(self.path)
+        reader.setAutoTransform(True)
+        source_size = reader.size()
+        if source_size.isValid():
+            # Let the decoder downscale (JPEG can skip most of the work at decode time)
+            reader.setScaledSize(source_size.scaled(self.size, self.mode))
+        image = reader.read()
+
+        if not image.isNull() and image.size() != self.size:
+            image = image.scaled(self.size, self.mode, Qt.SmoothTransformation)
+            if self.mode == Qt.KeepAspectRatioByExpanding:
+                # Crop the overflow so the result fills the slot exactly
+                x = (image.width() - self.size.width()) // 2
+                y = (image.height() - self.size.height()) // 2
+                image = image.copy(x, y, self.size.width(), self.size.height())
+        self.signals.decoded.emit(self.key, image)
+
+
+class ImageLoader(QObject):
+    """Shared asynchronous image loader.
+
+    Images are decoded and scaled on a worker pool and handed back on the GUI
+    thread, both to the callback passed to request() and through the
+    `loaded` signal. Decoded pixmaps are kept in an LRU capped at `max_bytes`,
+    so showing the same image again is instant. Files that fail to decode
+    are remembered too (up to `max_failures`), so cached() answers them with
+    a null pixmap instead of queueing the same failing load on every paint.
+    """
+    loaded = Signal(str, QPixmap)
+
+    _instance = None
+
+    def __init__(self, max_bytes=64 * 1024 ** 2, workers=4, max_failures=4096):
+        super().__init__()
+        self.max_bytes = max_bytes
+        self.max_failures = max_failures
+        self.cache = OrderedDict()
+        self.cache_bytes = 0
+        # Keys whose load failed (missing or unreadable file), oldest first
+        self.failed = OrderedDict()
+        self.pending = {}
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(workers)
+        self.signals = _LoaderSignals()
+        self.signals.decoded.connect(self._on_decoded)
+
+    @classmethod
+    def instance(cls):
+        if cls._instance is None:
+            cls._instance = cls()
+        return cls._instance
+
+    @staticmethod
+    def cache_key(path, size, mode=Qt.KeepAspectRatioByExpanding):
+        return f"{path}|{size.width()}x{size.height()}|{int(mode.value)}"
+
+    def cached(self, path, size, mode=Qt.KeepAspectRatioByExpanding):
+        """Returns the cached pixmap, a null pixmap if it failed to load, or None if it hasn't been loaded yet."""
+        key = self.cache_key(path, size, mode)
+        if key in self.failed:
+            return QPixmap()
+        pixmap = self.cache.get(key)
+        if pixmap is not None:
+            self.cache.move_to_end(key)
+        return pixmap
+
+    def request(self, path, size, callback=None, mode=Qt.KeepAspectRatioByExpanding):
+        """Returns the pixmap right away if cached; otherwise queues a load and returns None.
+
+        `callback(pixmap)` runs on the GUI thread once the load finishes. A
+        null pixmap means the file couldn't be read.
+        """
+        pixmap = self.cached(path, size, mode)
+        if pixmap is not None:
+            return pixmap
+
+        key = self.cache_key(path, size, mode)
+        callbacks = self.pending.get(key)
+        if callbacks is None:
+            callbacks = self.pending[key] = []
+            self.pool.start(_DecodeTask(key, path, QSize(size), mode, self.signals))
+        if callback is not None:
+            callbacks.append(callback)
+        return None
+
+    def _on_decoded(self, key, image):
+        pixmap = QPixmap.fromImage(image)
+        if not pixmap.isNull():
+            self.cache[key] = pixmap
+            self.cache_bytes += self._pixmap_bytes(pixmap)
+            while self.cache_bytes > self.max_bytes and len(self.cache) > 1:
+                _, evicted = self.cache.popitem(last=False)
+                self.cache_bytes -= self._pixmap_bytes(evicted)
+        else:
+            self.failed[key] = True
+            if len(self.failed) > self.max_failures:
+                self.failed.popitem(last=False)
+
+        for callback in self.pending.pop(key, []):
+            try:
+                callback(pixmap)
+            except RuntimeError:
+                # The receiving widget was deleted while the image loaded
+                pass
+        self.loaded.emit(key, pixmap)
+
+    @staticmethod
+    def _pixmap_bytes(pixmap):
+        return pixmap.width() * pixmap.height() * max(pixmap.depth(), 8) // 8
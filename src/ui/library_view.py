@@ -0,0 +1,152 @@
+from PySide6.QtWidgets import QListView, QStyle, QStyledItemDelegate
+from PySide6.QtCore import QAbstractListModel, QModelIndex, QRect, QSize, Qt, Signal
+from PySide6.QtGui import QColor, QPainter, QPainterPath, QPen
+
+from ui.image_loader import ImageLoader
+
+POSTER_SIZE = QSize(160, 240)
+
+AnimeIdRole = Qt.UserRole + 1
+PosterRole = Qt.UserRole + 2
+RatingRole = Qt.UserRole + 3
+
+
+class LibraryModel(QAbstractListModel):
+    """Rows of DatabaseManager.get_library(): (id, title, poster_path, rating)."""
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.rows = []
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.rows)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        anime_id, title, poster, rating = self.rows[index.row()]
+        if role in (Qt.DisplayRole, Qt.ToolTipRole):
+            return title
+        if role == AnimeIdRole:
+            return anime_id
+        if role == PosterRole:
+            return poster
+        if role == RatingRole:
+            return rating
+        return None
+
+    def set_library(self, rows):
+        """Brings the model up to date with `rows` using row-level inserts/removes instead of a reset.
+
+        Both lists are expected in the same order (get_library sorts by title).
+        Views keep their scroll position and only repaint what changed.
+        """
+        rows = [tuple(row) for row in rows]
+        new_ids = [row[0] for row in rows]
+        new_id_set = set(new_ids)
+
+        # 1. Remove rows that are gone, one contiguous block at a time
+        end = len(self.rows) - 1
+        while end >= 0:
+            if self.rows[end][0] in new_id_set:
+                end -= 1
+                continue
+            start = end
+            while start > 0 and self.rows[start - 1][0] not in new_id_set:
+                start -= 1
+            self.beginRemoveRows(QModelIndex(), start, end)
+            del self.rows[start:end + 1]
+            self.endRemoveRows()
+            end = start - 1
+
+        # A changed title can reorder rows; that's rare enough to just reset
+        old_id_set = {row[0] for row in self.rows}
+        if [row[0] for row in self.rows] != [i for i in new_ids if i in old_id_set]:
+            self.beginResetModel()
+            self.rows = rows
+            self.endResetModel()
+            return
+
+        # 2. Insert new rows in contiguous blocks
+        position = 0
+        while position < len(rows):
+            if position < len(self.rows) and self.rows[position][0] == new_ids[position]:
+                position += 1
+                continue
+            end = position
+            while end + 1 < len(rows) and new_ids[end + 1] not in old_id_set:
+                end += 1
+            self.beginInsertRows(QModelIndex(), position, end)
+            self.rows[position:position] = rows[position:end + 1]
+            self.endInsertRows()
+            position = end + 1
+
+        # 3. Refresh rows whose poster, title or rating changed
+        for position, row in enumerate(rows):
+            if self.rows[position] != row:
+                self.rows[position] = row
+                index = self.index(position)
+                self.dataChanged.emit(index, index)
+
+
+class LibraryDelegate(QStyledItemDelegate):
+    """Paints a poster card. Posters load through ImageLoader the first time a card is painted,
+    so only the cards that are actually on screen ever get loaded."""
+
+    def __init__(self, view):
+        super().__init__(view)
+        self.view = view
+        self.loader = ImageLoader.instance()
+        self.loader.loaded.connect(lambda key, pixmap: self.view.viewport().update())
+
+    def sizeHint(self, option, index):
+        return POSTER_SIZE
+
+    def paint(self, painter, option, index):
+        rect = QRect(option.rect.topLeft(), POSTER_SIZE)
+        painter.save()
+        painter.setRenderHint(QPainter.Antialiasing)
+        clip = QPainterPath()
+        clip.addRoundedRect(rect, 5, 5)
+        painter.setClipPath(clip)
+
+        poster = index.data(PosterRole)
+        pixmap = None
+        if poster:
+            pixmap = self.loader.cached(poster, POSTER_SIZE)
+            if pixmap is None:
+                self.loader.request(poster, POSTER_SIZE)
+
+        if pixmap is not None and not pixmap.isNull():
+            painter.drawPixmap(rect, pixmap)
+        else:
+            painter.fillRect(rect, QColor("#222"))
+            painter.setPen(QColor("white"))
+            painter.drawText(rect.adjusted(8, 8, -8, -8), Qt.AlignCenter | Qt.TextWordWrap, index.data(Qt.DisplayRole))
+
+        if option.state & (QStyle.State_MouseOver | QStyle.State_Selected):
+            painter.setClipping(False)
+            painter.setPen(QPen(QColor("white"), 2))
+            painter.drawRoundedRect(rect.adjusted(1, 1, -1, -1), 5, 5)
+        painter.restore()
+
+
+class LibraryView(QListView):
+    """Virtualized poster grid: only visible cards are laid out and painted."""
+    anime_activated = Signal(int)
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.setViewMode(QListView.IconMode)
+        self.setResizeMode(QListView.Adjust)
+        self.setMovement(QListView.Static)
+        self.setUniformItemSizes(True)
+        self.setLayoutMode(QListView.Batched)
+        self.setBatchSize(500)
+        self.setSpacing(10)
+        self.setMouseTracking(True)
+        self.setEditTriggers(QListView.NoEditTriggers)
+        self.setVerticalScrollMode(QListView.ScrollPerPixel)
+        self.setCursor(Qt.PointingHandCursor)
+        self.setItemDelegate(LibraryDelegate(self))
+        self.clicked.connect(lambda index: self.anime_activated.emit(index.data(AnimeIdRole)))
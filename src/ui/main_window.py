@@ -1,20 +1,44 @@
 import sys
 import os
 from pathlib import Path
-from PySide6.QtWidgets import QMainWindow, QFileDialog, QMessageBox, QPushButton
-from PySide6.QtCore import QThreadPool, Qt
-from PySide6.QtGui import QPixmap
+from PySide6.QtWidgets import QMainWindow, QFileDialog, QMessageBox, QComboBox, QCheckBox, QVBoxLayout, QWidget
+from PySide6.QtCore import QRunnable, QThreadPool, QTimer, Qt, Signal
+from PySide6.QtGui import QPixmap, QKeySequence, QShortcut
 
 ROOT_DIR = Path(__file__).parent.parent.parent.absolute()
 if str(ROOT_DIR / "src") not in sys.path:
     sys.path.insert(0, str(ROOT_DIR / "src"))
 
 from .ui_mainwindow import Ui_MainWindow
-from core.scanner import ScannerWorker
-from ui.episode_item import EpisodeItem
+from ui.episode_view import EpisodeListModel, EpisodeListView
+from ui.library_view import LibraryModel, LibraryView
+from ui.search_box import SearchBox
+from core.progress import format_duration
+
+
+class _LibraryLoadTask(QRunnable):
+    """Reads the library off the GUI thread; the rows are delivered through MainWindow.library_rows."""
+
+    def __init__(self, window, generation):
+        super().__init__()
+        self.window = window
+        self.generation = generation
+
+    def run(self):
+        if self.generation != self.window.library_generation: return
+        self.window.library_rows.emit(self.generation, self.window.core.db.get_library())
 
 
 class MainWindow(QMainWindow):
+    # Paths reported by the library watcher (emitted from its thread, handled on the GUI thread)
+    library_changed = Signal(str, object)
+    # A library watcher has its watches in place (emitted from its thread)
+    watch_ready = Signal()
+    # generation, get_library() rows read by a _LibraryLoadTask
+    library_rows = Signal(int, object)
+    # The library grid has been filled (the first time marks the end of startup)
+    library_loaded = Signal()
+
     def __init__(self, launcher):
         super().__init__()
         self.ui = Ui_MainWindow()
@@ -22,6 +46,38 @@ class MainWindow(QMainWindow):
         self.core = launcher
         self.threadpool = QThreadPool()
 
+        # Library grid: a virtualized view in place of the designer's scroll area of buttons
+        self.library_model = LibraryModel(self)
+        self.library_view = LibraryView(self.ui.page_1)
+        self.library_view.setModel(self.library_model)
+        self.library_view.anime_activated.connect(self.open_anime_details)
+
+        # Search box above the grid; results replace the grid's rows
+        self.search_box = SearchBox(self.core.db, self.ui.page_1)
+        self.search_box.results.connect(self.library_model.set_library)
+        library_panel = QWidget(self.ui.page_1)
+        library_layout = QVBoxLayout(library_panel)
+        library_layout.setContentsMargins(0, 0, 0, 0)
+        library_layout.addWidget(self.search_box)
+        library_layout.addWidget(self.library_view)
+        self.ui.horizontalLayout.replaceWidget(self.ui.scrollArea_2, library_panel)
+        self.ui.scrollArea_2.hide()
+
+        # Episode list: same idea, rows are fetched from SQLite page by page as you scroll
+        self.episode_model = EpisodeListModel(self.core.db, parent=self)
+        self.episode_view = EpisodeListView(self.ui.page_2)
+        self.episode_view.setModel(self.episode_model)
+        self.episode_view.episode_activated.connect(self.play_video)
+        self.ui.gridLayout_5.replaceWidget(self.ui.scrollArea, self.episode_view)
+        self.ui.scrollArea.hide()
+        self.current_anime_id = None
+
+        # Season picker doubles as "jump to episode": pick a season or type a number + Enter
+        self.ui.combo_seasons.setInsertPolicy(QComboBox.NoInsert)
+        self.ui.combo_seasons.lineEdit().setPlaceholderText("Season / jump to episode #")
+        self.ui.combo_seasons.activated.connect(self.select_season)
+        self.ui.combo_seasons.lineEdit().returnPressed.connect(self.jump_to_episode)
+
         # Navigation
         self.ui.btn_home.clicked.connect(lambda: self.ui.stacked_widget.setCurrentIndex(0))
         self.ui.btn_library.clicked.connect(lambda: self.ui.stacked_widget.setCurrentIndex(0))
@@ -29,61 +85,175 @@ class MainWindow(QMainWindow):
 
         # Settings
         self.ui.btn_browse_path.clicked.connect(self.browse_folder)
-        self.ui.btn_start_scan.clicked.connect(self.run_library_scan)
+        self.ui.btn_start_scan.clicked.connect(self.toggle_library_scan)
+        self.ui.edit_library_path.textChanged.connect(self.show_scan_checkpoint)
+        self.ui.scan_progress.setValue(0)
+
+        # Watch mode: new, moved or deleted files are picked up without a full rescan
+        # One watcher per library root; changed paths wait per root for the running watch scan
+        self.watchers = []
+        self.watch_scan_running = False
+        self.watch_pending = {}
+        self.chk_watch = QCheckBox("Watch folder for changes", self.ui.page_4)
+        self.ui.gridLayout.addWidget(self.chk_watch, 2, 3, 1, 1)
+        self.chk_watch.toggled.connect(self.toggle_watch)
+        self.library_changed.connect(self.on_library_changed)
+        self.watch_ready.connect(self.show_watch_status)
+
+        # Player page: created on first play, since loading libmpv isn't free
+        self.player = None
+        self.player_backend = None
+        self.ui.video_slider.sliderReleased.connect(lambda: self.player and self.player.seek(self.ui.video_slider.value()))
+        self.ui.lbl_time.setText("")
+        # Leaving the player page pauses it
+        self.ui.stacked_widget.currentChanged.connect(
+            lambda index: index != 2 and self.player is not None and self.player.set_paused(True))
 
         if hasattr(self.ui, 'btn_back_to_library'):
             self.ui.btn_back_to_library.clicked.connect(lambda: self.ui.stacked_widget.setCurrentIndex(0))
 
-        self.display_library()
+        # The library is read off the GUI thread, so the window paints before it is filled
+        self.library_generation = 0
+        self.library_rows.connect(self.on_library_rows)
         self.ui.stacked_widget.setCurrentIndex(0)
+        QTimer.singleShot(0, self.display_library)
 
     def browse_folder(self):
         path = QFileDialog.getExistingDirectory(self, "Select Anime Library")
         if path: self.ui.edit_library_path.setText(path)
 
+    def toggle_library_scan(self):
+        # The scan button doubles as "Cancel" while a scan runs
+        if self.core.is_scanning():
+            self.ui.btn_start_scan.setEnabled(False)
+            self.ui.lbl_scan_status.setText("Cancelling...")
+            self.core.cancel_scans()
+        else:
+            self.run_library_scan()
+
+    def library_roots(self):
+        """The library folders in the path field; several can be given, separated by os.pathsep."""
+        text = self.ui.edit_library_path.text()
+        return [os.path.abspath(path.strip()) for path in text.split(os.pathsep) if path.strip()]
+
     def run_library_scan(self):
-        path = self.ui.edit_library_path.text()
-        if not os.path.exists(path):
+        roots = self.library_roots()
+        if not roots or not all(os.path.isdir(root) for root in roots):
             QMessageBox.warning(self, "Path Error", "Please select a valid folder.")
             return
 
-        self.ui.btn_start_scan.setEnabled(False)
-        worker = ScannerWorker(path, self.core.db)
-        worker.signals.progress.connect(self.ui.lbl_scan_status.setText)
-        worker.signals.finished.connect(self.on_scan_finished)
+        self.ui.btn_start_scan.setText("Cancel")
+        self.ui.lbl_scan_status.setText("Starting scan...")
+        # Always a list, even for one root: MultiRootScanner sizes the hash pool by device (io_limits)
+        worker = self.core.start_library_scan(roots)
+        worker.signals.progress.connect(self.on_scan_progress)
+        worker.signals.finished.connect(lambda count: self.on_scan_finished(worker, count))
+
+    def show_scan_checkpoint(self, path):
+        if self.core.is_scanning(): return
+        roots = [root for root in self.library_roots() if os.path.isdir(root)]
+        resumable = bool(roots) and self.core.has_unfinished_scan(roots)
+        self.ui.btn_start_scan.setText("Resume Scan" if resumable else "Scan")
+        if resumable:
+            self.ui.lbl_scan_status.setText("The last scan of this folder didn't finish; it will pick up where it stopped.")
+
+    def toggle_watch(self, enabled):
+        self.stop_watchers()
+        if not enabled: return
+
+        roots = self.library_roots()
+        if not roots or not all(os.path.isdir(root) for root in roots):
+            QMessageBox.warning(self, "Path Error", "Please select a valid folder.")
+            self.chk_watch.setChecked(False)
+            return
+        from core.watcher import LibraryWatcher
+        for root in roots:
+            watcher = LibraryWatcher(root, lambda paths, root=root: self.library_changed.emit(root, paths),
+                                     on_ready=self.watch_ready.emit)
+            watcher.start()
+            self.watchers.append(watcher)
+        self.show_watch_status()
+
+    def show_watch_status(self):
+        if not self.watchers: return
+        # mode is None while a watcher is still walking its tree, or if it couldn't be set up
+        status = lambda watcher: watcher.mode or ("failed" if watcher.ready.is_set() else "starting")
+        self.ui.lbl_scan_status.setText("Watching " + ", ".join(f"{watcher.root_path} ({status(watcher)})"
+                                                                for watcher in self.watchers))
+
+    def stop_watchers(self):
+        for watcher in self.watchers:
+            watcher.stop()
+        self.watchers = []
+        self.watch_pending = {}
+
+    def on_library_changed(self, root, paths):
+        # One watch scan at a time; changes that arrive meanwhile go into the next one
+        self.watch_pending.setdefault(root, set()).update(paths)
+        if self.watch_scan_running: return
+
+        self.watch_scan_running = True
+        paths = sorted(self.watch_pending.pop(root))
+        from core.tasks import ScannerWorker
+        worker = ScannerWorker(root, self.core.db, metadata_service=self.core.metadata, paths=paths,
+                               trace_session=False)
+        worker.signals.finished.connect(self.on_watch_scan_finished)
         self.threadpool.start(worker)
 
-    def on_scan_finished(self, count):
+    def on_watch_scan_finished(self, count):
+        self.watch_scan_running = False
+        self.display_library()
+        if self.watch_pending:
+            self.on_library_changed(next(iter(self.watch_pending)), [])
+
+    def on_scan_progress(self, progress):
+        # Updates arrive throttled (see ProgressReporter), so this runs a few times a second at most
+        self.ui.lbl_scan_status.setText(progress.describe())
+        if progress.total_known:
+            self.ui.scan_progress.setRange(0, max(progress.files_total, 1))
+            self.ui.scan_progress.setValue(progress.files_done)
+        else:
+            # Busy indicator until the walk knows how many files there are
+            self.ui.scan_progress.setRange(0, 0)
+
+    def on_scan_finished(self, worker, count):
+        self.ui.scan_progress.setRange(0, 1)
+        self.ui.scan_progress.setValue(0 if worker.cancelled else 1)
         self.ui.btn_start_scan.setEnabled(True)
-        self.ui.lbl_scan_status.setText(f"Done! Found {count} episodes.")
+        self.ui.btn_start_scan.setText("Resume Scan" if worker.cancelled else "Scan")
+        if worker.cancelled:
+            self.ui.lbl_scan_status.setText(f"Scan cancelled after {count} episodes; the next scan resumes from here.")
+        else:
+            self.ui.lbl_scan_status.setText(f"Done! Found {count} episodes.")
+        # Per-root throughput of a multi-root scan
+        summary = getattr(worker.scanner, 'summary', None)
+        self.ui.lbl_scan_status.setToolTip(summary() if summary else "")
         self.display_library()
 
+    def closeEvent(self, event):
+        # Cancelled scans flush their checkpoint, so the next start resumes them;
+        # playback positions still in memory are written before the window goes
+        if self.player is not None:
+            self.player.stop()
+            self.player_backend.terminate()
+        self.core.shutdown()
+        self.stop_watchers()
+        super().closeEvent(event)
+
     def display_library(self):
-        if not hasattr(self.ui, 'library_grid'): return
-        while self.ui.library_grid.count():
-            child = self.ui.library_grid.takeAt(0)
-            if child.widget(): child.widget().deleteLater()
-
-        anime_list = self.core.db.get_library()
-        row, col = 0, 0
-        for anime in anime_list:
-            anime_id, title, poster, rating = anime
-            btn = QPushButton()
-            btn.setFixedSize(160, 240)
-            btn.setCursor(Qt.PointingHandCursor)
-
-            if poster and os.path.exists(poster):
-                btn.setStyleSheet(f"border-image: url({poster.replace('\\', '/')}); border-radius: 5px;")
-            else:
-                btn.setText(title)
-                btn.setStyleSheet("background-color: #222; color: white; border-radius: 5px;")
-
-            btn.clicked.connect(lambda checked=False, a_id=anime_id: self.open_anime_details(a_id))
-            self.ui.library_grid.addWidget(btn, row, col)
-            col += 1
-            if col > 4:
-                col = 0
-                row += 1
+        if self.search_box.text().strip():
+            # Keep showing search results; re-run the search against the new data
+            self.search_box.refresh()
+            return
+        # A newer load makes the older ones drop their rows
+        self.library_generation += 1
+        self.threadpool.start(_LibraryLoadTask(self, self.library_generation))
+
+    def on_library_rows(self, generation, rows):
+        if generation != self.library_generation: return
+        # Incremental update: only added, removed or changed series touch the view
+        self.library_model.set_library(rows)
+        self.library_loaded.emit()
 
     def open_anime_details(self, anime_id):
         # 1. Fetch Metadata [cite: 15]
@@ -107,36 +277,72 @@ class MainWindow(QMainWindow):
                     Qt.SmoothTransformation
                 ))
 
-        # 2. Setup Episode Layout [cite: 17]
-        container = self.ui.episode_list_layout
-        layout = container if hasattr(container, 'count') else container.layout()
-        if layout is None: return
-
-        while layout.count():
-            child = layout.takeAt(0)
-            if child.widget():
-                child.widget().deleteLater()
+        # 2. Setup Episode List [cite: 17]
+        self.current_anime_id = anime_id
+        self.ui.combo_seasons.clear()
+        self.ui.combo_seasons.addItem("All Seasons", None)
+        for season in self.core.db.get_seasons(anime_id):
+            self.ui.combo_seasons.addItem(f"Season {season}", season)
+        self.episode_model.set_anime(anime_id)
 
         # Switch to Details Page (Page Index 1)
 
         self.ui.stacked_widget.setCurrentIndex(1)
 
+    def select_season(self, combo_index):
+        if self.current_anime_id is None: return
+        self.episode_model.set_anime(self.current_anime_id, season=self.ui.combo_seasons.itemData(combo_index))
+
+    def jump_to_episode(self):
+        text = self.ui.combo_seasons.currentText().strip()
+        if text.isdigit():
+            self.episode_view.jump_to_episode(int(text))
+
+    def create_player(self):
+        """Sets up the mpv backend and the PlayerController; False (after telling the user) if mpv can't be loaded."""
         try:
-            episodes = self.core.db.get_episodes(anime_id)
-            for index, ep in enumerate(episodes):
-                # Unpack all 5 columns
-                ep_id, file_path, thumb_path, db_title, db_ep_num = ep
-
-                # Logic: Use Number if exists, otherwise Index. Use Title if exists, otherwise "Episode X"
-                num = db_ep_num if db_ep_num else index + 1
-                title = db_title if db_title else f"Episode {num}"
-
-                item = EpisodeItem(title=title, ep_number=num, thumb_path=thumb_path, file_path=file_path)
-                item.clicked.connect(self.play_video)
-                layout.addWidget(item)
-            layout.addStretch()
-        except Exception as e:
-            print(f"❌ Error: {e}")
+            from ui.player_view import MpvBackend
+            backend = MpvBackend(self.ui.video_container, self)
+        except (ImportError, OSError) as e:
+            QMessageBox.warning(self, "Player unavailable", f"Could not load mpv: {e}")
+            return False
+        from core.player import PlayerController
+        self.player_backend = backend
+        self.player = PlayerController(backend, self.core.db, playback=self.core.playback,
+                                       on_opened=self.on_episode_opened)
+        backend.position.connect(self.on_player_position)
+
+        page = self.ui.page_3
+        QShortcut(QKeySequence("Shift+N"), page, self.player.play_next)
+        QShortcut(QKeySequence("Shift+P"), page, self.player.play_previous)
+        QShortcut(QKeySequence(Qt.Key_Escape), page, self.stop_video)
+        return True
 
     def play_video(self, file_path):
-        print(f"🎬 Playing: {file_path}")
\ No newline at end of file
+        if self.player is None and not self.create_player(): return
+        if not self.player.play_file(file_path):
+            QMessageBox.warning(self, "Not in library", f"{file_path} isn't in the library; rescan it first.")
+            return
+        self.ui.video_slider.setValue(0)
+        self.ui.stacked_widget.setCurrentIndex(2)
+
+    def stop_video(self):
+        self.player.stop()
+        self.ui.stacked_widget.setCurrentIndex(1)
+
+    def on_episode_opened(self, episode, latency, warm_cache):
+        # The player's own open-to-first-frame latency, for "why is next episode slow?"
+        note = f"{episode[3] or os.path.basename(episode[1])}: first frame in {latency * 1000:.0f} ms"
+        if warm_cache:
+            note += " (from the prefetched cache)"
+        self.ui.lbl_time.setToolTip(note)
+        print(f"🎬 {note}")
+
+    def on_player_position(self, position, duration):
+        if duration:
+            self.ui.video_slider.setMaximum(int(duration))
+        # Don't fight the user dragging the slider
+        if not self.ui.video_slider.isSliderDown():
+            self.ui.video_slider.setValue(int(position))
+        total = f" / {format_duration(duration)}" if duration else ""
+        self.ui.lbl_time.setText(format_duration(position) + total)
@@ -0,0 +1,91 @@
+import os
+import sys
+from pathlib import Path
+
+from PySide6.QtCore import QObject, Signal
+
+ROOT_DIR = Path(__file__).parent.parent.parent.absolute()
+
+
+def _import_mpv():
+    """Imports python-mpv, finding the mpv-1.dll shipped next to the app on Windows.
+
+    Raises ImportError or OSError when libmpv can't be loaded.
+    """
+    if sys.platform == "win32":
+        os.environ["PATH"] = str(ROOT_DIR) + os.pathsep + os.environ.get("PATH", "")
+        if hasattr(os, 'add_dll_directory'):
+            os.add_dll_directory(str(ROOT_DIR))
+    import mpv
+    return mpv
+
+
+class MpvBackend(QObject):
+    """Player backend for core.player.PlayerController: libmpv drawing into a Qt widget.
+
+    mpv reports events and property changes on its own thread; they are
+    re-emitted as Qt signals, so the controller's callbacks (on_first_frame,
+    on_position, on_paused, on_end) run on the GUI thread.
+    """
+    first_frame = Signal()
+    position = Signal(object, object)
+    paused = Signal(bool)
+    ended = Signal()
+
+    def __init__(self, container, parent=None):
+        super().__init__(parent)
+        mpv = _import_mpv()
+        self.on_first_frame = None
+        self.on_position = None
+        self.on_paused = None
+        self.on_end = None
+        self.duration = None
+        self._second = None
+
+        # mpv renders into the container widget's native window
+        self.player = mpv.MPV(wid=str(int(container.winId())), input_default_bindings=True,
+                              input_vo_keyboard=True, osc=True, keep_open="no")
+
+        self.first_frame.connect(lambda: self.on_first_frame and self.on_first_frame())
+        self.position.connect(lambda position, duration: self.on_position and self.on_position(position, duration))
+        self.paused.connect(lambda paused: self.on_paused and self.on_paused(paused))
+        self.ended.connect(lambda: self.on_end and self.on_end())
+
+        # playback-restart: the first frame after a load (or a seek) is up
+        self.player.event_callback('playback-restart')(lambda event: self.first_frame.emit())
+
+        @self.player.event_callback('end-file')
+        def end_file(event):
+            # Only a real end of the file; stop() and load() of another file end it too
+            if event.data is not None and event.data.reason == mpv.MpvEventEndFile.EOF:
+                self.ended.emit()
+
+        self.player.observe_property('duration', self._on_duration)
+        self.player.observe_property('time-pos', self._on_time_pos)
+        self.player.observe_property('pause', lambda name, value: self.paused.emit(bool(value)))
+
+    def _on_duration(self, name, value):
+        self.duration = value
+
+    def _on_time_pos(self, name, value):
+        # time-pos changes every frame; the UI and the playback state only need seconds
+        if value is None or int(value) == self._second: return
+        self._second = int(value)
+        self.position.emit(value, self.duration)
+
+    def load(self, path, start=0.0):
+        self._second = None
+        self.player.loadfile(str(path), start=str(start))
+        self.player.pause = False
+
+    def set_paused(self, paused):
+        self.player.pause = paused
+
+    def seek(self, position):
+        self.player.seek(position, reference="absolute")
+
+    def stop(self):
+        self.player.command('stop')
+
+    def terminate(self):
+        self.player.terminate()
@@ -0,0 +1,73 @@
+from PySide6.QtWidgets import QLineEdit
+from PySide6.QtCore import QObject, QRunnable, QThreadPool, QTimer, Signal
+
+from core.search import LibrarySearch
+
+
+class _SearchSignals(QObject):
+    # generation, result rows (None if the search was cancelled)
+    done = Signal(int, object)
+
+
+class _SearchTask(QRunnable):
+    """Runs one search off the GUI thread, giving up as soon as a newer one starts."""
+
+    def __init__(self, box, generation, text):
+        super().__init__()
+        self.box = box
+        self.generation = generation
+        self.text = text
+
+    def is_stale(self):
+        return self.generation != self.box.generation
+
+    def run(self):
+        if self.is_stale(): return
+        rows = self.box.search.search(self.text, is_cancelled=self.is_stale)
+        self.box.signals.done.emit(self.generation, rows)
+
+
+class SearchBox(QLineEdit):
+    """Search-as-you-type for the library.
+
+    Typing restarts a short debounce timer, so a search only runs once the
+    user pauses. Each search gets a generation number: a newer search
+    interrupts the SQLite query of an older one, and results that arrive
+    out of date are dropped. `results` carries get_library()-style rows.
+    """
+    results = Signal(object)
+
+    def __init__(self, db_manager, parent=None, debounce_ms=150):
+        super().__init__(parent)
+        self.search = LibrarySearch(db_manager)
+        self.generation = 0
+        self.signals = _SearchSignals()
+        self.signals.done.connect(self._on_done)
+        # One worker: a stale search is cancelled rather than run alongside the new one
+        self.pool = QThreadPool(self)
+        self.pool.setMaxThreadCount(1)
+
+        self.timer = QTimer(self)
+        self.timer.setSingleShot(True)
+        self.timer.setInterval(debounce_ms)
+        self.timer.timeout.connect(self.refresh)
+
+        self.setPlaceholderText("Search library...")
+        self.setClearButtonEnabled(True)
+        self.textChanged.connect(self.on_text_changed)
+        self.returnPressed.connect(self.refresh)
+
+    def on_text_changed(self, text):
+        # Any search still running is out of date now
+        self.generation += 1
+        self.timer.start()
+
+    def refresh(self):
+        """Runs the search for the current text right away."""
+        self.timer.stop()
+        self.generation += 1
+        self.pool.start(_SearchTask(self, self.generation, self.text()))
+
+    def _on_done(self, generation, rows):
+        if generation == self.generation and rows is not None:
+            self.results.emit(rows)
@@ -0,0 +1,176 @@
+import sqlite3
+
+import pytest
+
+from core.database import MIGRATIONS, SCHEMA_VERSION, DatabaseManager, migrate_base_schema
+
+
+def counts(db, anime_id):
+    with db.get_read_connection() as conn:
+        return conn.execute("SELECT episode_count, watched_count, watch_state FROM anime WHERE id = ?",
+                            (anime_id,)).fetchone()
+
+
+def episode(db, file_hash):
+    with db.get_read_connection() as conn:
+        return conn.execute("SELECT id, anime_id, file_path, title FROM episodes WHERE file_hash = ?",
+                            (file_hash,)).fetchone()
+
+
+@pytest.fixture
+def series(db):
+    """Two series with three episodes in the first, written through a BulkWriter."""
+    with db.bulk_writer() as writer:
+        first = writer.get_or_create_anime("Alpha", "/lib/Alpha")
+        second = writer.get_or_create_anime("Beta", "/lib/Beta")
+        for number in (1, 2, 3):
+            writer.add_episode(first, f"/lib/Alpha/{number}.mkv", 1, number, f"Dawn {number}", f"a{number}", None)
+            writer.update_file_index(f"/lib/Alpha/{number}.mkv", 100, number, number)
+    return first, second
+
+
+def test_bulk_writer_inserts_and_indexes(db, series):
+    first, _ = series
+    assert [row[4] for row in db.get_episodes(first)] == [1, 2, 3]
+    assert counts(db, first) == (3, 0, 0)
+    assert db.get_file_index("/lib/Alpha") == {f"/lib/Alpha/{n}.mkv": (100, n, n) for n in (1, 2, 3)}
+    assert [row[1] for row in db.search_library('"dawn"*')] == ["Alpha"]
+
+
+def test_bulk_writer_relinks_moved_file_by_hash(db, series):
+    first, second = series
+    original = episode(db, "a1")
+    db.save_playback_state([(original[0], 600.0, True)])
+    with db.bulk_writer() as writer:
+        writer.add_episode(second, "/lib/Beta/moved.mkv", 1, 1, None, "a1", None)
+
+    moved = episode(db, "a1")
+    # Same row, new path and series; a missing title keeps the old one
+    assert moved == (original[0], second, "/lib/Beta/moved.mkv", "Dawn 1")
+    assert db.get_playback_state(original[0]) == (600.0, 1)
+    assert counts(db, first) == (2, 0, 0)
+    assert counts(db, second) == (1, 1, 2)
+
+
+def test_bulk_writer_rehash_keeps_row_by_path(db, series):
+    original = episode(db, "a2")
+    with db.bulk_writer() as writer:
+        writer.add_episode(series[0], "/lib/Alpha/2.mkv", 1, 2, "Dusk 2", "changed", None)
+    assert episode(db, "a2") is None
+    assert episode(db, "changed")[0] == original[0]
+    # The search index follows the new title, without a per-row trigger
+    assert db.search_library('"dawn"*') and db.search_library('"dusk"*')
+    with db.get_read_connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM episode_fts WHERE episode_fts MATCH 'dusk'").fetchone() == (1,)
+        assert conn.execute("SELECT COUNT(*) FROM episode_fts WHERE episode_fts MATCH 'dawn'").fetchone() == (2,)
+        assert conn.execute("SELECT COUNT(*) FROM bulk_ingest").fetchone() == (0,)
+
+
+def test_triggers_still_run_outside_bulk_writes(db, series):
+    first, _ = series
+    db.add_episode(first, "/lib/Alpha/4.mkv", 1, 4, "Noon 4", "a4", None)
+    assert counts(db, first) == (4, 0, 0)
+    db.save_playback_state([(episode(db, "a4")[0], None, True)])
+    assert counts(db, first) == (4, 1, 1)
+    assert db.delete_paths(["/lib/Alpha/4.mkv"]) == 1
+    assert counts(db, first) == (3, 0, 0)
+    assert db.search_library('"noon"*') == []
+
+
+def test_delete_paths_removes_emptied_series(db, series):
+    first, _ = series
+    assert db.delete_paths(["/lib/Alpha"]) == 3
+    assert db.get_anime_details(first) is None
+    assert db.get_file_index("/lib/Alpha") == {}
+
+
+def test_get_episode_by_path(db, series):
+    assert db.get_episode_by_path("/lib/Alpha/2.mkv") == episode(db, "a2")[:2]
+    assert db.get_episode_by_path("/lib/Alpha/9.mkv") is None
+
+
+def test_filter_library_genres_and_facets(db, series):
+    first, second = series
+    third = db.get_or_create_anime("Gamma", "/lib/Gamma")
+    db.update_anime_metadata(first, 1, 8.5, None, "Action, Comedy")
+    db.update_anime_metadata(second, 2, 6.0, None, ["Action"])
+    db.update_anime_metadata(third, 3, 9.1, None, "Comedy, Drama")
+
+    rows, facets = db.filter_library(genres=["Action", "Comedy"])
+    assert [row[1] for row in rows] == ["Alpha"]
+    assert facets['genres'] == {"Action": 1, "Comedy": 1}
+
+    rows, facets = db.filter_library(genres=["Action", "Comedy"], match_all=False)
+    assert [row[1] for row in rows] == ["Alpha", "Beta", "Gamma"]
+    assert facets['genres'] == {"Action": 2, "Comedy": 2, "Drama": 1}
+    assert facets['rating'] == {6: 1, 8: 1, 9: 1}
+
+    rows, facets = db.filter_library(min_rating=8, watched="unwatched", limit=1)
+    assert [row[1] for row in rows] == ["Alpha"]
+    assert facets['watch_state'] == {"unwatched": 2}
+    assert db.filter_library(genres=["Action", "Nonexistent"])[0] == []
+
+
+def test_scan_checkpoint_roundtrip(db):
+    db.start_scan_checkpoint("/lib")
+    with db.bulk_writer() as writer:
+        writer.complete_dir("/lib", "/lib/Alpha")
+        writer.checkpoint("/lib", 24)
+    assert db.get_scan_checkpoint("/lib")[0] == "running"
+    assert db.get_scan_checkpoint("/lib")[3] == 24
+    assert db.get_completed_dirs("/lib") == {"/lib/Alpha"}
+
+    # Starting again keeps the progress of the unfinished scan
+    db.set_scan_status("/lib", "cancelled")
+    db.start_scan_checkpoint("/lib")
+    assert db.get_scan_checkpoint("/lib")[::3] == ("running", 24)
+    db.clear_scan_checkpoint("/lib")
+    assert db.get_scan_checkpoint("/lib") is None
+    assert db.get_completed_dirs("/lib") == set()
+
+
+@pytest.mark.parametrize("version", [0, 1])
+def test_migrates_older_databases(tmp_path, version):
+    path = tmp_path / "old.db"
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+    migrate_base_schema(cursor)
+    cursor.execute("INSERT INTO anime (title, folder_path, genres) VALUES ('Old', '/lib/Old', 'Action, Drama')")
+    cursor.execute("INSERT INTO episodes (anime_id, file_path, file_hash, episode_num, is_watched) "
+                   "VALUES (1, '/lib/Old/1.mkv', 'h1', 1, 1)")
+    cursor.execute(f"PRAGMA user_version = {version}")
+    conn.commit()
+    conn.close()
+
+    db = DatabaseManager(db_path=path)
+    try:
+        with db.get_read_connection() as read:
+            assert read.execute("PRAGMA user_version").fetchone() == (SCHEMA_VERSION,)
+        assert db.get_genres() == [("Action", 1), ("Drama", 1)]
+        assert counts(db, 1) == (1, 1, 2)
+    finally:
+        db.close()
+
+
+def test_interrupted_migration_runs_again(tmp_path, monkeypatch):
+    path = tmp_path / "aniplay.db"
+
+    migrations = list(MIGRATIONS)
+
+    def interrupted(cursor):
+        # Fails after its ALTER TABLEs are committed
+        migrations[1](cursor)
+        cursor.connection.commit()
+        raise RuntimeError("interrupted")
+
+    monkeypatch.setattr("core.database.MIGRATIONS", [migrations[0], interrupted])
+    with pytest.raises(RuntimeError):
+        DatabaseManager(db_path=path)
+    monkeypatch.setattr("core.database.MIGRATIONS", migrations)
+
+    db = DatabaseManager(db_path=path)
+    try:
+        with db.get_read_connection() as read:
+            assert read.execute("PRAGMA user_version").fetchone() == (SCHEMA_VERSION,)
+    finally:
+        db.close()
@@ -0,0 +1,34 @@
+from core.metadata import MetadataService
+
+
+class FakeAPI:
+    def __init__(self):
+        self.requests = []
+
+    def fetch_anime(self, title):
+        self.requests.append(title)
+        return {"mal_id": 1, "rating": 8.0, "synopsis": "", "genres": "Action"}
+
+
+def test_failed_lookup_does_not_block_the_title(db, monkeypatch):
+    api = FakeAPI()
+    service = MetadataService(db, api=api)
+    anime_id = db.get_or_create_anime("Alpha", "/lib/Alpha")
+
+    lookup = service.lookup
+    calls = []
+
+    def flaky(key, title):
+        calls.append(title)
+        if len(calls) == 1:
+            raise RuntimeError("database is locked")
+        return lookup(key, title)
+
+    monkeypatch.setattr(service, "lookup", flaky)
+    assert service.enqueue(anime_id, "Alpha")
+    assert service.wait(5)
+    assert api.requests == []
+
+    assert service.enqueue(anime_id, "Alpha")
+    assert service.wait(5)
+    assert api.requests == ["Alpha"]
@@ -0,0 +1,22 @@
+import pytest
+
+from bench_parser import BENCH_DIR, load_corpus
+from core.parser import EpisodeParser
+
+CORPUS = load_corpus(BENCH_DIR / "parser_corpus.tsv")
+
+
+@pytest.fixture(scope="module")
+def parser():
+    return EpisodeParser()
+
+
+@pytest.mark.parametrize("name, expected", CORPUS, ids=[name for name, _ in CORPUS])
+def test_corpus(parser, name, expected):
+    parsed = parser.parse(name)._asdict()
+    assert {field: parsed[field] for field in expected} == expected
+
+
+def test_parse_many_matches_parse(parser):
+    names = [name for name, _ in CORPUS]
+    assert parser.parse_many(names) == [parser.parse(name) for name in names]
@@ -0,0 +1,192 @@
+import os
+
+import pytest
+
+from core.playback import PlaybackStateService
+from core.player import MIN_RESUME_SECONDS, EpisodeQueue, PlayerController, Prefetcher
+from synthetic import StubPlayer
+
+MB = 1024 ** 2
+
+
+def holds(fd, path):
+    """True if descriptor `fd` is open on `path` (descriptor numbers are reused, so compare the file)."""
+    try:
+        opened = os.fstat(fd)
+    except OSError:
+        return False
+    target = os.stat(path)
+    return (opened.st_dev, opened.st_ino) == (target.st_dev, target.st_ino)
+
+
+@pytest.fixture
+def series(db, tmp_path):
+    """A three-episode series, added out of order; returns the file paths by episode number."""
+    anime_id = db.get_or_create_anime("Show", str(tmp_path))
+    paths = []
+    for number in (1, 2, 3):
+        path = tmp_path / f"Show - {number:02d}.mkv"
+        path.write_bytes(os.urandom(3 * MB if number == 2 else 1024))
+        paths.append(str(path))
+    for number in (3, 1, 2):
+        db.add_episode(anime_id, paths[number - 1], 1, number, f"Episode {number}", f"hash{number}", None)
+    return paths
+
+
+@pytest.fixture
+def player(db):
+    """A PlayerController on a StubPlayer; the controller records what it took from the prefetcher."""
+    backend = StubPlayer()
+    prefetcher = Prefetcher(head_bytes=MB, tail_bytes=MB // 2, chunk_size=256 * 1024)
+    controller = PlayerController(backend, db, prefetcher=prefetcher)
+    controller.taken = []
+    take = prefetcher.take
+
+    def recording_take(path):
+        fd = take(path)
+        controller.taken.append((path, fd))
+        return fd
+
+    prefetcher.take = recording_take
+    yield controller
+    controller.stop()
+
+
+def test_queue_follows_get_episodes_order(db, series):
+    queue = EpisodeQueue.for_file(db, series[1])
+    assert queue.current[1] == series[1]
+    assert queue.peek_next()[1] == series[2]
+    assert queue.advance(1)[1] == series[2]
+    assert queue.peek_next() is None
+    # Past the end: nothing, and the cursor stays on the last episode
+    assert queue.advance(1) is None
+    assert queue.current[1] == series[2]
+    assert queue.advance(-2)[1] == series[0]
+
+
+def test_queue_for_unknown_file(db, series, tmp_path):
+    assert EpisodeQueue.for_file(db, str(tmp_path / "elsewhere.mkv")) is None
+
+
+def test_first_frame_prefetches_next_episode(player, series):
+    assert player.play_file(series[0])
+    assert player.backend.loads == [(series[0], 0.0)]
+    assert player.prefetcher.wait(5)
+    assert player.prefetcher.is_warm(series[1])
+    # Head and tail of the 3 MB file, not the middle
+    assert player.prefetcher.bytes_read == MB + MB // 2
+
+
+def test_next_episode_opens_from_warm_cache(player, series):
+    player.play_file(series[0])
+    player.prefetcher.wait(5)
+    player.backend.auto_first_frame = False
+    assert player.play_next()
+
+    # The backend opens the file by path; the prefetch's descriptor stays with the controller
+    assert player.backend.loads[-1] == (series[1], 0.0)
+    path, fd = player.taken[-1]
+    assert path == series[1] and fd is not None
+    # Held open through the load, closed once the first frame is up
+    assert holds(fd, series[1])
+    player.backend.on_first_frame()
+    assert not holds(fd, series[1])
+    assert player.latencies[-1]['episode_id'] == player.current[0]
+
+    # Back to the first episode, which nothing prefetched
+    player.backend.auto_first_frame = True
+    assert player.play_previous()
+    assert player.taken[-1] == (series[0], None)
+    assert [latency['warm_cache'] for latency in player.latencies] == [False, True, False]
+
+
+def test_stop_releases_held_descriptor(player, series):
+    player.play_file(series[0])
+    player.prefetcher.wait(5)
+    player.backend.auto_first_frame = False
+    player.play_next()
+    fd = player.taken[-1][1]
+    player.stop()
+    assert not holds(fd, series[1])
+
+
+def test_seek_restart_is_not_a_first_frame(player, series):
+    player.play_file(series[0])
+    player.backend.seek(30.0)
+    assert len(player.latencies) == 1
+
+
+def test_end_of_file_plays_next_and_stops_at_last(player, series):
+    player.play_file(series[1])
+    player.backend.finish()
+    assert player.current[1] == series[2]
+    assert player.taken[-1][0] == series[2]
+    # Last episode: nothing left to prefetch or play
+    assert player.prefetcher.path is None
+    player.backend.finish()
+    assert player.current[1] == series[2]
+    assert [load[0] for load in player.backend.loads] == [series[1], series[2]]
+
+
+def test_resumes_stored_position_and_marks_watched(db, series):
+    playback = PlaybackStateService(db, flush_interval=60)
+    backend = StubPlayer()
+    controller = PlayerController(backend, db, playback=playback, auto_next=False)
+    try:
+        controller.play_file(series[0])
+        backend.tick(MIN_RESUME_SECONDS - 1, 1440.0)
+        controller.stop()
+        controller.play_file(series[0])
+        # Too close to the start to be worth resuming
+        assert backend.loads[-1] == (series[0], 0.0)
+
+        backend.tick(300.0, 1440.0)
+        controller.stop()
+        controller.play_file(series[0])
+        assert backend.loads[-1] == (series[0], 300.0)
+
+        episode_id = controller.current[0]
+        backend.finish()
+        playback.flush(wait=True)
+        assert db.get_playback_state(episode_id)[1]
+    finally:
+        controller.stop()
+        playback.close()
+
+
+def test_cancel_closes_descriptor(tmp_path):
+    path = tmp_path / "episode.mkv"
+    path.write_bytes(os.urandom(MB))
+    prefetcher = Prefetcher()
+    prefetcher.warm(path)
+    prefetcher.wait(5)
+    fd = prefetcher._fd
+    assert holds(fd, path)
+    prefetcher.cancel()
+    assert not holds(fd, path)
+    assert not prefetcher.is_warm(path)
+
+
+def test_warm_replaces_previous_prefetch(tmp_path):
+    first, second = tmp_path / "a.mkv", tmp_path / "b.mkv"
+    first.write_bytes(b"a" * 1024)
+    second.write_bytes(b"b" * 1024)
+    prefetcher = Prefetcher()
+    prefetcher.warm(first)
+    prefetcher.wait(5)
+    first_fd = prefetcher._fd
+    prefetcher.warm(second)
+    prefetcher.wait(5)
+    assert not holds(first_fd, first)
+    assert prefetcher.is_warm(second)
+    # Taking a file that isn't the prefetched one gives nothing and drops the prefetch
+    assert prefetcher.take(first) is None
+    assert prefetcher.path is None
+    prefetcher.cancel()
+
+
+def test_missing_file_is_not_prefetched(tmp_path):
+    prefetcher = Prefetcher()
+    prefetcher.warm(tmp_path / "gone.mkv")
+    assert prefetcher.wait(5)
+    assert prefetcher.take(tmp_path / "gone.mkv") is None
@@ -0,0 +1,125 @@
+import os
+
+import pytest
+
+from core.devices import DEFAULT_IO_LIMITS
+from core.scanner import LibraryScanner, MultiRootScanner
+from synthetic import EPISODES_PER_SEASON, SEASONS_PER_SERIES, install_ffmpeg_stub, make_library
+
+PER_SERIES = EPISODES_PER_SEASON * SEASONS_PER_SERIES
+
+
+@pytest.fixture
+def library(tmp_path, monkeypatch):
+    """Two synthetic series; thumbnails go to a stub ffmpeg and a temporary cache."""
+    monkeypatch.setenv("ANIPLAY_CACHE_DIR", str(tmp_path / "cache"))
+    # install_ffmpeg_stub prepends to PATH; setenv first so it's restored afterwards
+    monkeypatch.setenv("PATH", os.environ["PATH"])
+    install_ffmpeg_stub(tmp_path / "bin")
+    root = tmp_path / "library"
+    paths = make_library(root, 2 * PER_SERIES)
+    return root, paths
+
+
+def scanner(root, db, **kwargs):
+    kwargs.setdefault("incremental", False)
+    return LibraryScanner(root, db, fetch_metadata=False, hash_workers=2, thumb_workers=2, **kwargs)
+
+
+def cancel_after(scan, written):
+    """Cancels `scan` once it has written `written` episodes."""
+    write_item = scan.write_item
+
+    def write_and_cancel(item):
+        result = write_item(item)
+        if scan.written == written:
+            scan.cancel()
+        return result
+
+    scan.write_item = write_and_cancel
+
+
+def test_full_then_incremental_scan(db, library):
+    root, paths = library
+    assert scanner(root, db).run() == len(paths)
+    assert len(db.get_library()) == 2
+    assert db.get_scan_checkpoint(str(root)) is None
+
+    incremental = scanner(root, db, incremental=True)
+    assert incremental.run() == len(paths)
+    assert (incremental.written, incremental.unchanged) == (0, len(paths))
+
+
+@pytest.mark.parametrize("incremental", [False, True])
+def test_cancelled_scan_resumes_from_checkpoint(db, library, incremental):
+    root, paths = library
+    first = scanner(root, db, incremental=incremental)
+    cancel_after(first, PER_SERIES + 5)
+    first.run()
+    assert first.cancelled
+    assert db.get_scan_checkpoint(str(root))[0] == "cancelled"
+    done = db.get_completed_dirs(str(root))
+    assert done
+
+    second = scanner(root, db, incremental=incremental)
+    assert second.run() == len(paths)
+    assert second.resumed
+    # Directories the first run finished are skipped, whatever the incremental setting; an incremental
+    # scan also skips what the first run wrote in the directories it didn't finish
+    in_done_dirs = sum(1 for path in paths if os.path.dirname(path) in done)
+    assert second.unchanged == (first.written if incremental else in_done_dirs)
+    assert second.written + second.unchanged == len(paths)
+    assert db.get_scan_checkpoint(str(root)) is None
+    assert sum(len(db.get_episodes(row[0])) for row in db.get_library()) == len(paths)
+
+
+def test_watch_scan_relinks_moved_file(db, library, monkeypatch):
+    root, paths = library
+    scanner(root, db).run()
+    old_path = paths[0]
+    before = db.get_episode_by_path(old_path)
+    new_path = os.path.join(os.path.dirname(old_path), "renamed - 01.mkv")
+    os.rename(old_path, new_path)
+
+    # What a LibraryWatcher reports for a rename: both paths
+    watch_scan = scanner(root, db, incremental=True, paths=[old_path, new_path])
+    collected = []
+    monkeypatch.setattr(watch_scan.thumb_manager.cache, "gc", collected.append)
+    watch_scan.run()
+    # Thumbnail GC reads every hash in the library; only full scans run it
+    assert collected == []
+    assert db.get_episode_by_path(old_path) is None
+    assert db.get_episode_by_path(new_path) == before
+    assert old_path not in db.get_file_index(os.path.dirname(old_path))
+
+
+def test_watch_scan_deletes_removed_series(db, library):
+    root, paths = library
+    scanner(root, db).run()
+    series_folder = os.path.join(str(root), os.path.relpath(paths[0], root).split(os.sep)[0])
+    for path in paths[:PER_SERIES]:
+        os.remove(path)
+    for folder, _, _ in sorted(os.walk(series_folder), reverse=True):
+        os.rmdir(folder)
+
+    scanner(root, db, incremental=True, paths=[series_folder]).run()
+    assert len(db.get_library()) == 1
+    assert db.get_episode_by_path(paths[0]) is None
+
+
+def test_multi_root_scan(db, tmp_path, library):
+    root, paths = library
+    other = tmp_path / "other"
+    other_paths = make_library(other, 3)
+    multi = MultiRootScanner([root, other], db, fetch_metadata=False, incremental=False)
+    assert multi.run() == len(paths) + len(other_paths)
+    assert [result['root'] for result in multi.results] == [str(root), str(other)]
+    assert [result['episodes'] for result in multi.results] == [len(paths), len(other_paths)]
+
+
+def test_multi_root_scan_of_one_root_uses_device_limit(db, library):
+    root, paths = library
+    limits = dict.fromkeys(DEFAULT_IO_LIMITS, 3)
+    multi = MultiRootScanner([root], db, fetch_metadata=False, incremental=False, io_limits=limits)
+    assert multi.run() == len(paths)
+    assert [(result['root'], result['io_limit']) for result in multi.results] == [(str(root), 3)]
@@ -0,0 +1,48 @@
+import sqlite3
+
+from core.thumbnails import ThumbnailCache
+
+
+def committed(cache):
+    """The manifest entries another connection can see."""
+    conn = sqlite3.connect(cache.root / "manifest.db")
+    try:
+        return {row[0] for row in conn.execute("SELECT file_hash FROM entries")}
+    finally:
+        conn.close()
+
+
+def add(cache, file_hash, size=10):
+    path = cache.path_for(file_hash)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(b"x" * size)
+    cache.add(file_hash)
+
+
+def test_adds_are_committed_in_batches(tmp_path):
+    cache = ThumbnailCache(tmp_path, commit_every=3, commit_interval=3600)
+    add(cache, "aa01")
+    add(cache, "aa02")
+    assert committed(cache) == set()
+    add(cache, "aa03")
+    assert committed(cache) == {"aa01", "aa02", "aa03"}
+
+    add(cache, "aa04")
+    cache.flush()
+    assert committed(cache) == {"aa01", "aa02", "aa03", "aa04"}
+    assert cache.total_bytes == 40
+    cache.close()
+
+
+def test_gc_and_close_commit_pending_adds(tmp_path):
+    cache = ThumbnailCache(tmp_path, gc_grace=0, commit_every=100, commit_interval=3600)
+    add(cache, "bb01")
+    add(cache, "bb02")
+    assert cache.gc({"bb01", "bb02"}) == []
+    assert committed(cache) == {"bb01", "bb02"}
+
+    add(cache, "bb03")
+    cache.close()
+    reopened = ThumbnailCache(tmp_path)
+    assert reopened.total_bytes == 30
+    reopened.close()
@@ -0,0 +1,30 @@
+import threading
+
+import pytest
+
+from core.watcher import LibraryWatcher, collapse_paths
+
+
+def test_collapse_paths_drops_nested_paths():
+    assert collapse_paths({"/lib/A", "/lib/A/1.mkv", "/lib/AB/1.mkv", "/lib/A"}) == ["/lib/A", "/lib/AB/1.mkv"]
+
+
+@pytest.mark.parametrize("polling", [True, False])
+def test_watcher_sets_up_backend_on_its_thread(tmp_path, polling):
+    threads, batches = [], []
+    changed = threading.Event()
+    watcher = LibraryWatcher(tmp_path, lambda paths: (batches.append(paths), changed.set()),
+                             debounce=0.1, poll_interval=0.1, polling=polling,
+                             on_ready=lambda: threads.append(threading.current_thread()))
+    watcher.start()
+    try:
+        assert watcher.wait_ready(5)
+        assert threads == [watcher._thread]
+        # Without inotify (not Linux, or no watches left) the watcher falls back to polling
+        assert watcher.mode == "polling" if polling else watcher.mode in ("inotify", "polling")
+
+        (tmp_path / "Show - 01.mkv").write_bytes(b"x")
+        assert changed.wait(5)
+        assert batches == [[str(tmp_path / "Show - 01.mkv")]]
+    finally:
+        watcher.stop()